@@ -0,0 +1,482 @@
+"""Benchmark Smart Home Farming garden data at synthetic garden sizes.
+
+For each garden size a deterministic history of planting and harvest
+records plus planting plans is generated, then two layers are measured:
+
+- ``garden_data``: ``GardenData`` on a real (unstarted) Home Assistant
+  core with an in-memory Store stand-in, measuring ``async_load`` time,
+  per-append latency, save size and duration, query latency and the
+  peak memory of loading the garden.
+- ``services``: the integration's registered services on the selected
+  storage backend with the fake LLM backend, measuring
+  ``get_garden_status``, ``record_planting`` and ``generate_planting_plan``
+  latency as seen by callers of ``hass.services.async_call``.
+
+Results are printed as JSON so runs can be compared between releases.
+Run from the repository root with Home Assistant installed::
+
+    python benchmarks/bench_garden_data.py --sizes 1000 10000 100000
+    python benchmarks/bench_garden_data.py --sizes 500000 --storage-backend sqlite --output big.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.const import CONF_API_KEY, CONF_LOCATION, __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers.json import json_bytes  # noqa: E402
+from homeassistant.util.json import json_loads  # noqa: E402
+
+from custom_components.smart_home_farming import (  # noqa: E402
+    async_setup,
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.smart_home_farming.const import (  # noqa: E402
+    DOMAIN,
+    EVENT_JOB_DONE,
+    CONF_INSTRUMENTATION,
+    CONF_LLM_BACKEND,
+    CONF_STORAGE_BACKEND,
+    LLM_BACKEND_FAKE,
+    STORAGE_BACKENDS,
+    STORAGE_BACKEND_STORE,
+    SERVICE_GENERATE_PLANTING_PLAN,
+    SERVICE_GET_GARDEN_STATUS,
+    SERVICE_RECORD_PLANTING,
+)
+from custom_components.smart_home_farming.garden_codec import (  # noqa: E402
+    encode_garden_data,
+)
+from custom_components.smart_home_farming.garden_data import (  # noqa: E402
+    GardenData,
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from custom_components.smart_home_farming.llm_backend import FakeBackend  # noqa: E402
+
+PLANTS = [
+    "tomatoes", "basil", "lettuce", "carrots", "beans", "peas", "zucchini",
+    "cucumbers", "peppers", "spinach", "radishes", "onions", "garlic", "kale",
+    "beetroot", "chard", "parsley", "dill", "potatoes", "strawberries",
+]
+BEDS = [f"Raised Bed {number}" for number in range(1, 13)] + [
+    f"Greenhouse {number}" for number in range(1, 5)
+]
+FIRST_DAY = date(2020, 1, 1)
+HISTORY_DAYS = 5 * 365
+
+
+def percentile(samples, percent):
+    """Return a nearest-rank percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(percent / 100 * len(ordered))) - 1]
+
+
+def summarize(samples):
+    """Return count, p50, p95 and max of latency samples in seconds."""
+    return {
+        "count": len(samples),
+        "p50": round(percentile(samples, 50), 6),
+        "p95": round(percentile(samples, 95), 6),
+        "max": round(max(samples, default=0.0), 6),
+    }
+
+
+def generate_garden(records, plans, seed):
+    """Return a garden document with the given number of records and plans.
+
+    Records are split evenly between plantings and harvests and spread
+    over five years; plans carry a few kilobytes of text like real ones.
+    """
+    rng = random.Random(seed)
+    plantings = []
+    harvests = []
+    for index in range(records):
+        day = FIRST_DAY + timedelta(days=rng.randrange(HISTORY_DAYS))
+        created_at = datetime.combine(day, datetime.min.time()).isoformat()
+        plant = rng.choice(PLANTS)
+        if index % 2:
+            harvests.append({
+                "created_at": created_at,
+                "plant": plant,
+                "date": day.isoformat(),
+                "yield_amount": f"{rng.randint(1, 5000)} g",
+            })
+        else:
+            plantings.append({
+                "created_at": created_at,
+                "plant": plant,
+                "location": rng.choice(BEDS),
+                "date": day.isoformat(),
+            })
+    planting_plans = []
+    for _ in range(plans):
+        day = FIRST_DAY + timedelta(days=rng.randrange(HISTORY_DAYS))
+        desired = rng.sample(PLANTS, rng.randint(2, 6))
+        planting_plans.append({
+            "created_at": datetime.combine(day, datetime.min.time()).isoformat(),
+            "plan": " ".join(
+                f"Plant {plant} in row {row}." for row, plant in enumerate(desired * 40)
+            ),
+            "parameters": {
+                "available_space": f"{rng.randint(1, 4)}x{rng.randint(1, 3)} meters",
+                "desired_plants": desired,
+                "planting_date": day.isoformat(),
+            },
+        })
+    return {
+        "plants": [],
+        "planting_records": plantings,
+        "harvest_records": harvests,
+        "planting_plans": planting_plans,
+    }
+
+
+class MemoryStore:
+    """Store stand-in keeping the serialized document in memory.
+
+    Loading and saving (de)serialize in the executor like Store does, so
+    the measured costs include the JSON work but no disk I/O.
+    """
+
+    def __init__(self, hass, raw=None):
+        """Initialize the stand-in with an optional serialized document."""
+        self.hass = hass
+        self._raw = raw
+        self.saves = []
+
+    async def async_load(self):
+        """Return the deserialized document."""
+        if self._raw is None:
+            return None
+        return await self.hass.async_add_executor_job(json_loads, self._raw)
+
+    async def async_save(self, data):
+        """Serialize the document and record its size and duration."""
+        start = time.perf_counter()
+        self._raw = await self.hass.async_add_executor_job(json_bytes, data)
+        self.saves.append((len(self._raw), time.perf_counter() - start))
+
+
+class BenchmarkEntry:
+    """Config entry stand-in with just what the integration uses."""
+
+    def __init__(self, hass, data, options):
+        """Initialize the entry."""
+        self.hass = hass
+        self.entry_id = "benchmark"
+        self.title = "Benchmark Garden"
+        self.data = data
+        self.options = options
+        self._on_unload = []
+
+    def async_on_unload(self, func):
+        """Remember a callback to run when the entry is unloaded."""
+        self._on_unload.append(func)
+
+    def add_update_listener(self, listener):
+        """Ignore update listeners; the benchmark never changes options."""
+        return lambda: None
+
+    def async_create_background_task(self, hass, target, name):
+        """Run a background task tied to the entry."""
+        return hass.async_create_background_task(target, name)
+
+    def async_run_unload_callbacks(self):
+        """Run the callbacks registered for unload."""
+        while self._on_unload:
+            self._on_unload.pop()()
+
+
+class PlatformsStandIn:
+    """Config entries stand-in; the benchmark does not set up entities."""
+
+    def __init__(self):
+        """Initialize the stand-in without entries."""
+        self.entries = []
+
+    def async_entries(self, domain):
+        """Return the benchmark entries."""
+        return list(self.entries)
+
+    def async_get_entry(self, entry_id):
+        """Return a benchmark entry by ID."""
+        return next(
+            (entry for entry in self.entries if entry.entry_id == entry_id), None
+        )
+
+    def async_update_entry(self, entry, data=None, options=None):
+        """Replace the data or options of an entry."""
+        if data is not None:
+            entry.data = data
+        if options is not None:
+            entry.options = options
+        return True
+
+    async def async_forward_entry_setups(self, entry, platforms):
+        """Skip platform setup."""
+
+    async def async_unload_platforms(self, entry, platforms):
+        """Skip platform unload."""
+        return True
+
+
+def new_record(rng, index):
+    """Return a planting record as the record_planting service receives it."""
+    return {
+        "plant": rng.choice(PLANTS),
+        "location": rng.choice(BEDS),
+        "date": (FIRST_DAY + timedelta(days=HISTORY_DAYS + index % 30)).isoformat(),
+    }
+
+
+async def bench_garden_data(hass, raw, args):
+    """Measure GardenData on the Store stand-in."""
+    rng = random.Random(args.seed)
+    results = {}
+
+    garden = GardenData(hass, commit_delay=3600, max_commit_latency=3600)
+    store = garden._store = MemoryStore(hass, raw)
+    start = time.perf_counter()
+    await garden.async_load()
+    results["load_s"] = round(time.perf_counter() - start, 4)
+
+    samples = []
+    for index in range(args.appends):
+        record = new_record(rng, index)
+        start = time.perf_counter()
+        await garden.add_planting_record(record)
+        samples.append(time.perf_counter() - start)
+    results["append_latency_s"] = summarize(samples)
+
+    start = time.perf_counter()
+    await garden.async_flush()
+    save_bytes, serialize_s = store.saves[-1]
+    results["save"] = {
+        "bytes": save_bytes,
+        "duration_s": round(time.perf_counter() - start, 4),
+        "serialize_s": round(serialize_s, 4),
+        "writes_coalesced": garden.coalesced_writes,
+    }
+
+    queries = {
+        "plant_page": {"kind": "planting_records", "plant": "Tomatoes", "limit": 100},
+        "bed_page": {"kind": "planting_records", "location": BEDS[0], "limit": 100},
+        "date_range_page": {
+            "kind": "harvest_records",
+            "start_date": "2022-06-01",
+            "end_date": "2022-08-31",
+            "limit": 100,
+        },
+    }
+    results["query_latency_s"] = {}
+    for name, query in queries.items():
+        samples = []
+        for _ in range(args.queries):
+            start = time.perf_counter()
+            await garden.async_query_page(**query)
+            samples.append(time.perf_counter() - start)
+        results["query_latency_s"][name] = summarize(samples)
+    await garden.async_close()
+    del garden, store
+
+    if not args.no_memory:
+        gc.collect()
+        tracemalloc.start()
+        garden = GardenData(hass)
+        garden._store = MemoryStore(hass, raw)
+        await garden.async_load()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results["memory"] = {"resident_bytes": current, "peak_bytes": peak}
+        del garden
+    return results
+
+
+async def bench_services(hass, document, args):
+    """Measure the registered services on the selected storage backend."""
+    rng = random.Random(args.seed)
+    storage_dir = hass.config.path(".storage")
+    os.makedirs(storage_dir, exist_ok=True)
+    # Seed the Store file the integration loads (and other backends migrate)
+    with open(os.path.join(storage_dir, STORAGE_KEY), "wb") as file:
+        file.write(json_bytes({
+            "version": STORAGE_VERSION,
+            "minor_version": 1,
+            "key": STORAGE_KEY,
+            "data": document,
+        }))
+
+    entry = BenchmarkEntry(
+        hass,
+        {
+            CONF_API_KEY: "benchmark-key",
+            CONF_LOCATION: "Benchmark Garden",
+            CONF_STORAGE_BACKEND: args.storage_backend,
+        },
+        {CONF_LLM_BACKEND: LLM_BACKEND_FAKE, CONF_INSTRUMENTATION: True},
+    )
+    hass.config_entries.entries.append(entry)
+    # Services are registered once per component, not per entry
+    await async_setup(hass, {})
+    results = {}
+    start = time.perf_counter()
+    await async_setup_entry(hass, entry)
+    results["setup_s"] = round(time.perf_counter() - start, 4)
+
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    entry_data["llm_api"].backend = FakeBackend(
+        latency=args.llm_latency, jitter=0.0, seed=args.seed
+    )
+
+    async def call(service, data, response=True):
+        start = time.perf_counter()
+        await hass.services.async_call(
+            DOMAIN, service, data, blocking=True, return_response=response
+        )
+        return time.perf_counter() - start
+
+    status_calls = {
+        "all_records": {},
+        "plant_page": {"plant": "Tomatoes", "limit": 100},
+        "bed_page": {"location": BEDS[0], "limit": 100},
+        "date_range_page": {
+            "start_date": "2022-06-01",
+            "end_date": "2022-08-31",
+            "limit": 100,
+        },
+    }
+    results["get_garden_status_s"] = {}
+    for name, data in status_calls.items():
+        # Full dumps of big gardens are slow, so they are sampled less
+        repeats = max(1, args.queries // 10) if not data else args.queries
+        samples = [
+            await call(SERVICE_GET_GARDEN_STATUS, data) for _ in range(repeats)
+        ]
+        results["get_garden_status_s"][name] = summarize(samples)
+
+    samples = [
+        await call(SERVICE_RECORD_PLANTING, new_record(rng, index), response=False)
+        for index in range(args.appends)
+    ]
+    results["record_planting_s"] = summarize(samples)
+
+    async def plan(index):
+        # The service only queues a job, so time until the job is done
+        done = asyncio.Event()
+        remove = hass.bus.async_listen_once(EVENT_JOB_DONE, lambda _event: done.set())
+        start = time.perf_counter()
+        try:
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_GENERATE_PLANTING_PLAN,
+                {
+                    "available_space": f"{index + 1}x2 meters",
+                    "desired_plants": rng.sample(PLANTS, 3),
+                },
+                blocking=True,
+                return_response=True,
+            )
+            await done.wait()
+        finally:
+            if not done.is_set():
+                remove()
+        return time.perf_counter() - start
+
+    samples = [await plan(index) for index in range(args.plan_calls)]
+    results["generate_planting_plan_s"] = summarize(samples)
+
+    start = time.perf_counter()
+    await entry_data["garden_data"].async_flush()
+    results["flush_s"] = round(time.perf_counter() - start, 4)
+    results["garden_data"] = entry_data["garden_data"].stats
+    results["instrumentation"] = entry_data["instrumentation"].stats
+
+    await async_unload_entry(hass, entry)
+    entry.async_run_unload_callbacks()
+    return results
+
+
+async def run_size(records, args):
+    """Run both benchmark layers for one garden size."""
+    # Stored documents are in column form (storage version 2)
+    document = encode_garden_data(generate_garden(records, args.plans, args.seed))
+    raw = json_bytes(document)
+    result = {
+        "records": records,
+        "plans": args.plans,
+        "document_bytes": len(raw),
+    }
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.config_entries = PlatformsStandIn()
+        try:
+            result["garden_data"] = await bench_garden_data(hass, raw, args)
+            if not args.no_services:
+                result["services"] = await bench_services(hass, document, args)
+            await hass.async_block_till_done()
+        finally:
+            await hass.async_stop(force=True)
+    return result
+
+
+async def run(args):
+    """Run the benchmark for every garden size."""
+    return {
+        "config": vars(args),
+        "environment": {
+            "python": platform.python_version(),
+            "homeassistant": HA_VERSION,
+            "machine": platform.machine(),
+        },
+        "results": [await run_size(records, args) for records in args.sizes],
+    }
+
+
+def main():
+    """Parse arguments, run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="planting plus harvest records per garden",
+    )
+    parser.add_argument("--plans", type=int, default=200, help="planting plans per garden")
+    parser.add_argument("--appends", type=int, default=200, help="records appended per run")
+    parser.add_argument("--queries", type=int, default=20, help="samples per query")
+    parser.add_argument("--plan-calls", type=int, default=10, help="generate_planting_plan calls")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="fake backend latency (s)")
+    parser.add_argument(
+        "--storage-backend", choices=STORAGE_BACKENDS, default=STORAGE_BACKEND_STORE,
+        help="storage backend used by the services",
+    )
+    parser.add_argument("--no-services", action="store_true", help="skip the service layer")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
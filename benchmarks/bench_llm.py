@@ -0,0 +1,168 @@
+"""Load test the Smart Home Farming LLM layer without a real model.
+
+Drives the same ``LLMApi`` calls the ``generate_planting_plan`` and
+``get_care_recommendations`` services make, at a configurable concurrency,
+against the bundled fake backend or any OpenAI-compatible server. A pool
+of distinct requests is sampled with repetition so the response cache and
+in-flight coalescing get exercised like they would by real automations.
+
+Run from the repository root with Home Assistant installed::
+
+    python benchmarks/bench_llm.py --requests 500 --concurrency 20 --distinct 25
+    python benchmarks/bench_llm.py --backend openai --base-url http://localhost:8080/v1
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_components.smart_home_farming.llm_api import LLMApi  # noqa: E402
+from custom_components.smart_home_farming.llm_backend import (  # noqa: E402
+    FakeBackend,
+    OpenAICompatibleBackend,
+)
+from custom_components.smart_home_farming.llm_cache import LLMResponseCache  # noqa: E402
+
+PLANTS = [
+    "tomatoes", "basil", "lettuce", "carrots", "beans", "peas", "zucchini",
+    "cucumbers", "peppers", "spinach", "radishes", "onions", "garlic", "kale",
+    "beetroot", "chard", "parsley", "dill", "potatoes", "strawberries",
+]
+
+
+def percentile(samples, percent):
+    """Return a nearest-rank percentile of the samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(1, math.ceil(percent / 100 * len(ordered))) - 1]
+
+
+def build_workload(args, rng):
+    """Return the list of (service, arguments) calls to make."""
+    pool = []
+    for index in range(args.distinct):
+        plants = rng.sample(PLANTS, rng.randint(2, 5))
+        if index % 2:
+            pool.append(("care", (plants,)))
+        else:
+            pool.append((
+                "plan",
+                (f"{rng.randint(1, 4)}x{rng.randint(1, 3)} meters", plants, "2024-04-01"),
+            ))
+    return [rng.choice(pool) for _ in range(args.requests)]
+
+
+async def run(args):
+    """Run the workload and return the measured results."""
+    rng = random.Random(args.seed)
+    session = None
+    if args.backend == "openai":
+        import aiohttp
+
+        session = aiohttp.ClientSession()
+        backend = OpenAICompatibleBackend(session, args.base_url, args.model)
+    else:
+        backend = FakeBackend(
+            latency=args.latency, error_rate=args.error_rate, seed=args.seed
+        )
+
+    cache = LLMResponseCache(None) if not args.no_cache else None
+    api = LLMApi(
+        backend,
+        "Benchmark Garden",
+        cache=cache,
+        max_concurrency=args.upstream,
+        requests_per_minute=args.rpm,
+    )
+    workload = build_workload(args, rng)
+    queue = asyncio.Queue()
+    for call in workload:
+        queue.put_nowait(call)
+
+    latencies = {"plan": [], "care": []}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            service, call_args = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                if service == "plan":
+                    await api.generate_planting_plan(*call_args)
+                else:
+                    await api.get_care_recommendations(*call_args)
+            except Exception:  # noqa: BLE001 - every failure counts as an error
+                errors += 1
+            latencies[service].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if session is not None:
+        await session.close()
+
+    all_latencies = latencies["plan"] + latencies["care"]
+    results = {
+        "config": vars(args),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(workload) / elapsed, 2),
+        "errors": errors,
+        "latency_s": {
+            service: {
+                "count": len(samples),
+                "p50": round(percentile(samples, 50), 4),
+                "p95": round(percentile(samples, 95), 4),
+                "p99": round(percentile(samples, 99), 4),
+                "max": round(max(samples, default=0.0), 4),
+            }
+            for service, samples in (("all", all_latencies), *latencies.items())
+        },
+        "llm_api": api.stats,
+    }
+    if cache is not None:
+        lookups = cache.hits + cache.misses
+        results["cache"] = {
+            **cache.stats,
+            "hit_ratio": round(cache.hits / lookups, 3) if lookups else 0.0,
+        }
+    if isinstance(backend, FakeBackend):
+        results["upstream_requests"] = backend.requests
+    return results
+
+
+def main():
+    """Parse arguments, run the benchmark and print JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", choices=["fake", "openai"], default="fake")
+    parser.add_argument("--base-url", default="http://localhost:8080/v1")
+    parser.add_argument("--model", default="default")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--upstream", type=int, default=2, help="upstream request limit")
+    parser.add_argument("--rpm", type=float, default=6000, help="upstream requests per minute")
+    parser.add_argument("--distinct", type=int, default=20, help="distinct requests in the pool")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure the startup cost of the Smart Home Farming LLM client.
+
+Each sample runs in a fresh interpreter so module import caches do not
+leak between runs. Three scenarios are compared:
+
+- ``lazy``: import the integration and create ``LLMApi`` the way
+  ``async_setup_entry`` does; the Gemini SDK is not touched.
+- ``eager``: the same, then build the Gemini client immediately, which is
+  what setup used to do before the client was created on first use.
+- ``sdk_import``: only ``import google.generativeai``, for reference.
+
+Run from the repository root with Home Assistant and the integration's
+requirements installed::
+
+    python benchmarks/bench_setup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "lazy": """
+from custom_components.smart_home_farming.llm_api import LLMApi
+from custom_components.smart_home_farming.llm_backend import GeminiBackend
+LLMApi(GeminiBackend("benchmark-key"), "home")
+""",
+    "eager": """
+from custom_components.smart_home_farming.llm_api import LLMApi
+from custom_components.smart_home_farming.llm_backend import GeminiBackend
+LLMApi(GeminiBackend("benchmark-key"), "home").backend._build_model()
+""",
+    "sdk_import": """
+import google.generativeai
+""",
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{body}
+print(time.perf_counter() - _start)
+"""
+
+
+def run_sample(body: str) -> float:
+    """Run one scenario in a new interpreter and return seconds taken."""
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER.format(body=body)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Run all scenarios and print a JSON summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="samples per scenario")
+    args = parser.parse_args()
+
+    results = {}
+    for name, body in SCENARIOS.items():
+        samples = [run_sample(body) for _ in range(args.runs)]
+        results[name] = {
+            "runs": args.runs,
+            "median_s": round(statistics.median(samples), 4),
+            "min_s": round(min(samples), 4),
+            "max_s": round(max(samples), 4),
+        }
+    results["sdk_cost_at_setup_s"] = round(
+        results["eager"]["median_s"] - results["lazy"]["median_s"], 4
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,26 @@
 """The Smart Home Farming integration."""
+import base64
+import binascii
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+import json
 import logging
+import os
+from typing import Dict, List, Optional, Tuple
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_API_KEY, CONF_LOCATION
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_LOCATION, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -13,141 +28,786 @@ from .const import (
     SERVICE_RECORD_PLANTING,
     SERVICE_RECORD_HARVEST,
     SERVICE_GET_GARDEN_STATUS,
+    SERVICE_CLEAR_LLM_CACHE,
+    SERVICE_GET_CARE_RECOMMENDATIONS,
+    SERVICE_GET_YIELD_SUMMARY,
+    SERVICE_GET_CALENDAR,
+    SERVICE_ARCHIVE_SEASONS,
+    SERVICE_GET_JOB,
+    SERVICE_IMPORT_RECORDS,
+    SERVICE_EXPORT_RECORDS,
     CONF_AVAILABLE_SPACE,
+    CONF_BEDS,
     CONF_DESIRED_PLANTS,
     CONF_PLANTING_DATE,
+    CONF_STREAM,
+    EVENT_PLAN_CHUNK,
+    CONF_PLANT,
+    CONF_START_DATE,
+    CONF_END_DATE,
+    CONF_RECORD_TYPE,
+    CONF_LIMIT,
+    CONF_CURSOR,
+    CONF_SINCE_REVISION,
+    CONF_KIND,
+    CONF_PLANTS,
+    CONF_GROUP_BY,
+    CONF_BUCKETS,
+    CONF_DAYS,
+    CONF_BEFORE,
+    CONF_PRIORITY,
+    CONF_JOB_ID,
+    CONF_ENTRY_ID,
+    CONF_RECORDS,
+    CONF_FILE,
+    JOB_PRIORITIES,
+    JOB_PRIORITY_INTERACTIVE,
+    JOB_TYPE_PLANTING_PLAN,
+    DEFAULT_CALENDAR_DAYS,
+    MAX_STATUS_LIMIT,
+    EXPORT_PAGE_SIZE,
+    CACHE_KINDS,
+    DATA_LLM_POOL,
 )
+from .crop_calendar import climate_zone, crop_calendar
+from .garden_data import POSITION_MASK, RECORD_COLLECTIONS
+from .jobs import JobQueueFullError
+from .layout import solve_layout
+from .records_io import RECORD_TYPES, RecordExporter, read_records
+from .yields import GROUP_BY, GROUP_BY_SEASON
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS = []
+PLATFORMS = [Platform.SENSOR]
 
 # This integration only supports configuration via the UI
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 # Service schemas
 GENERATE_PLANTING_PLAN_SCHEMA = vol.Schema({
-    vol.Required(CONF_AVAILABLE_SPACE): cv.string,
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_AVAILABLE_SPACE): cv.string,
     vol.Required(CONF_DESIRED_PLANTS): cv.ensure_list,
     vol.Optional(CONF_PLANTING_DATE): cv.string,
+    vol.Optional(CONF_STREAM, default=False): cv.boolean,
+    vol.Optional(CONF_PRIORITY, default=JOB_PRIORITY_INTERACTIVE): vol.In(
+        JOB_PRIORITIES
+    ),
 })
 
 RECORD_PLANTING_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
     vol.Required("plant"): cv.string,
     vol.Required("location"): cv.string,
     vol.Optional("date"): cv.string,
 })
 
 RECORD_HARVEST_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
     vol.Required("plant"): cv.string,
+    vol.Optional("location"): cv.string,
     vol.Optional("date"): cv.string,
     vol.Optional("yield_amount"): cv.string,
 })
 
-async def async_setup(hass: HomeAssistant, config: dict) -> bool:
-    """Set up the Smart Home Farming component."""
-    hass.data.setdefault(DOMAIN, {})
-    return True
+GET_GARDEN_STATUS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_PLANT): cv.string,
+    vol.Optional(CONF_LOCATION): cv.string,
+    vol.Optional(CONF_START_DATE): cv.date,
+    vol.Optional(CONF_END_DATE): cv.date,
+    vol.Optional(CONF_RECORD_TYPE): vol.In(RECORD_COLLECTIONS),
+    vol.Optional(CONF_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_STATUS_LIMIT)
+    ),
+    vol.Optional(CONF_CURSOR): cv.string,
+    vol.Optional(CONF_SINCE_REVISION): vol.All(vol.Coerce(int), vol.Range(min=0)),
+})
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Smart Home Farming from a config entry."""
-    # Set up core functionality
-    from .core import async_setup_entry as async_setup_core
-    
-    if not await async_setup_core(hass, entry):
-        return False
+CLEAR_LLM_CACHE_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_KIND): vol.In(CACHE_KINDS),
+})
 
-    # Get the initialized components
-    llm_api = hass.data[DOMAIN][entry.entry_id]["llm_api"]
-    garden_data = hass.data[DOMAIN][entry.entry_id]["garden_data"]
+GET_CARE_RECOMMENDATIONS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Required(CONF_PLANTS): vol.All(cv.ensure_list, [cv.string], vol.Length(min=1)),
+})
 
-    # Set up platforms
-    if PLATFORMS:
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+GET_YIELD_SUMMARY_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_GROUP_BY, default=GROUP_BY_SEASON): vol.In(GROUP_BY),
+    vol.Optional(CONF_BUCKETS): vol.All(cv.ensure_list, [cv.string]),
+})
+
+GET_CALENDAR_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_START_DATE): cv.date,
+    vol.Optional(CONF_DAYS, default=DEFAULT_CALENDAR_DAYS): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=366)
+    ),
+    vol.Optional(CONF_PLANTS): vol.All(cv.ensure_list, [cv.string]),
+})
+
+GET_JOB_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Required(CONF_JOB_ID): cv.string,
+})
+
+IMPORT_RECORDS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_RECORDS): vol.All(cv.ensure_list, [dict]),
+    vol.Optional(CONF_FILE): cv.string,
+    vol.Optional(CONF_RECORD_TYPE): vol.In(RECORD_TYPES),
+})
+
+EXPORT_RECORDS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Required(CONF_FILE): cv.string,
+    vol.Optional(CONF_RECORD_TYPE): vol.In(RECORD_TYPES),
+    vol.Optional(CONF_PLANT): cv.string,
+    vol.Optional(CONF_LOCATION): cv.string,
+    vol.Optional(CONF_START_DATE): cv.date,
+    vol.Optional(CONF_END_DATE): cv.date,
+})
+
+# Fields of imported records per collection; other fields are dropped
+IMPORT_SCHEMAS = {
+    "planting_records": vol.Schema({
+        vol.Required("plant"): cv.string,
+        vol.Required("location"): cv.string,
+        vol.Optional("date"): cv.string,
+        vol.Optional("created_at"): cv.string,
+    }, extra=vol.REMOVE_EXTRA),
+    "harvest_records": vol.Schema({
+        vol.Required("plant"): cv.string,
+        vol.Optional("location"): cv.string,
+        vol.Optional("date"): cv.string,
+        vol.Optional("yield_amount"): cv.string,
+        vol.Optional("created_at"): cv.string,
+    }, extra=vol.REMOVE_EXTRA),
+}
+
+ARCHIVE_SEASONS_SCHEMA = vol.Schema({
+    vol.Optional(CONF_ENTRY_ID): cv.string,
+    vol.Optional(CONF_BEFORE): cv.date,
+})
+
+
+def _encode_cursor(positions: Dict) -> str:
+    """Encode the next record key per record type as an opaque cursor."""
+    raw = json.dumps(positions, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
 
-    async def generate_planting_plan(call: ServiceCall) -> None:
+
+def _decode_cursor(cursor: str) -> Dict:
+    """Decode a cursor returned by a previous get_garden_status call."""
+    try:
+        positions = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(positions, dict) or not set(positions) <= set(RECORD_COLLECTIONS):
+            raise ValueError(cursor)
+        for key in positions.values():
+            # Each record type continues after a [date, position] record key;
+            # undated records sort under "" and archived ones have negative
+            # positions
+            if (
+                not isinstance(key, list)
+                or len(key) != 2
+                or not isinstance(key[0], str)
+                or (key[0] and dt_util.parse_date(key[0]) is None)
+                or type(key[1]) is not int
+                or not -POSITION_MASK <= key[1] <= POSITION_MASK
+            ):
+                raise ValueError(cursor)
+        return positions
+    except (ValueError, binascii.Error) as e:
+        raise ServiceValidationError(f"Invalid cursor: {cursor}") from e
+
+
+def _validate_import(
+    rows: List, default_type: Optional[str]
+) -> Tuple[List[Tuple[str, Dict]], List[str]]:
+    """Validate imported rows and return the records and all errors."""
+    records: List[Tuple[str, Dict]] = []
+    errors: List[str] = []
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            errors.append(f"record {number}: not an object")
+            continue
+        kind = row.get(CONF_RECORD_TYPE, default_type)
+        if kind not in IMPORT_SCHEMAS:
+            errors.append(f"record {number}: unknown record_type {kind}")
+            continue
+        try:
+            records.append((kind, IMPORT_SCHEMAS[kind](row)))
+        except vol.Invalid as e:
+            errors.append(f"record {number}: {e}")
+    return records, errors
+
+
+def _resolve_path(hass: HomeAssistant, file: str) -> str:
+    """Return the absolute path of a file in the configuration directory."""
+    config_dir = os.path.realpath(hass.config.config_dir)
+    storage_dir = os.path.join(config_dir, ".storage")
+    path = os.path.realpath(hass.config.path(file))
+    if (
+        os.path.commonpath([config_dir, path]) != config_dir
+        or os.path.commonpath([storage_dir, path]) == storage_dir
+    ):
+        raise ServiceValidationError(
+            f"{file} must be in the configuration directory and not in .storage"
+        )
+    return path
+
+
+@callback
+def _async_get_entry(hass: HomeAssistant, call: ServiceCall) -> Tuple[ConfigEntry, Dict]:
+    """Return the config entry a service call is for and its data.
+
+    The entry_id field may be left out while only one garden is loaded.
+    """
+    entries = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(CONF_ENTRY_ID)
+    if entry_id is None:
+        if len(entries) != 1:
+            raise ServiceValidationError(
+                "Select a garden with entry_id" if entries else "No garden is loaded"
+            )
+        entry_id = next(iter(entries))
+    if entry_id not in entries:
+        raise ServiceValidationError(f"Unknown or unloaded garden: {entry_id}")
+    return hass.config_entries.async_get_entry(entry_id), entries[entry_id]
+
+
+async def _async_stream_planting_plan(
+    hass: HomeAssistant,
+    entry_data: Dict,
+    plan_id: str,
+    parameters: dict,
+    layout: Optional[dict],
+) -> str:
+    """Stream a planting plan as events, store it and return it."""
+    chunks = []
+    try:
+        async for chunk in entry_data["llm_api"].stream_planting_plan(
+            parameters.get(CONF_AVAILABLE_SPACE),
+            parameters[CONF_DESIRED_PLANTS],
+            parameters.get(CONF_PLANTING_DATE),
+            layout,
+        ):
+            hass.bus.async_fire(
+                EVENT_PLAN_CHUNK,
+                {"plan_id": plan_id, "index": len(chunks), "text": chunk, "done": False},
+            )
+            chunks.append(chunk)
+    except Exception as e:
+        _LOGGER.error("Error streaming planting plan: %s", str(e))
+        hass.bus.async_fire(
+            EVENT_PLAN_CHUNK,
+            {"plan_id": plan_id, "index": len(chunks), "done": True, "error": str(e)},
+        )
+        raise
+
+    plan = "".join(chunks)
+    await entry_data["garden_data"].add_planting_plan({
+        "id": plan_id,
+        "plan": plan,
+        "parameters": parameters,
+        "layout": layout,
+    })
+    hass.bus.async_fire(
+        EVENT_PLAN_CHUNK,
+        {"plan_id": plan_id, "index": len(chunks), "done": True},
+    )
+    _LOGGER.debug("Successfully streamed and saved planting plan %s", plan_id)
+    return plan
+
+
+async def _async_run_planting_plan_job(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    entry_data: Dict,
+    job_id: str,
+    parameters: dict,
+) -> dict:
+    """Generate and store the planting plan of a queued job."""
+    layout = None
+    if CONF_AVAILABLE_SPACE not in parameters:
+        # Lay the plants out in the configured beds locally
+        with entry_data["instrumentation"].timer("layout.solve"):
+            layout = solve_layout(
+                entry.data.get(CONF_BEDS, []),
+                parameters[CONF_DESIRED_PLANTS],
+                parameters.get(CONF_PLANTING_DATE),
+            )
+    plan_parameters = {
+        key: value
+        for key, value in parameters.items()
+        if key not in (CONF_STREAM, CONF_PRIORITY)
+    }
+
+    if parameters[CONF_STREAM]:
+        plan = await _async_stream_planting_plan(
+            hass, entry_data, job_id, plan_parameters, layout
+        )
+    else:
+        # Nothing is stored on failure, so failures never end up as plans
+        plan = await entry_data["llm_api"].generate_planting_plan(
+            parameters.get(CONF_AVAILABLE_SPACE),
+            parameters[CONF_DESIRED_PLANTS],
+            parameters.get(CONF_PLANTING_DATE),
+            layout,
+        )
+        await entry_data["garden_data"].add_planting_plan({
+            "id": job_id,
+            "plan": plan,
+            "parameters": plan_parameters,
+            "layout": layout,
+        })
+        _LOGGER.debug("Successfully generated and saved planting plan %s", job_id)
+    return {"plan_id": job_id, "plan": plan, "layout": layout}
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Set up the Smart Home Farming component.
+
+    Services are registered once for all gardens; every call is routed to
+    the config entry given by its entry_id field.
+    """
+    hass.data.setdefault(DOMAIN, {})
+
+    async def generate_planting_plan(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
         """Handle generate planting plan service call."""
-        _LOGGER.debug("Generating planting plan with parameters: %s", call.data)
+        _LOGGER.debug("Generating planting plan with parameters: %s", data)
+        if CONF_AVAILABLE_SPACE not in data and not entry.data.get(CONF_BEDS):
+            raise ServiceValidationError(
+                "Provide available_space or configure garden beds"
+            )
         try:
-            plan = await llm_api.generate_planting_plan(
-                call.data[CONF_AVAILABLE_SPACE],
-                call.data[CONF_DESIRED_PLANTS],
-                call.data.get(CONF_PLANTING_DATE),
+            job = entry_data["jobs"].async_submit(
+                JOB_TYPE_PLANTING_PLAN, data, data[CONF_PRIORITY]
             )
-            
-            plan_data = {
-                "plan": plan,
-                "parameters": call.data
-            }
-            await garden_data.add_planting_plan(plan_data)
-            _LOGGER.debug("Successfully generated and saved planting plan")
-        except Exception as e:
-            _LOGGER.error("Error generating planting plan: %s", str(e))
-            raise
+        except JobQueueFullError as e:
+            raise HomeAssistantError(f"Too many planting plans waiting: {e}") from e
+        # Streamed chunks carry the job ID as their plan ID
+        return {"job_id": job["id"], "plan_id": job["id"]}
+
+    async def get_job(entry: ConfigEntry, entry_data: Dict, data: Dict) -> dict:
+        """Handle get job service call."""
+        job = entry_data["jobs"].get(data[CONF_JOB_ID])
+        if job is None:
+            raise ServiceValidationError(f"Unknown job: {data[CONF_JOB_ID]}")
+        return job
 
-    async def record_planting(call: ServiceCall) -> None:
+    async def record_planting(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> None:
         """Handle record planting service call."""
-        _LOGGER.debug("Recording planting with parameters: %s", call.data)
+        _LOGGER.debug("Recording planting with parameters: %s", data)
         try:
-            await garden_data.add_planting_record(dict(call.data))
+            await entry_data["garden_data"].add_planting_record(data)
             _LOGGER.debug("Successfully recorded planting")
         except Exception as e:
             _LOGGER.error("Error recording planting: %s", str(e))
             raise
 
-    async def record_harvest(call: ServiceCall) -> None:
+    async def record_harvest(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> None:
         """Handle record harvest service call."""
-        _LOGGER.debug("Recording harvest with parameters: %s", call.data)
+        _LOGGER.debug("Recording harvest with parameters: %s", data)
         try:
-            await garden_data.add_harvest_record(dict(call.data))
+            await entry_data["garden_data"].add_harvest_record(data)
             _LOGGER.debug("Successfully recorded harvest")
         except Exception as e:
             _LOGGER.error("Error recording harvest: %s", str(e))
             raise
 
-    async def get_garden_status(call: ServiceCall) -> dict:
+    async def get_garden_status(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
         """Handle get garden status service call."""
-        _LOGGER.debug("Getting garden status")
+        _LOGGER.debug("Getting garden status with parameters: %s", data)
+        garden_data = entry_data["garden_data"]
+        # Taken first: a record added while the status is read may be
+        # returned again as a change, but is never missed
+        revision = garden_data.revision
         try:
-            return {
-                "planting_plans": garden_data.get_planting_plans(),
-                "planting_records": garden_data.get_planting_records(),
-                "harvest_records": garden_data.get_harvest_records(),
-            }
+            if not data:
+                return {
+                    "planting_plans": await garden_data.async_get_planting_plans(),
+                    "planting_records": await garden_data.async_get_planting_records(),
+                    "harvest_records": await garden_data.async_get_harvest_records(),
+                    "revision": revision,
+                    "archived_through": garden_data.archived_through,
+                }
+
+            start_date: Optional[str] = None
+            end_date: Optional[str] = None
+            if CONF_START_DATE in data:
+                start_date = data[CONF_START_DATE].isoformat()
+            if CONF_END_DATE in data:
+                end_date = data[CONF_END_DATE].isoformat()
+
+            response: Dict = {"revision": revision}
+            if CONF_SINCE_REVISION in data:
+                if CONF_LIMIT in data or CONF_CURSOR in data:
+                    raise ServiceValidationError(
+                        "since_revision cannot be combined with limit or cursor"
+                    )
+                kinds = (
+                    [data[CONF_RECORD_TYPE]]
+                    if CONF_RECORD_TYPE in data
+                    else list(RECORD_COLLECTIONS)
+                )
+                changes = {
+                    kind: garden_data.changes_since(
+                        data[CONF_SINCE_REVISION],
+                        kind,
+                        plant=data.get(CONF_PLANT),
+                        location=data.get(CONF_LOCATION),
+                        start_date=start_date,
+                        end_date=end_date,
+                    )
+                    for kind in kinds
+                }
+                if None not in changes.values():
+                    return {
+                        **changes,
+                        "revision": revision,
+                        "full_snapshot": False,
+                        "next_cursor": None,
+                    }
+                _LOGGER.debug(
+                    "Revision %s is no longer in the change log, returning all records",
+                    data[CONF_SINCE_REVISION],
+                )
+                response["full_snapshot"] = True
+
+            if CONF_CURSOR in data:
+                # Continue only the record types the previous page left open
+                positions = _decode_cursor(data[CONF_CURSOR])
+            elif CONF_RECORD_TYPE in data:
+                positions = {data[CONF_RECORD_TYPE]: None}
+            else:
+                positions = dict.fromkeys(RECORD_COLLECTIONS)
+
+            next_positions: Dict = {}
+            for kind, after in positions.items():
+                records, next_key = await garden_data.async_query_page(
+                    kind,
+                    plant=data.get(CONF_PLANT),
+                    location=data.get(CONF_LOCATION),
+                    start_date=start_date,
+                    end_date=end_date,
+                    limit=data.get(CONF_LIMIT),
+                    after=after,
+                )
+                response[kind] = records
+                if next_key is not None:
+                    next_positions[kind] = next_key
+
+            response["next_cursor"] = (
+                _encode_cursor(next_positions) if next_positions else None
+            )
+            # Archived seasons are only read when start_date reaches into them
+            response["archived_through"] = (
+                garden_data.archived_through if start_date is None else None
+            )
+            return response
+        except ServiceValidationError:
+            raise
         except Exception as e:
             _LOGGER.error("Error getting garden status: %s", str(e))
             raise
 
+    async def get_care_recommendations(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
+        """Handle get care recommendations service call."""
+        _LOGGER.debug("Getting care recommendations with parameters: %s", data)
+        plants = list(dict.fromkeys(data[CONF_PLANTS]))
+        try:
+            recommendations = await entry_data["llm_api"].get_care_recommendations(
+                plants
+            )
+        except Exception as e:
+            _LOGGER.error("Error getting care recommendations: %s", str(e))
+            raise HomeAssistantError(f"Error getting care recommendations: {e}") from e
+        return {"recommendations": recommendations}
+
+    async def get_yield_summary(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
+        """Handle get yield summary service call."""
+        group_by = data[CONF_GROUP_BY]
+        buckets = entry_data["garden_data"].yield_summary(
+            group_by, data.get(CONF_BUCKETS)
+        )
+        return {"group_by": group_by, "buckets": buckets}
+
+    async def get_calendar(entry: ConfigEntry, entry_data: Dict, data: Dict) -> dict:
+        """Handle get calendar service call."""
+        first = data.get(CONF_START_DATE) or dt_util.now().date()
+        last = first + timedelta(days=data[CONF_DAYS] - 1)
+        latitude = hass.config.latitude
+        calendar = crop_calendar(climate_zone(latitude), latitude < 0)
+
+        spanned = (last.year - first.year) * 12 + last.month - first.month
+        months = [
+            (first.month - 1 + step) % 12 + 1 for step in range(min(spanned, 11) + 1)
+        ]
+        try:
+            plantings = await entry_data["garden_data"].async_get_planting_records()
+            harvest = await hass.async_add_executor_job(
+                calendar.harvests_between, plantings, first, last
+            )
+        except Exception as e:
+            _LOGGER.error("Error getting calendar: %s", str(e))
+            raise
+        return {
+            "zone": calendar.zone,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "sow": calendar.sowing(months, data.get(CONF_PLANTS)),
+            "harvest": harvest,
+        }
+
+    async def archive_seasons(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
+        """Handle archive seasons service call."""
+        garden_data = entry_data["garden_data"]
+        if not garden_data.supports_archive:
+            raise ServiceValidationError(
+                "The SQLite storage backend does not keep records in memory "
+                "and cannot archive seasons"
+            )
+        before = data.get(CONF_BEFORE) or dt_util.now().date()
+        try:
+            archived = await garden_data.async_archive(before)
+        except Exception as e:
+            _LOGGER.error("Error archiving seasons: %s", str(e))
+            raise HomeAssistantError(f"Error archiving seasons: {e}") from e
+        return {"archived": archived, "seasons": garden_data.archive.seasons}
+
+    async def import_records(entry: ConfigEntry, entry_data: Dict, data: Dict) -> dict:
+        """Handle import records service call."""
+        if CONF_RECORDS not in data and CONF_FILE not in data:
+            raise ServiceValidationError("Provide records or a file to import")
+        rows = list(data.get(CONF_RECORDS, []))
+        if CONF_FILE in data:
+            path = _resolve_path(hass, data[CONF_FILE])
+            try:
+                rows.extend(await hass.async_add_executor_job(read_records, path))
+            except (OSError, ValueError) as e:
+                raise ServiceValidationError(
+                    f"Cannot read {data[CONF_FILE]}: {e}"
+                ) from e
+
+        records, errors = await hass.async_add_executor_job(
+            _validate_import, rows, data.get(CONF_RECORD_TYPE)
+        )
+        if errors:
+            # Nothing is imported unless every record is valid
+            raise ServiceValidationError(
+                f"{len(errors)} invalid records, nothing was imported: "
+                + "; ".join(errors[:5])
+            )
+        try:
+            await entry_data["garden_data"].async_add_records(records)
+        except Exception as e:
+            _LOGGER.error("Error importing records: %s", str(e))
+            raise HomeAssistantError(f"Error importing records: {e}") from e
+        counts = Counter(kind for kind, _record in records)
+        _LOGGER.debug("Imported %s garden records", len(records))
+        return {"imported": {kind: counts[kind] for kind in RECORD_TYPES}}
+
+    async def export_records(entry: ConfigEntry, entry_data: Dict, data: Dict) -> dict:
+        """Handle export records service call."""
+        path = _resolve_path(hass, data[CONF_FILE])
+        try:
+            exporter = RecordExporter(path)
+        except ValueError as e:
+            raise ServiceValidationError(str(e)) from e
+        kinds = [data[CONF_RECORD_TYPE]] if CONF_RECORD_TYPE in data else RECORD_TYPES
+        start_date = data[CONF_START_DATE].isoformat() if CONF_START_DATE in data else None
+        end_date = data[CONF_END_DATE].isoformat() if CONF_END_DATE in data else None
+
+        garden_data = entry_data["garden_data"]
+        try:
+            await hass.async_add_executor_job(exporter.open)
+            try:
+                # Only one page of records is held at a time; archived
+                # seasons are always exported
+                for kind in kinds:
+                    after = None
+                    while True:
+                        records, after = await garden_data.async_query_page(
+                            kind,
+                            plant=data.get(CONF_PLANT),
+                            location=data.get(CONF_LOCATION),
+                            start_date=start_date,
+                            end_date=end_date,
+                            limit=EXPORT_PAGE_SIZE,
+                            after=after,
+                            include_archive=True,
+                        )
+                        await hass.async_add_executor_job(
+                            exporter.write, kind, records
+                        )
+                        if after is None:
+                            break
+            except Exception:
+                await hass.async_add_executor_job(exporter.close, False)
+                raise
+            await hass.async_add_executor_job(exporter.close)
+        except Exception as e:
+            _LOGGER.error("Error exporting records: %s", str(e))
+            raise HomeAssistantError(f"Error exporting records: {e}") from e
+        return {"file": path, "exported": exporter.count}
+
+    async def clear_llm_cache(
+        entry: ConfigEntry, entry_data: Dict, data: Dict
+    ) -> dict:
+        """Handle clear LLM cache service call."""
+        # The cache is shared, so this clears it for all gardens
+        pool = hass.data[DATA_LLM_POOL]
+        removed = pool.cache.invalidate(data.get(CONF_KIND))
+        return {"removed": removed, **pool.cache.stats}
+
+    def _routed(service: str, handler):
+        """Route a service call to its garden and time it there."""
+
+        async def _async_handle(call: ServiceCall):
+            entry, entry_data = _async_get_entry(hass, call)
+            data = {
+                key: value for key, value in call.data.items() if key != CONF_ENTRY_ID
+            }
+            with entry_data["instrumentation"].timer(f"service.{service}"):
+                return await handler(entry, entry_data, data)
+
+        return _async_handle
+
     # Register services
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_GENERATE_PLANTING_PLAN,
-        generate_planting_plan,
-        schema=GENERATE_PLANTING_PLAN_SCHEMA,
-    )
-    
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_RECORD_PLANTING,
-        record_planting,
-        schema=RECORD_PLANTING_SCHEMA,
-    )
-    
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_RECORD_HARVEST,
-        record_harvest,
-        schema=RECORD_HARVEST_SCHEMA,
-    )
+    for service, handler, schema, supports_response in (
+        (
+            SERVICE_GENERATE_PLANTING_PLAN,
+            generate_planting_plan,
+            GENERATE_PLANTING_PLAN_SCHEMA,
+            SupportsResponse.OPTIONAL,
+        ),
+        (
+            SERVICE_RECORD_PLANTING,
+            record_planting,
+            RECORD_PLANTING_SCHEMA,
+            SupportsResponse.NONE,
+        ),
+        (
+            SERVICE_RECORD_HARVEST,
+            record_harvest,
+            RECORD_HARVEST_SCHEMA,
+            SupportsResponse.NONE,
+        ),
+        (
+            SERVICE_GET_GARDEN_STATUS,
+            get_garden_status,
+            GET_GARDEN_STATUS_SCHEMA,
+            SupportsResponse.ONLY,
+        ),
+        (
+            SERVICE_GET_CARE_RECOMMENDATIONS,
+            get_care_recommendations,
+            GET_CARE_RECOMMENDATIONS_SCHEMA,
+            SupportsResponse.ONLY,
+        ),
+        (
+            SERVICE_GET_YIELD_SUMMARY,
+            get_yield_summary,
+            GET_YIELD_SUMMARY_SCHEMA,
+            SupportsResponse.ONLY,
+        ),
+        (
+            SERVICE_GET_CALENDAR,
+            get_calendar,
+            GET_CALENDAR_SCHEMA,
+            SupportsResponse.ONLY,
+        ),
+        (
+            SERVICE_GET_JOB,
+            get_job,
+            GET_JOB_SCHEMA,
+            SupportsResponse.ONLY,
+        ),
+        (
+            SERVICE_IMPORT_RECORDS,
+            import_records,
+            IMPORT_RECORDS_SCHEMA,
+            SupportsResponse.OPTIONAL,
+        ),
+        (
+            SERVICE_EXPORT_RECORDS,
+            export_records,
+            EXPORT_RECORDS_SCHEMA,
+            SupportsResponse.OPTIONAL,
+        ),
+        (
+            SERVICE_ARCHIVE_SEASONS,
+            archive_seasons,
+            ARCHIVE_SEASONS_SCHEMA,
+            SupportsResponse.OPTIONAL,
+        ),
+        (
+            SERVICE_CLEAR_LLM_CACHE,
+            clear_llm_cache,
+            CLEAR_LLM_CACHE_SCHEMA,
+            SupportsResponse.OPTIONAL,
+        ),
+    ):
+        hass.services.async_register(
+            DOMAIN,
+            service,
+            _routed(service, handler),
+            schema=schema,
+            supports_response=supports_response,
+        )
+
+    return True
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Smart Home Farming from a config entry."""
+    # Set up core functionality
+    from .core import async_setup_entry as async_setup_core
     
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_GET_GARDEN_STATUS,
-        get_garden_status,
+    if not await async_setup_core(hass, entry):
+        return False
+
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+
+    # Set up platforms
+    if PLATFORMS:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+    # Jobs run against this entry's garden; handlers are registered before
+    # the workers start, so queued and resumed jobs can run right away
+    jobs = entry_data["jobs"]
+    jobs.register_handler(
+        JOB_TYPE_PLANTING_PLAN,
+        partial(_async_run_planting_plan_job, hass, entry, entry_data),
     )
+    jobs.async_start(entry)
+
+    # Option and bed changes take effect by reloading the garden
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a garden after its options or beds were changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Unload platforms
@@ -156,16 +816,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         if not unload_ok:
             return False
 
-    # Remove services
-    for service in [
-        SERVICE_GENERATE_PLANTING_PLAN,
-        SERVICE_RECORD_PLANTING,
-        SERVICE_RECORD_HARVEST,
-        SERVICE_GET_GARDEN_STATUS,
-    ]:
-        if hass.services.has_service(DOMAIN, service):
-            hass.services.async_remove(DOMAIN, service)
+    # Services stay registered for the other gardens; calls for this one
+    # are rejected once its data is removed
 
     # Unload core functionality
     from .core import async_unload_entry as async_unload_core
     return await async_unload_core(hass, entry)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove a config entry."""
+    from .core import async_remove_entry as async_remove_core
+    await async_remove_core(hass, entry)
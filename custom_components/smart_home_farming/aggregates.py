@@ -0,0 +1,92 @@
+"""Incrementally maintained garden aggregates for Smart Home Farming."""
+from typing import Dict, Iterable, Optional
+
+from .util import normalize_name, record_date
+
+# Collections the aggregates are built from
+AGGREGATED_COLLECTIONS = ("planting_records", "harvest_records")
+
+
+class GardenAggregates:
+    """Garden summaries updated one record at a time.
+
+    Adding a record touches only the entries for its plant and bed, so
+    sensors never need to rescan the history. Keys are normalized names;
+    ``labels`` keeps the name as first recorded. Season yields come from
+    the yield rollups of the garden data.
+    """
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.labels: Dict[str, str] = {}
+        self.last_planted: Dict[str, Dict] = {}
+        self.last_harvested: Dict[str, Dict] = {}
+        # Latest planting of each plant per bed
+        self.bed_plantings: Dict[str, Dict[str, Dict]] = {}
+
+    @classmethod
+    def from_records(
+        cls,
+        collections: Dict[str, Iterable[Dict]],
+        labels: Optional[Dict[str, str]] = None,
+    ) -> "GardenAggregates":
+        """Build aggregates from record collections in insertion order.
+
+        ``labels`` are the names as first recorded, for when only the latest
+        records are passed.
+        """
+        aggregates = cls()
+        aggregates.labels.update(labels or {})
+        for kind in AGGREGATED_COLLECTIONS:
+            for record in collections.get(kind, []):
+                aggregates.add(kind, record)
+        return aggregates
+
+    def _key(self, name) -> str:
+        """Return the normalized key of a name and remember its label."""
+        key = normalize_name(name)
+        self.labels.setdefault(key, str(name))
+        return key
+
+    @staticmethod
+    def _is_latest(latest: Optional[Dict], record: Dict) -> bool:
+        """Return True if a record is not older than the current latest."""
+        if latest is None:
+            return True
+        return (record_date(record) or "") >= (record_date(latest) or "")
+
+    def add(self, kind: str, record: Dict) -> None:
+        """Fold one new record into the aggregates."""
+        plant = record.get("plant")
+        if kind not in AGGREGATED_COLLECTIONS or not plant:
+            return
+        plant_key = self._key(plant)
+
+        if kind == "planting_records":
+            if self._is_latest(self.last_planted.get(plant_key), record):
+                self.last_planted[plant_key] = record
+            location = record.get("location")
+            if location:
+                bed = self.bed_plantings.setdefault(self._key(location), {})
+                if self._is_latest(bed.get(plant_key), record):
+                    bed[plant_key] = record
+            return
+
+        if self._is_latest(self.last_harvested.get(plant_key), record):
+            self.last_harvested[plant_key] = record
+
+    def bed_occupancy(self, bed: str) -> Dict[str, str]:
+        """Return the plants growing in a bed with their planting dates.
+
+        A plant counts as growing until it is harvested on or after the
+        date it was last planted in the bed.
+        """
+        growing = {}
+        plantings = self.bed_plantings.get(normalize_name(bed), {})
+        for plant_key, planting in plantings.items():
+            planted = record_date(planting) or ""
+            harvest = self.last_harvested.get(plant_key)
+            if harvest is not None and (record_date(harvest) or "") >= planted:
+                continue
+            growing[self.labels[plant_key]] = planted or None
+        return growing
@@ -19,7 +19,29 @@ from .const import (
     BED_TYPES,
     SUNLIGHT_TYPES,
     BED_TYPE_TRANSLATIONS,
-    SUNLIGHT_TYPE_TRANSLATIONS
+    SUNLIGHT_TYPE_TRANSLATIONS,
+    CONF_STORAGE_BACKEND,
+    STORAGE_BACKEND_STORE,
+    STORAGE_BACKEND_JOURNAL,
+    STORAGE_BACKENDS,
+    CONF_JOURNAL_COMPACT_SIZE,
+    DEFAULT_JOURNAL_COMPACT_SIZE,
+    CONF_INSTRUMENTATION,
+    DEFAULT_INSTRUMENTATION,
+    CONF_COMMIT_DELAY,
+    CONF_MAX_COMMIT_LATENCY,
+    DEFAULT_COMMIT_DELAY,
+    DEFAULT_MAX_COMMIT_LATENCY,
+    CONF_LLM_BACKEND,
+    CONF_BASE_URL,
+    CONF_MODEL,
+    LLM_BACKEND_GEMINI,
+    LLM_BACKEND_OPENAI,
+    LLM_BACKENDS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_REQUESTS_PER_MINUTE,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -67,6 +89,10 @@ class SmartHomeFarmingConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {
                     vol.Required(CONF_API_KEY): str,
                     vol.Required(CONF_LOCATION): vol.In(zone_names),
+                    # Fixed once the entry exists; records are not migrated
+                    vol.Required(
+                        CONF_STORAGE_BACKEND, default=STORAGE_BACKEND_STORE
+                    ): vol.In(STORAGE_BACKENDS),
                 }
             ),
             errors=errors,
@@ -148,6 +174,7 @@ class SmartHomeFarmingOptionsFlow(config_entries.OptionsFlow):
     def __init__(self, config_entry):
         """Initialize options flow."""
         self.config_entry = config_entry
+        self.options = dict(config_entry.options)
         self.beds = config_entry.data.get(CONF_BEDS, []).copy()
         self._bed_count = {
             "raised_bed": 0,
@@ -171,7 +198,101 @@ class SmartHomeFarmingOptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
-        return await self.async_step_add_bed()
+        return await self.async_step_llm()
+
+    async def async_step_llm(self, user_input=None):
+        """Choose which LLM backend answers requests."""
+        errors = {}
+
+        if user_input is not None:
+            if (
+                user_input[CONF_LLM_BACKEND] == LLM_BACKEND_OPENAI
+                and not user_input.get(CONF_BASE_URL)
+            ):
+                errors[CONF_BASE_URL] = "base_url_required"
+            else:
+                self.options.update(user_input)
+                return await self.async_step_storage()
+
+        return self.async_show_form(
+            step_id="llm",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_LLM_BACKEND,
+                        default=self.options.get(CONF_LLM_BACKEND, LLM_BACKEND_GEMINI),
+                    ): vol.In(LLM_BACKENDS),
+                    vol.Optional(
+                        CONF_BASE_URL,
+                        default=self.options.get(CONF_BASE_URL, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_MODEL,
+                        default=self.options.get(CONF_MODEL, ""),
+                    ): str,
+                    vol.Required(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=self.options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Required(
+                        CONF_REQUESTS_PER_MINUTE,
+                        default=self.options.get(
+                            CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_storage(self, user_input=None):
+        """Configure garden storage and diagnostics."""
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MAX_COMMIT_LATENCY] < user_input[CONF_COMMIT_DELAY]:
+                errors[CONF_MAX_COMMIT_LATENCY] = "commit_latency_too_short"
+            else:
+                self.options.update(user_input)
+                return await self.async_step_add_bed()
+
+        schema = {
+            vol.Required(
+                CONF_COMMIT_DELAY,
+                default=self.options.get(CONF_COMMIT_DELAY, DEFAULT_COMMIT_DELAY),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+            vol.Required(
+                CONF_MAX_COMMIT_LATENCY,
+                default=self.options.get(
+                    CONF_MAX_COMMIT_LATENCY, DEFAULT_MAX_COMMIT_LATENCY
+                ),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=600)),
+        }
+        # Only the journal backend is compacted
+        if self.config_entry.data.get(CONF_STORAGE_BACKEND) == STORAGE_BACKEND_JOURNAL:
+            schema[
+                vol.Required(
+                    CONF_JOURNAL_COMPACT_SIZE,
+                    default=self.options.get(
+                        CONF_JOURNAL_COMPACT_SIZE, DEFAULT_JOURNAL_COMPACT_SIZE
+                    ),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=64 * 1024))
+        schema[
+            vol.Required(
+                CONF_INSTRUMENTATION,
+                default=self.options.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION),
+            )
+        ] = bool
+
+        return self.async_show_form(
+            step_id="storage",
+            data_schema=vol.Schema(schema),
+            errors=errors,
+        )
 
     async def async_step_add_bed(self, user_input=None):
         """Handle adding a bed in options."""
@@ -214,11 +335,15 @@ class SmartHomeFarmingOptionsFlow(config_entries.OptionsFlow):
                     }
                     self.beds.append(bed_data)
                 
-                # Update config entry with new beds
-                new_data = dict(self.config_entry.data)
-                new_data[CONF_BEDS] = self.beds
-                self.hass.config_entries.async_update_entry(self.config_entry, data=new_data)
-                return self.async_create_entry(title="", data={})
+                # Update config entry with new beds; each update reloads
+                # the garden, so skip it when no bed was added
+                if self.beds != self.config_entry.data.get(CONF_BEDS, []):
+                    new_data = dict(self.config_entry.data)
+                    new_data[CONF_BEDS] = self.beds
+                    self.hass.config_entries.async_update_entry(
+                        self.config_entry, data=new_data
+                    )
+                return self.async_create_entry(title="", data=self.options)
 
         return self.async_show_form(
             step_id="add_bed",
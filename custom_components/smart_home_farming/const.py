@@ -54,13 +54,141 @@ SUNLIGHT_TYPE_TRANSLATIONS = {
 STORAGE_KEY = "garden_data"
 STORAGE_VERSION = 1
 
+# Write-behind commit settings (seconds)
+CONF_COMMIT_DELAY = "commit_delay"
+CONF_MAX_COMMIT_LATENCY = "max_commit_latency"
+DEFAULT_COMMIT_DELAY = 2.0
+DEFAULT_MAX_COMMIT_LATENCY = 10.0
+
+# Suffix of the storage files of a garden; empty for the first garden,
+# which keeps the files used before gardens were stored separately
+CONF_STORAGE_ID = "storage_id"
+
+# Storage backends
+CONF_STORAGE_BACKEND = "storage_backend"
+STORAGE_BACKEND_STORE = "store"
+STORAGE_BACKEND_JOURNAL = "journal"
+STORAGE_BACKEND_SQLITE = "sqlite"
+STORAGE_BACKENDS = [
+    STORAGE_BACKEND_STORE,
+    STORAGE_BACKEND_JOURNAL,
+    STORAGE_BACKEND_SQLITE,
+]
+
+# Journal compaction threshold (bytes)
+CONF_JOURNAL_COMPACT_SIZE = "journal_compact_size"
+DEFAULT_JOURNAL_COMPACT_SIZE = 1024 * 1024
+
+# Archived seasons kept in memory after a query reached into them
+DEFAULT_ARCHIVE_CACHE_SIZE = 4
+
+# LLM response cache
+CACHE_KIND_PLANTING_PLAN = "planting_plan"
+CACHE_KIND_CARE = "care"
+CACHE_KINDS = [CACHE_KIND_PLANTING_PLAN, CACHE_KIND_CARE]
+DEFAULT_CACHE_SIZE = 256
+CACHE_TTLS = {
+    CACHE_KIND_PLANTING_PLAN: 30 * 24 * 3600,
+    CACHE_KIND_CARE: 90 * 24 * 3600,
+}
+
+# LLM backends
+CONF_LLM_BACKEND = "llm_backend"
+CONF_BASE_URL = "base_url"
+CONF_MODEL = "model"
+LLM_BACKEND_GEMINI = "gemini"
+LLM_BACKEND_OPENAI = "openai"
+LLM_BACKEND_FAKE = "fake"
+LLM_BACKENDS = [LLM_BACKEND_GEMINI, LLM_BACKEND_OPENAI, LLM_BACKEND_FAKE]
+DEFAULT_GEMINI_MODEL = "gemini-pro"
+
+# Upstream LLM request concurrency
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 2
+
+# Upstream LLM rate limit, retries and circuit breaker
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+DEFAULT_REQUESTS_PER_MINUTE = 60
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 20.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 60.0
+
+# Token budget for the season plantings added to planting plan prompts
+DEFAULT_HISTORY_TOKENS = 300
+
+# Performance instrumentation
+CONF_INSTRUMENTATION = "instrumentation"
+DEFAULT_INSTRUMENTATION = False
+
+# Dispatcher signal for added garden records, suffixed with the entry ID
+SIGNAL_GARDEN_UPDATED = f"{DOMAIN}_garden_updated"
+
+# hass.data key of the LLM clients and cache shared by all gardens
+DATA_LLM_POOL = f"{DOMAIN}_llm_pool"
+
+# Background jobs
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_MAX_QUEUED_JOBS = 50
+MAX_FINISHED_JOBS = 100
+
+# Added records kept for get_garden_status calls with since_revision
+CHANGE_LOG_SIZE = 1000
+
+JOB_PRIORITY_INTERACTIVE = "interactive"
+JOB_PRIORITY_SCHEDULED = "scheduled"
+# Highest priority first
+JOB_PRIORITIES = [JOB_PRIORITY_INTERACTIVE, JOB_PRIORITY_SCHEDULED]
+JOB_TYPE_PLANTING_PLAN = "planting_plan"
+
 # Services
 SERVICE_GENERATE_PLANTING_PLAN = "generate_planting_plan"
 SERVICE_RECORD_PLANTING = "record_planting"
 SERVICE_RECORD_HARVEST = "record_harvest"
 SERVICE_GET_GARDEN_STATUS = "get_garden_status"
+SERVICE_CLEAR_LLM_CACHE = "clear_llm_cache"
+SERVICE_GET_CARE_RECOMMENDATIONS = "get_care_recommendations"
+SERVICE_GET_YIELD_SUMMARY = "get_yield_summary"
+SERVICE_GET_CALENDAR = "get_calendar"
+SERVICE_ARCHIVE_SEASONS = "archive_seasons"
+SERVICE_GET_JOB = "get_job"
+SERVICE_IMPORT_RECORDS = "import_records"
+SERVICE_EXPORT_RECORDS = "export_records"
+
+# Events
+EVENT_PLAN_CHUNK = f"{DOMAIN}_plan_chunk"
+EVENT_JOB_DONE = f"{DOMAIN}_job_done"
 
 # Service parameters
 CONF_AVAILABLE_SPACE = "available_space"
 CONF_DESIRED_PLANTS = "desired_plants"
 CONF_PLANTING_DATE = "planting_date"
+CONF_STREAM = "stream"
+CONF_PLANT = "plant"
+CONF_START_DATE = "start_date"
+CONF_END_DATE = "end_date"
+CONF_RECORD_TYPE = "record_type"
+CONF_LIMIT = "limit"
+CONF_CURSOR = "cursor"
+CONF_SINCE_REVISION = "since_revision"
+CONF_KIND = "kind"
+CONF_PLANTS = "plants"
+CONF_GROUP_BY = "group_by"
+CONF_BUCKETS = "buckets"
+CONF_DAYS = "days"
+CONF_BEFORE = "before"
+CONF_PRIORITY = "priority"
+CONF_JOB_ID = "job_id"
+CONF_ENTRY_ID = "entry_id"
+CONF_RECORDS = "records"
+CONF_FILE = "file"
+
+# Days get_calendar looks ahead by default
+DEFAULT_CALENDAR_DAYS = 7
+
+# Largest page get_garden_status returns per record type
+MAX_STATUS_LIMIT = 1000
+
+# Records export_records reads and writes at a time
+EXPORT_PAGE_SIZE = 500
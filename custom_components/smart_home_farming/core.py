@@ -1,12 +1,37 @@
 """Core component logic for Smart Home Farming."""
 import logging
 import voluptuous as vol
-from homeassistant.const import CONF_API_KEY, CONF_LOCATION
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_LOCATION,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+)
 import homeassistant.helpers.config_validation as cv
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.start import async_at_started
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_COMMIT_DELAY,
+    CONF_MAX_COMMIT_LATENCY,
+    DEFAULT_COMMIT_DELAY,
+    DEFAULT_MAX_COMMIT_LATENCY,
+    CONF_STORAGE_BACKEND,
+    STORAGE_BACKEND_STORE,
+    STORAGE_BACKEND_JOURNAL,
+    STORAGE_BACKEND_SQLITE,
+    CONF_JOURNAL_COMPACT_SIZE,
+    DEFAULT_JOURNAL_COMPACT_SIZE,
+    CONF_INSTRUMENTATION,
+    DEFAULT_INSTRUMENTATION,
+    SIGNAL_GARDEN_UPDATED,
+    CONF_BEDS,
+    CONF_STORAGE_ID,
+    DATA_LLM_POOL,
+)
+from .metrics import Instrumentation
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,26 +69,153 @@ async def async_setup(hass: HomeAssistant, config: dict):
     return True
 
 
+@callback
+def _async_storage_id(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the storage ID of an entry, assigning one on first setup.
+
+    The first garden keeps the storage files that all entries shared
+    before; every other garden gets files of its own.
+    """
+    if CONF_STORAGE_ID not in entry.data:
+        claimed = any(
+            other.data.get(CONF_STORAGE_ID) == ""
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        )
+        hass.config_entries.async_update_entry(
+            entry,
+            data={**entry.data, CONF_STORAGE_ID: entry.entry_id if claimed else ""},
+        )
+    return entry.data[CONF_STORAGE_ID]
+
+
+@callback
+def _async_storage_backend(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the storage backend of an entry, fixing it on first setup.
+
+    Earlier versions chose the backend in the options. The backend in use
+    is moved to the entry data, since switching it would lose records.
+    """
+    if CONF_STORAGE_BACKEND not in entry.data:
+        options = dict(entry.options)
+        backend = options.pop(CONF_STORAGE_BACKEND, STORAGE_BACKEND_STORE)
+        hass.config_entries.async_update_entry(
+            entry,
+            data={**entry.data, CONF_STORAGE_BACKEND: backend},
+            options=options,
+        )
+    return entry.data[CONF_STORAGE_BACKEND]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up Smart Home Farming from a config entry."""
-    api_key = entry.data[CONF_API_KEY]
     location = entry.data[CONF_LOCATION]
 
     # Initialize services and data storage
     hass.data.setdefault(DOMAIN, {})
 
-    # Initialize the LLM API
+    instrumentation = Instrumentation(
+        entry.options.get(CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION)
+    )
+
+    # Clients and the response cache are shared by all gardens
+    from .llm_pool import LLMClientPool
+    pool = hass.data.get(DATA_LLM_POOL)
+    if pool is None:
+        pool = hass.data[DATA_LLM_POOL] = LLMClientPool(hass)
+    await pool.async_load()
+    llm_cache = pool.cache
+
+    from .prompt_context import PromptContext
+    context = PromptContext(location, entry.data.get(CONF_BEDS, []))
+
     from .llm_api import LLMApi
-    llm_api = LLMApi(api_key, location)
+    backend, limits = pool.acquire(entry)
+    llm_api = LLMApi(
+        backend,
+        location,
+        cache=llm_cache,
+        instrumentation=instrumentation,
+        context=context,
+        limits=limits,
+    )
     
+    async def _async_warm_llm(hass: HomeAssistant) -> None:
+        """Build the LLM client once Home Assistant has started."""
+        try:
+            await llm_api.async_setup()
+        except Exception as e:
+            # The client is built again on first use
+            _LOGGER.warning("Could not initialize the LLM client: %s", str(e))
+
+    entry.async_on_unload(async_at_started(hass, _async_warm_llm))
+
     # Initialize garden data storage
-    from .garden_data import GardenData
-    garden_data = GardenData(hass)
+    storage_options = {
+        "commit_delay": entry.options.get(CONF_COMMIT_DELAY, DEFAULT_COMMIT_DELAY),
+        "max_commit_latency": entry.options.get(
+            CONF_MAX_COMMIT_LATENCY, DEFAULT_MAX_COMMIT_LATENCY
+        ),
+        "instrumentation": instrumentation,
+        "storage_id": _async_storage_id(hass, entry),
+    }
+    backend = _async_storage_backend(hass, entry)
+    if backend == STORAGE_BACKEND_JOURNAL:
+        from .garden_journal import JournalGardenData
+        garden_data = JournalGardenData(
+            hass,
+            compact_size=entry.options.get(
+                CONF_JOURNAL_COMPACT_SIZE, DEFAULT_JOURNAL_COMPACT_SIZE
+            ),
+            **storage_options,
+        )
+    elif backend == STORAGE_BACKEND_SQLITE:
+        from .garden_sqlite import SQLiteGardenData
+        garden_data = SQLiteGardenData(hass, **storage_options)
+    else:
+        from .garden_data import GardenData
+        garden_data = GardenData(hass, **storage_options)
     await garden_data.async_load()
 
+    # Summaries for the sensors are built once here by the storage backend
+    # and then kept current record by record
+    aggregates = await garden_data.async_build_aggregates()
+    context.aggregates = aggregates
+    update_signal = f"{SIGNAL_GARDEN_UPDATED}_{entry.entry_id}"
+
+    @callback
+    def _async_record_added(kind: str, record: dict) -> None:
+        """Fold a new record into the aggregates and notify the sensors."""
+        aggregates.add(kind, record)
+        async_dispatcher_send(hass, update_signal, kind, record)
+
+    entry.async_on_unload(garden_data.async_add_listener(_async_record_added))
+
+    async def _async_flush_on_final_write(event: Event) -> None:
+        """Commit pending garden writes before Home Assistant shuts down."""
+        await garden_data.async_flush()
+
+    # Not a once-listener: the entry usually unloads after the event fired,
+    # and removing a once-listener that already ran logs an error
+    entry.async_on_unload(
+        hass.bus.async_listen(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, _async_flush_on_final_write
+        )
+    )
+
+    # Long running requests are queued as jobs; the workers are started
+    # once the job handlers are registered
+    from .jobs import JobQueue
+    jobs = JobQueue(hass, storage_options["storage_id"])
+    await jobs.async_load()
+
     hass.data[DOMAIN][entry.entry_id] = {
         "llm_api": llm_api,
+        "llm_cache": llm_cache,
         "garden_data": garden_data,
+        "instrumentation": instrumentation,
+        "aggregates": aggregates,
+        "jobs": jobs,
     }
 
     _LOGGER.info("Setting up Smart Home Farming component with location: %s", location)
@@ -74,14 +226,34 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
     # Clean up component data
     if entry.entry_id in hass.data[DOMAIN]:
+        # Stop the job workers and save the jobs before a reload reads them
+        jobs = hass.data[DOMAIN][entry.entry_id].get("jobs")
+        if jobs:
+            await jobs.async_close()
+
         # Get the garden data instance
         garden_data = hass.data[DOMAIN][entry.entry_id].get("garden_data")
         if garden_data:
-            # Save any pending data
-            await garden_data.async_save()
-        
+            # Force out any writes still waiting for their commit
+            await garden_data.async_flush()
+            await garden_data.async_close()
+
         # Remove the entry data
         hass.data[DOMAIN].pop(entry.entry_id)
 
+    pool = hass.data.get(DATA_LLM_POOL)
+    if pool is not None:
+        pool.release(entry.entry_id)
+        await pool.cache.async_save()
+        if not pool.in_use:
+            hass.data.pop(DATA_LLM_POOL)
+
     _LOGGER.info("Unloading Smart Home Farming component")
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the files a removed garden no longer needs."""
+    if CONF_STORAGE_ID in entry.data:
+        from .jobs import async_remove_jobs
+        await async_remove_jobs(hass, entry.data[CONF_STORAGE_ID])
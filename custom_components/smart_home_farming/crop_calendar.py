@@ -0,0 +1,123 @@
+"""Sowing calendar and harvest forecasts for Smart Home Farming."""
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .crops import CALENDAR, crop_key
+from .util import record_date
+
+ZONE_COOL = "cool"
+ZONE_TEMPERATE = "temperate"
+ZONE_WARM = "warm"
+CLIMATE_ZONES = [ZONE_COOL, ZONE_TEMPERATE, ZONE_WARM]
+
+# Months the sowing windows start and end later than in a temperate zone
+ZONE_SHIFTS = {
+    ZONE_COOL: (1, 0),
+    ZONE_TEMPERATE: (0, 0),
+    ZONE_WARM: (-1, 1),
+}
+
+
+def climate_zone(latitude: float) -> str:
+    """Return a rough climate zone for a latitude."""
+    if abs(latitude) >= 55:
+        return ZONE_COOL
+    if abs(latitude) >= 40:
+        return ZONE_TEMPERATE
+    return ZONE_WARM
+
+
+class CropCalendar:
+    """Sowing months and harvest timing of the bundled crops in one zone.
+
+    Crops are rows of a few NumPy arrays, so a forecast for any number of
+    plantings is a handful of array operations.
+    """
+
+    def __init__(self, zone: str, southern: bool = False):
+        """Build the calendar of a climate zone and hemisphere."""
+        self.zone = zone
+        self.names = list(CALENDAR)
+        self.index = {name: row for row, name in enumerate(self.names)}
+        first, last, maturity, harvest = (
+            np.array(column) for column in zip(*CALENDAR.values())
+        )
+        self.maturity = maturity.astype("timedelta64[D]")
+        self.harvest = harvest.astype("timedelta64[D]")
+
+        # Zero-based sowing months; windows may wrap around the new year
+        shift_first, shift_last = ZONE_SHIFTS[zone]
+        offset = 6 if southern else 0
+        start = (first - 1 + shift_first + offset) % 12
+        span = np.clip((last - first) % 12 + shift_last - shift_first, 0, 11)
+        months = np.arange(12)
+        self.sow_months = (
+            (months[np.newaxis, :] - start[:, np.newaxis]) % 12
+        ) <= span[:, np.newaxis]
+
+    def sowing(
+        self, months: Iterable[int], plants: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """Return the crops that can be sown in any of the given months."""
+        rows = self.sow_months[:, [month - 1 for month in months]].any(axis=1)
+        if plants is None:
+            return [name for name, sow in zip(self.names, rows) if sow]
+        result = []
+        for plant in plants:
+            row = self.index.get(crop_key(plant))
+            if row is not None and rows[row]:
+                result.append(plant)
+        return result
+
+    def forecast(self, plantings: List[Dict]) -> Dict[str, np.ndarray]:
+        """Return the expected harvest window of every planting.
+
+        ``known`` marks plantings of a bundled crop with a valid date;
+        ``start`` and ``end`` are only meaningful where it is set.
+        """
+        rows = np.array(
+            [
+                self.index.get(crop_key(record.get("plant", "")), -1)
+                for record in plantings
+            ],
+            dtype=np.intp,
+        )
+        planted = np.array(
+            [record_date(record) or "NaT" for record in plantings],
+            dtype="datetime64[D]",
+        )
+        known = (rows >= 0) & ~np.isnat(planted)
+        start = planted + self.maturity[rows]
+        return {"known": known, "start": start, "end": start + self.harvest[rows]}
+
+    def harvests_between(
+        self, plantings: List[Dict], first: date, last: date
+    ) -> List[Dict]:
+        """Return the plantings expected to be harvestable between two dates."""
+        if not plantings:
+            return []
+        windows = self.forecast(plantings)
+        due = (
+            windows["known"]
+            & (windows["start"] <= np.datetime64(last, "D"))
+            & (windows["end"] >= np.datetime64(first, "D"))
+        )
+        return [
+            {
+                "plant": plantings[position].get("plant"),
+                "location": plantings[position].get("location"),
+                "planted": record_date(plantings[position]),
+                "harvest_from": str(windows["start"][position]),
+                "harvest_until": str(windows["end"][position]),
+            }
+            for position in np.flatnonzero(due)
+        ]
+
+
+@lru_cache(maxsize=None)
+def crop_calendar(zone: str, southern: bool = False) -> CropCalendar:
+    """Return the shared calendar of a climate zone and hemisphere."""
+    return CropCalendar(zone, southern)
@@ -0,0 +1,119 @@
+"""Bundled crop data for Smart Home Farming."""
+from typing import Dict, Optional, Tuple
+
+from .util import normalize_name
+
+SUN_FULL = "full"
+SUN_PARTIAL = "partial"
+
+# Row spacing and in-row spacing in cm, light needs and frost tolerance
+CROPS: Dict[str, Dict] = {
+    "basil": {"row_cm": 30, "plant_cm": 25, "sun": SUN_FULL, "frost_tender": True},
+    "bean": {"row_cm": 45, "plant_cm": 10, "sun": SUN_FULL, "frost_tender": True},
+    "beetroot": {"row_cm": 30, "plant_cm": 10, "sun": SUN_PARTIAL, "frost_tender": False},
+    "broccoli": {"row_cm": 60, "plant_cm": 45, "sun": SUN_FULL, "frost_tender": False},
+    "cabbage": {"row_cm": 60, "plant_cm": 50, "sun": SUN_FULL, "frost_tender": False},
+    "carrot": {"row_cm": 25, "plant_cm": 5, "sun": SUN_FULL, "frost_tender": False},
+    "cauliflower": {"row_cm": 60, "plant_cm": 50, "sun": SUN_FULL, "frost_tender": False},
+    "chard": {"row_cm": 45, "plant_cm": 25, "sun": SUN_PARTIAL, "frost_tender": False},
+    "corn": {"row_cm": 75, "plant_cm": 25, "sun": SUN_FULL, "frost_tender": True},
+    "cucumber": {"row_cm": 100, "plant_cm": 40, "sun": SUN_FULL, "frost_tender": True},
+    "dill": {"row_cm": 40, "plant_cm": 25, "sun": SUN_FULL, "frost_tender": False},
+    "eggplant": {"row_cm": 70, "plant_cm": 50, "sun": SUN_FULL, "frost_tender": True},
+    "garlic": {"row_cm": 25, "plant_cm": 12, "sun": SUN_FULL, "frost_tender": False},
+    "kale": {"row_cm": 60, "plant_cm": 45, "sun": SUN_PARTIAL, "frost_tender": False},
+    "leek": {"row_cm": 30, "plant_cm": 15, "sun": SUN_FULL, "frost_tender": False},
+    "lettuce": {"row_cm": 30, "plant_cm": 25, "sun": SUN_PARTIAL, "frost_tender": False},
+    "marigold": {"row_cm": 30, "plant_cm": 25, "sun": SUN_FULL, "frost_tender": True},
+    "onion": {"row_cm": 25, "plant_cm": 10, "sun": SUN_FULL, "frost_tender": False},
+    "parsley": {"row_cm": 30, "plant_cm": 20, "sun": SUN_PARTIAL, "frost_tender": False},
+    "pea": {"row_cm": 60, "plant_cm": 5, "sun": SUN_FULL, "frost_tender": False},
+    "pepper": {"row_cm": 50, "plant_cm": 40, "sun": SUN_FULL, "frost_tender": True},
+    "potato": {"row_cm": 70, "plant_cm": 35, "sun": SUN_FULL, "frost_tender": True},
+    "pumpkin": {"row_cm": 150, "plant_cm": 120, "sun": SUN_FULL, "frost_tender": True},
+    "radish": {"row_cm": 15, "plant_cm": 3, "sun": SUN_PARTIAL, "frost_tender": False},
+    "spinach": {"row_cm": 30, "plant_cm": 10, "sun": SUN_PARTIAL, "frost_tender": False},
+    "strawberry": {"row_cm": 60, "plant_cm": 30, "sun": SUN_FULL, "frost_tender": False},
+    "tomato": {"row_cm": 60, "plant_cm": 50, "sun": SUN_FULL, "frost_tender": True},
+    "zucchini": {"row_cm": 100, "plant_cm": 90, "sun": SUN_FULL, "frost_tender": True},
+}
+
+# Crops for unknown plants
+DEFAULT_CROP = {"row_cm": 40, "plant_cm": 30, "sun": SUN_FULL, "frost_tender": False}
+
+# Pairs that help each other
+COMPANIONS = [
+    ("tomato", "basil"), ("tomato", "carrot"), ("tomato", "marigold"),
+    ("tomato", "parsley"), ("carrot", "onion"), ("carrot", "leek"),
+    ("carrot", "pea"), ("cucumber", "dill"), ("cucumber", "bean"),
+    ("bean", "corn"), ("corn", "pumpkin"), ("lettuce", "radish"),
+    ("lettuce", "carrot"), ("cabbage", "dill"), ("onion", "beetroot"),
+    ("strawberry", "spinach"), ("strawberry", "lettuce"), ("potato", "bean"),
+    ("pepper", "basil"), ("zucchini", "marigold"), ("kale", "beetroot"),
+    ("broccoli", "onion"), ("garlic", "strawberry"), ("chard", "onion"),
+]
+
+# Pairs that should not share a bed
+ANTAGONISTS = [
+    ("tomato", "potato"), ("tomato", "cabbage"), ("tomato", "broccoli"),
+    ("tomato", "cauliflower"), ("tomato", "corn"), ("bean", "onion"),
+    ("bean", "garlic"), ("bean", "leek"), ("pea", "onion"), ("pea", "garlic"),
+    ("potato", "cucumber"), ("potato", "pumpkin"), ("potato", "zucchini"),
+    ("carrot", "dill"), ("cabbage", "strawberry"), ("broccoli", "strawberry"),
+]
+
+
+# Sowing or planting-out months in a temperate northern climate, first and
+# last, then days from planting to the first harvest and harvest length
+CALENDAR: Dict[str, Tuple[int, int, int, int]] = {
+    "basil": (4, 6, 60, 60),
+    "bean": (5, 7, 60, 40),
+    "beetroot": (4, 7, 60, 45),
+    "broccoli": (4, 7, 80, 30),
+    "cabbage": (3, 6, 90, 45),
+    "carrot": (3, 7, 75, 60),
+    "cauliflower": (4, 6, 85, 21),
+    "chard": (4, 7, 60, 90),
+    "corn": (5, 6, 90, 21),
+    "cucumber": (5, 6, 60, 45),
+    "dill": (4, 7, 50, 40),
+    "eggplant": (5, 6, 80, 45),
+    "garlic": (9, 11, 240, 30),
+    "kale": (5, 7, 70, 120),
+    "leek": (3, 5, 130, 90),
+    "lettuce": (3, 8, 50, 21),
+    "marigold": (4, 6, 60, 90),
+    "onion": (3, 4, 110, 30),
+    "parsley": (3, 7, 75, 120),
+    "pea": (3, 5, 65, 30),
+    "pepper": (5, 6, 80, 60),
+    "potato": (3, 5, 100, 30),
+    "pumpkin": (5, 6, 110, 30),
+    "radish": (3, 9, 28, 14),
+    "spinach": (3, 9, 45, 21),
+    "strawberry": (7, 8, 300, 30),
+    "tomato": (5, 6, 75, 60),
+    "zucchini": (5, 6, 55, 75),
+}
+
+
+def crop_key(name) -> Optional[str]:
+    """Return the crop table key for a plant name, singular or plural."""
+    key = normalize_name(name)
+    candidates = [key]
+    if key.endswith("ies"):
+        candidates.append(f"{key[:-3]}y")
+    if key.endswith("es"):
+        candidates.append(key[:-2])
+    if key.endswith("s"):
+        candidates.append(key[:-1])
+    for candidate in candidates:
+        if candidate in CROPS:
+            return candidate
+    return None
+
+
+def crop_info(name) -> Dict:
+    """Return the crop data of a plant, or defaults for unknown plants."""
+    key = crop_key(name)
+    return CROPS[key] if key is not None else DEFAULT_CROP
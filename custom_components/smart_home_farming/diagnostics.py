@@ -0,0 +1,34 @@
+"""Diagnostics support for Smart Home Farming."""
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_LLM_POOL
+
+TO_REDACT = {CONF_API_KEY}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "garden_data": entry_data["garden_data"].stats,
+        "llm_cache": entry_data["llm_cache"].stats,
+        "llm_pool": hass.data[DATA_LLM_POOL].stats,
+        "llm_api": {
+            "backend": entry_data["llm_api"].backend.name,
+            "model": entry_data["llm_api"].model_name,
+            **entry_data["llm_api"].stats,
+        },
+        "instrumentation": entry_data["instrumentation"].stats,
+        "jobs": entry_data["jobs"].stats,
+    }
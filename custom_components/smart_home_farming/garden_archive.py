@@ -0,0 +1,213 @@
+"""Compressed season archive for Smart Home Farming garden data."""
+from collections import Counter, OrderedDict
+import gzip
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DEFAULT_ARCHIVE_CACHE_SIZE
+from .util import normalize_name, record_date, storage_name
+from .yields import YieldRollups
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+ARCHIVE_KEY = f"{DOMAIN}.garden_archive"
+ARCHIVE_DIRECTORY = f"{DOMAIN}.archive"
+
+# Records of one season, per collection
+SeasonRecords = Dict[str, List[Dict]]
+
+
+class SeasonArchive:
+    """Closed seasons kept as gzip-compressed JSONL files.
+
+    Only a small index stays in memory: per season its file, date range
+    and record counts, plus the yield rollups of everything archived. The
+    records of a season are read when a query reaches into it and kept in
+    a small LRU cache.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        cache_size: int = DEFAULT_ARCHIVE_CACHE_SIZE,
+        storage_id: Optional[str] = None,
+    ):
+        """Initialize the archive."""
+        self.hass = hass
+        self._store = Store(
+            hass, ARCHIVE_VERSION, storage_name(ARCHIVE_KEY, storage_id)
+        )
+        self._directory = hass.config.path(
+            ".storage", storage_name(ARCHIVE_DIRECTORY, storage_id)
+        )
+        self.seasons: Dict[str, Dict] = {}
+        self.rollups: Optional[Dict] = None
+        self._cache: "OrderedDict[str, SeasonRecords]" = OrderedDict()
+        self._cache_size = cache_size
+        self.season_loads = 0
+        self.cache_hits = 0
+
+    async def async_load(self) -> None:
+        """Load the archive index."""
+        stored = await self._store.async_load()
+        if stored:
+            self.seasons = stored["seasons"]
+            self.rollups = stored.get("rollups")
+
+    def base_rollups(self) -> YieldRollups:
+        """Return fresh rollups holding the archived harvests."""
+        if self.rollups is None:
+            return YieldRollups()
+        return YieldRollups.from_dict(self.rollups)
+
+    @property
+    def end(self) -> Optional[str]:
+        """Return the date of the newest archived record, if any."""
+        return max((info["end"] for info in self.seasons.values()), default=None)
+
+    def _path(self, season: str) -> str:
+        """Return the file of a season."""
+        return os.path.join(self._directory, f"{season}.jsonl.gz")
+
+    def _write_season(self, season: str, records: SeasonRecords) -> Dict:
+        """Write a season file atomically and return its index entry."""
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(season)
+        dates = []
+        with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as archive:
+            for kind, collection in records.items():
+                for record in collection:
+                    dates.append(record_date(record) or "")
+                    archive.write(json_dumps({"type": kind, "record": record}) + "\n")
+        os.replace(f"{path}.tmp", path)
+        return {
+            "start": min(dates),
+            "end": max(dates),
+            "counts": {kind: len(collection) for kind, collection in records.items()},
+        }
+
+    def _read_season(self, season: str) -> SeasonRecords:
+        """Read the records of a season file."""
+        records: SeasonRecords = {}
+        with gzip.open(self._path(season), "rt", encoding="utf-8") as archive:
+            for line in archive:
+                if line.strip():
+                    entry = json.loads(line)
+                    records.setdefault(entry["type"], []).append(entry["record"])
+        return records
+
+    async def async_load_season(self, season: str) -> SeasonRecords:
+        """Return the records of an archived season, from the cache if possible."""
+        records = self._cache.get(season)
+        if records is not None:
+            self._cache.move_to_end(season)
+            self.cache_hits += 1
+            return records
+        records = await self.hass.async_add_executor_job(self._read_season, season)
+        self.season_loads += 1
+        self._cache[season] = records
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return records
+
+    async def async_add(self, moved: Dict[str, SeasonRecords]) -> None:
+        """Archive records per season and save the index.
+
+        Records of a season that is already archived are merged into its
+        file; records already in it are skipped, so repeating an archival
+        that was interrupted does not duplicate them.
+        """
+        rollups = self.base_rollups()
+        for season, records in moved.items():
+            if season in self.seasons:
+                merged = await self.async_load_season(season)
+                for kind, collection in records.items():
+                    existing = merged.setdefault(kind, [])
+                    seen = {json_dumps(record) for record in existing}
+                    added = [r for r in collection if json_dumps(r) not in seen]
+                    existing.extend(added)
+                    records[kind] = added
+            else:
+                merged = records
+            self.seasons[season] = await self.hass.async_add_executor_job(
+                self._write_season, season, merged
+            )
+            self._cache.pop(season, None)
+            rollups.replay(
+                records.get("planting_records", []),
+                records.get("harvest_records", []),
+            )
+        self.rollups = rollups.as_dict()
+        await self._store.async_save({"seasons": self.seasons, "rollups": self.rollups})
+
+    def seasons_between(
+        self, kind: str, start_date: Optional[str], end_date: Optional[str]
+    ) -> List[str]:
+        """Return the seasons holding records of a kind in a date range.
+
+        Seasons never overlap, so ordering them by start also orders their
+        records.
+        """
+        return [
+            season
+            for season, info in sorted(
+                self.seasons.items(), key=lambda item: item[1]["start"]
+            )
+            if info["counts"].get(kind)
+            and not (start_date and info["end"] < start_date)
+            and not (end_date and info["start"] > end_date)
+        ]
+
+    async def async_query_season(
+        self,
+        season: str,
+        kind: str,
+        plant: Optional[str],
+        location: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+    ) -> List[Tuple[Tuple[str, int], Dict]]:
+        """Return the records of a season matching the filters with sort keys.
+
+        Keys number the matches of each date with negative positions, so
+        archived records sort before live records of the same date and a
+        key stays the same whichever season a query starts from.
+        """
+        plant_key = normalize_name(plant) if plant else None
+        location_key = normalize_name(location) if location else None
+        matches = []
+        for record in (await self.async_load_season(season)).get(kind, []):
+            date = record_date(record) or ""
+            if (start_date and date < start_date) or (end_date and date > end_date):
+                continue
+            if plant_key and normalize_name(record.get("plant", "")) != plant_key:
+                continue
+            if location_key and (
+                normalize_name(record.get("location", "")) != location_key
+            ):
+                continue
+            matches.append((date, record))
+        matches.sort(key=lambda match: match[0])
+        per_date = Counter(date for date, _record in matches)
+        keyed = []
+        for date, record in matches:
+            keyed.append(((date, -per_date[date]), record))
+            per_date[date] -= 1
+        return keyed
+
+    @property
+    def stats(self) -> Dict:
+        """Return archive counters."""
+        return {
+            "archived_seasons": len(self.seasons),
+            "cached_seasons": len(self._cache),
+            "season_loads": self.season_loads,
+            "cache_hits": self.cache_hits,
+        }
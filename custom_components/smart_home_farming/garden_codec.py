@@ -0,0 +1,391 @@
+"""Column storage format of Smart Home Farming garden documents."""
+from array import array
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from .util import record_date
+
+RECORD_COLLECTIONS = ("planting_plans", "planting_records", "harvest_records")
+
+# Fields stored in columns, in the order they appear in decoded records;
+# all other fields are kept per record
+NAME_FIELDS = ("plant", "location", "yield_unit")
+DATE_FIELDS = ("date",)
+TIMESTAMP_FIELDS = ("created_at",)
+COLUMNS = (
+    "created_at",
+    "plant",
+    "location",
+    "date",
+    "yield_amount",
+    "yield_quantity",
+    "yield_unit",
+)
+
+# In-memory array type of each typed column and the value marking records
+# without the field; yield_amount is kept in a plain list with None
+COLUMN_TYPES = {
+    "created_at": ("q", -(2 ** 63)),
+    "plant": ("i", -1),
+    "location": ("i", -1),
+    "date": ("i", 0),
+    "yield_quantity": ("d", -1.0),
+    "yield_unit": ("i", -1),
+}
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECOND = timedelta(microseconds=1)
+DAY_MICROSECONDS = 86_400_000_000
+
+
+def _encode_date(value: str) -> Any:
+    """Return an ISO date as its ordinal, or the text if it is not one."""
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        return value
+    return parsed.toordinal() if parsed.isoformat() == value else value
+
+
+def _encode_timestamp(value: str) -> Any:
+    """Return a local ISO timestamp in microseconds, or the text as is.
+
+    Only timestamps that decode to exactly the same text are converted.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return value
+    return (parsed - EPOCH) // MICROSECOND
+
+
+def _decode_timestamp(value: Any) -> Any:
+    """Return the ISO text of an encoded timestamp."""
+    if isinstance(value, int):
+        return (EPOCH + value * MICROSECOND).isoformat()
+    return value
+
+
+@lru_cache(maxsize=4096)
+def iso_date(ordinal: int) -> str:
+    """Return the ISO text of a date ordinal; records share one per day."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _date_ordinal(value: Any) -> int:
+    """Return the ordinal of the day record_date reads from a value, or 0."""
+    day = record_date({"date": value})
+    return date.fromisoformat(day).toordinal() if day else 0
+
+
+# Marks a field value that is kept with its record instead of in a column
+_EXTRA = object()
+
+
+def _fits(field: str, value: Any) -> bool:
+    """Return True if an encoded value can be kept in a typed column."""
+    if type(value) is not (float if field == "yield_quantity" else int):
+        return False
+    return value != COLUMN_TYPES[field][1]
+
+
+class GardenColumns:
+    """A garden in column form, extended record by record.
+
+    This is the only in-memory form of a garden; records are decoded to
+    dicts when they are read. Each collection keeps one typed array per
+    column field, and the remaining fields of each record by position.
+    Plant, bed and unit names are stored once in a shared name table and
+    referred to by index, dates as ordinals and local timestamps as
+    microseconds since 1970.
+
+    Stored documents hold the same columns as lists with None where a
+    record lacks the field, and the remaining fields as [position, fields]
+    pairs.
+    """
+
+    def __init__(self, document: Optional[Dict] = None):
+        """Initialize from a stored document or as an empty garden."""
+        document = document or {}
+        self.names: List[str] = list(document.get("names", []))
+        self._name_ids = {name: name_id for name_id, name in enumerate(self.names)}
+        # Top level keys of the document other than the collections
+        self.meta: Dict = {
+            key: value
+            for key, value in document.items()
+            if key not in RECORD_COLLECTIONS and key != "names"
+        }
+        self._columns: Dict[str, Dict[str, Any]] = {}
+        self._extras: Dict[str, Dict[int, Dict]] = {}
+        amounts: Dict[str, str] = {}
+        for kind in RECORD_COLLECTIONS:
+            stored = document.get(kind) or {"count": 0, "columns": {}, "extra": []}
+            extras = self._extras[kind] = {}
+            for position, rest in stored["extra"]:
+                extras.setdefault(position, {}).update(rest)
+            count = stored["count"]
+            columns = self._columns[kind] = {}
+            for field in COLUMNS:
+                column = stored["columns"].get(field)
+                if column is None:
+                    column = [None] * count
+                if field == "yield_amount":
+                    # Equal amounts share one string
+                    columns[field] = [
+                        amounts.setdefault(value, value)
+                        if isinstance(value, str) else value
+                        for value in column
+                    ]
+                else:
+                    columns[field] = self._load_column(field, column, extras)
+
+    @staticmethod
+    def _load_column(field: str, column: List, extras: Dict[int, Dict]) -> array:
+        """Return a stored column as a typed array.
+
+        Values that do not fit the array, like dates that are not ISO
+        dates, move to the remaining fields of their record.
+        """
+        typecode, missing = COLUMN_TYPES[field]
+        if typecode != "d":
+            try:
+                return array(
+                    typecode, [missing if value is None else value for value in column]
+                )
+            except TypeError:
+                pass
+        values = array(typecode)
+        for position, value in enumerate(column):
+            if value is not None and not _fits(field, value):
+                if field in TIMESTAMP_FIELDS:
+                    value = _decode_timestamp(value)
+                extras.setdefault(position, {})[field] = value
+                value = None
+            values.append(missing if value is None else value)
+        return values
+
+    def count(self, kind: str) -> int:
+        """Return the number of records in a collection."""
+        return len(self._columns[kind]["created_at"])
+
+    def _encode(self, field: str, value: Any) -> Any:
+        """Return the column value of a field, or _EXTRA."""
+        if field not in COLUMNS or value is None:
+            return _EXTRA
+        if field == "yield_amount":
+            return value
+        if field in NAME_FIELDS:
+            if not isinstance(value, str):
+                return _EXTRA
+            name_id = self._name_ids.get(value)
+            if name_id is None:
+                name_id = self._name_ids[value] = len(self.names)
+                self.names.append(value)
+            return name_id
+        if field in DATE_FIELDS or field in TIMESTAMP_FIELDS:
+            if not isinstance(value, str):
+                return _EXTRA
+            value = (
+                _encode_date(value) if field in DATE_FIELDS else _encode_timestamp(value)
+            )
+        return value if _fits(field, value) else _EXTRA
+
+    def append(self, kind: str, record: Dict) -> None:
+        """Add a record to the end of a collection."""
+        columns = self._columns[kind]
+        position = self.count(kind)
+        encoded = {}
+        rest = {}
+        for field, value in record.items():
+            column_value = self._encode(field, value)
+            if column_value is _EXTRA:
+                rest[field] = value
+            else:
+                encoded[field] = column_value
+        for field, column in columns.items():
+            value = encoded.get(field)
+            if field == "yield_amount":
+                column.append(value)
+            else:
+                column.append(COLUMN_TYPES[field][1] if value is None else value)
+        if rest:
+            self._extras[kind][position] = rest
+
+    def value(self, kind: str, field: str, position: int) -> Any:
+        """Return one field of a record, or None if it lacks the field."""
+        if field in COLUMN_TYPES:
+            value = self._columns[kind][field][position]
+            if value != COLUMN_TYPES[field][1]:
+                if field in NAME_FIELDS:
+                    return self.names[value]
+                if field in DATE_FIELDS:
+                    return iso_date(value)
+                if field in TIMESTAMP_FIELDS:
+                    return _decode_timestamp(value)
+                return value
+        elif field == "yield_amount":
+            value = self._columns[kind][field][position]
+            if value is not None:
+                return value
+        return self._extras[kind].get(position, {}).get(field)
+
+    def record(self, kind: str, position: int) -> Dict:
+        """Decode one record to a dict."""
+        columns = self._columns[kind]
+        names = self.names
+        record = {}
+        created_at = columns["created_at"][position]
+        if created_at != COLUMN_TYPES["created_at"][1]:
+            record["created_at"] = _decode_timestamp(created_at)
+        for field in ("plant", "location"):
+            name_id = columns[field][position]
+            if name_id >= 0:
+                record[field] = names[name_id]
+        day = columns["date"][position]
+        if day:
+            record["date"] = iso_date(day)
+        amount = columns["yield_amount"][position]
+        if amount is not None:
+            record["yield_amount"] = amount
+        quantity = columns["yield_quantity"][position]
+        if quantity != COLUMN_TYPES["yield_quantity"][1]:
+            record["yield_quantity"] = quantity
+        unit = columns["yield_unit"][position]
+        if unit >= 0:
+            record["yield_unit"] = names[unit]
+        rest = self._extras[kind].get(position)
+        if rest:
+            record.update(rest)
+        return record
+
+    def records(
+        self, kind: str, positions: Optional[Iterable[int]] = None
+    ) -> List[Dict]:
+        """Decode the records at some positions, or a whole collection."""
+        if positions is None:
+            positions = range(self.count(kind))
+        return [self.record(kind, position) for position in positions]
+
+    def sort_day(self, kind: str, position: int) -> int:
+        """Return the ordinal of the day record_date gives a record, or 0."""
+        columns = self._columns[kind]
+        day = columns["date"][position]
+        if day:
+            return day
+        rest = self._extras[kind].get(position, {})
+        if rest.get("date"):
+            day = _date_ordinal(rest["date"])
+            if day:
+                return day
+        created_at = columns["created_at"][position]
+        if created_at != COLUMN_TYPES["created_at"][1]:
+            return EPOCH_ORDINAL + created_at // DAY_MICROSECONDS
+        if rest.get("created_at"):
+            return _date_ordinal(rest["created_at"])
+        return 0
+
+    def sort_days(self, kind: str) -> array:
+        """Return the sort_day of every record in a collection."""
+        dates = self._columns[kind]["date"]
+        if dates.count(0) == 0:
+            return array("i", dates)
+        return array(
+            "i", (self.sort_day(kind, position) for position in range(len(dates)))
+        )
+
+    def _derive(self, columns: Dict, extras: Dict) -> "GardenColumns":
+        """Return new columns with copies of the name table and meta."""
+        derived = GardenColumns.__new__(GardenColumns)
+        derived.names = list(self.names)
+        derived._name_ids = dict(self._name_ids)
+        derived.meta = dict(self.meta)
+        derived._columns = columns
+        derived._extras = extras
+        return derived
+
+    def copy(self) -> "GardenColumns":
+        """Return a copy that later appends do not change."""
+        return self._derive(
+            {
+                kind: {field: column[:] for field, column in columns.items()}
+                for kind, columns in self._columns.items()
+            },
+            {kind: dict(extras) for kind, extras in self._extras.items()},
+        )
+
+    def select(self, positions: Dict[str, List[int]]) -> "GardenColumns":
+        """Return columns holding only the records at some positions."""
+        columns = {}
+        extras = {}
+        for kind in RECORD_COLLECTIONS:
+            kept = positions[kind]
+            columns[kind] = {
+                field: (
+                    [column[position] for position in kept]
+                    if field == "yield_amount"
+                    else array(column.typecode, [column[position] for position in kept])
+                )
+                for field, column in self._columns[kind].items()
+            }
+            old = self._extras[kind]
+            extras[kind] = {
+                index: old[position]
+                for index, position in enumerate(kept)
+                if position in old
+            }
+        return self._derive(columns, extras)
+
+    def as_document(self) -> Dict:
+        """Return the columns in their stored, JSON-serializable form."""
+        document = dict(self.meta)
+        document["names"] = list(self.names)
+        for kind in RECORD_COLLECTIONS:
+            stored = {}
+            count = self.count(kind)
+            for field, column in self._columns[kind].items():
+                if field == "yield_amount":
+                    if column.count(None) != count:
+                        stored[field] = list(column)
+                    continue
+                missing = COLUMN_TYPES[field][1]
+                if column.count(missing) != count:
+                    stored[field] = [
+                        None if value == missing else value for value in column
+                    ]
+            document[kind] = {
+                "count": count,
+                "columns": stored,
+                "extra": [
+                    [position, rest]
+                    for position, rest in sorted(self._extras[kind].items())
+                ],
+            }
+        return document
+
+
+def encode_garden_data(data: Dict) -> Dict:
+    """Return the column document of a garden with one dict per record.
+
+    Top level keys other than the record collections are kept as they are.
+    """
+    columns = GardenColumns()
+    for key, value in data.items():
+        if key not in RECORD_COLLECTIONS:
+            columns.meta[key] = value
+    for kind in RECORD_COLLECTIONS:
+        for record in data.get(kind, []):
+            columns.append(kind, record)
+    return columns.as_document()
+
+
+def decode_garden_data(document: Dict) -> Dict:
+    """Return the garden of a column document with one dict per record."""
+    columns = GardenColumns(document)
+    data = dict(columns.meta)
+    for kind in RECORD_COLLECTIONS:
+        data[kind] = columns.records(kind)
+    return data
@@ -1,77 +1,686 @@
 """Garden data management for Smart Home Farming."""
+from array import array
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+import heapq
+from itertools import islice
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime
+import os
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from datetime import date, datetime
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .aggregates import AGGREGATED_COLLECTIONS, GardenAggregates
+from .const import (
+    CHANGE_LOG_SIZE,
+    DOMAIN,
+    DEFAULT_COMMIT_DELAY,
+    DEFAULT_MAX_COMMIT_LATENCY,
+)
+from .garden_archive import SeasonArchive
+from .garden_codec import (
+    RECORD_COLLECTIONS,
+    GardenColumns,
+    encode_garden_data,
+    iso_date,
+)
+from .metrics import Instrumentation
+from .util import (
+    normalize_name,
+    record_date,
+    season_bucket,
+    season_start,
+    storage_name,
+)
+from .yields import normalize_yield
 
 _LOGGER = logging.getLogger(__name__)
 
-STORAGE_VERSION = 1
+STORAGE_VERSION = 2
 STORAGE_KEY = f"{DOMAIN}.garden_data"
 
+# Sort key of a record within its collection: (ISO date, list position)
+RecordKey = Tuple[str, int]
+
+# Index entries pack the sort key into one integer, day ordinal << 32 plus
+# position, so sorted arrays of them can be bisected directly
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+
+def _day_ordinal(day: str) -> int:
+    """Return the ordinal of an ISO date, or 0 for records without one."""
+    return date.fromisoformat(day).toordinal() if day else 0
+
+
+def _pack_key(key: RecordKey) -> int:
+    """Return the index entry of a record key."""
+    return (_day_ordinal(key[0]) << POSITION_BITS) + key[1]
+
+
+def _unpack_key(entry: int) -> RecordKey:
+    """Return the record key of an index entry."""
+    day = entry >> POSITION_BITS
+    return (iso_date(day) if day else "", entry & POSITION_MASK)
+
+
+def empty_garden_data() -> Dict:
+    """Return the document of a garden without any records."""
+    return {
+        "plants": [],
+        "planting_records": [],
+        "harvest_records": [],
+        "planting_plans": [],
+    }
+
+
+class GardenStore(Store):
+    """Store of a garden document that migrates version 1 documents.
+
+    Version 1 kept one dict per record; version 2 keeps the columns of
+    GardenColumns.
+    """
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict
+    ) -> Dict:
+        """Encode a version 1 document as columns."""
+        if old_major_version == 1:
+            return await self.hass.async_add_executor_job(encode_garden_data, old_data)
+        raise NotImplementedError
+
 
 class GardenData:
-    """Class to manage garden data storage."""
+    """Class to manage garden data storage.
+
+    Mutations are applied to memory right away and written behind: every
+    add_* call schedules a debounced commit, so a burst of records shares a
+    single save. A commit happens at most ``commit_delay`` seconds after the
+    last write and never later than ``max_commit_latency`` seconds after the
+    first pending one.
+
+    Closed seasons can be moved to a compressed archive; queries whose
+    start date reaches into it load the archived seasons on demand.
+
+    Records are only kept in columns (see GardenColumns) and decoded when
+    they are read. The indexes are typed arrays of packed sort keys, so a
+    commit only copies and serializes the columns.
+
+    Every added record increases the stored revision. The most recent
+    records are kept in a bounded change log, so pollers can ask for the
+    records added since the revision they last saw.
+    """
 
-    def __init__(self, hass: HomeAssistant):
+    # Whether async_archive can move closed seasons out of this backend
+    supports_archive = True
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        commit_delay: float = DEFAULT_COMMIT_DELAY,
+        max_commit_latency: float = DEFAULT_MAX_COMMIT_LATENCY,
+        instrumentation: Optional[Instrumentation] = None,
+        storage_id: Optional[str] = None,
+    ):
         """Initialize garden data."""
         self.hass = hass
-        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
-        self._data: Dict = {}
+        self.instrumentation = instrumentation or Instrumentation()
+        self.storage_id = storage_id
+        self._store = GardenStore(
+            hass, STORAGE_VERSION, storage_name(STORAGE_KEY, storage_id)
+        )
+        self._columns = GardenColumns()
+        # Indexes per collection: the sort day of every record, sorted packed
+        # keys overall, per normalized plant name and per normalized
+        # location, plus display names.
+        self._days: Dict[str, array] = {}
+        self._date_index: Dict[str, array] = {}
+        self._plant_index: Dict[str, Dict[str, array]] = {}
+        self._location_index: Dict[str, Dict[str, array]] = {}
+        self._labels: Dict[str, str] = {}
+        # Normalized key of every indexed name, so each is normalized once
+        self._name_keys: Dict[str, str] = {}
+        self.archive = SeasonArchive(hass, storage_id=storage_id)
+        self.yield_rollups = self.archive.base_rollups()
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        self.revision = 0
+        # Revision, collection and position (or record) of recent additions
+        self._changes: Deque[Tuple[int, str, Any]] = deque(maxlen=CHANGE_LOG_SIZE)
+        self._commit_delay = commit_delay
+        self._max_commit_latency = max(commit_delay, max_commit_latency)
+        self._commit_lock = asyncio.Lock()
+        self._unsub_commit: Optional[Callable[[], None]] = None
+        self._first_pending: Optional[float] = None
+        self._pending_writes = 0
+        # Set while a batch is added; the batch is committed as a whole
+        self._batching = False
+        self.commit_count = 0
+        self.coalesced_writes = 0
 
     async def async_load(self) -> None:
         """Load data from storage."""
         stored = await self._store.async_load()
-        if stored:
-            self._data = stored
-        else:
-            self._data = {
-                "plants": [],
-                "planting_records": [],
-                "harvest_records": [],
-                "planting_plans": [],
-            }
+        await self._async_set_document(stored)
+        await self.archive.async_load()
+        self._build_indexes()
+
+    async def _async_set_document(self, document: Optional[Dict]) -> None:
+        """Use a stored column document, or an empty garden, as memory."""
+        if not document:
+            document = encode_garden_data(empty_garden_data())
+        self._columns = await self.hass.async_add_executor_job(
+            GardenColumns, document
+        )
+        self.revision = self._columns.meta.get("revision", 0)
+
+    async def _async_document(self) -> Dict:
+        """Return the stored form of the columns.
+
+        The columns are copied first, so records appended while they are
+        converted in the executor cannot slip into the document.
+        """
+        return await self.hass.async_add_executor_job(
+            self._columns.copy().as_document
+        )
 
     async def async_save(self) -> None:
-        """Save data to storage."""
-        await self._store.async_save(self._data)
+        """Save any pending data to storage."""
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Commit all pending writes now instead of waiting for the timer."""
+        if self._unsub_commit is not None:
+            self._unsub_commit()
+            self._unsub_commit = None
+
+        async with self._commit_lock:
+            writes = self._pending_writes
+            if not writes:
+                return
+            self._pending_writes = 0
+            self._first_pending = None
+            try:
+                with self.instrumentation.timer("garden_data.save"):
+                    written = await self._async_commit()
+            except Exception:
+                # Keep the writes pending so the next commit retries them
+                self._pending_writes += writes
+                raise
+            self.commit_count += 1
+            self.coalesced_writes += writes - 1
+            if written is not None:
+                self.instrumentation.observe("garden_data.save_bytes", written)
+                self.instrumentation.count("garden_data.bytes_written", written)
+
+    async def _async_rewrite(self) -> None:
+        """Write the whole in-memory document after records were removed."""
+        await self._store.async_save(await self._async_document())
+
+    async def _async_commit(self) -> Optional[int]:
+        """Write the in-memory document to storage.
+
+        Returns the number of bytes written when instrumentation is enabled.
+        """
+        await self._store.async_save(await self._async_document())
+        if not self.instrumentation.enabled:
+            return None
+        return await self.hass.async_add_executor_job(
+            os.path.getsize, self._store.path
+        )
+
+    @callback
+    def _async_schedule_commit(self) -> None:
+        """Schedule a debounced commit for a new write."""
+        now = self.hass.loop.time()
+        self._pending_writes += 1
+        if self._batching:
+            return
+        if self._first_pending is None:
+            self._first_pending = now
+
+        deadline = min(
+            now + self._commit_delay,
+            self._first_pending + self._max_commit_latency,
+        )
+        if self._unsub_commit is not None:
+            self._unsub_commit()
+        self._unsub_commit = async_call_later(
+            self.hass, max(0.0, deadline - now), self._async_commit_timer
+        )
+
+    @callback
+    def _async_commit_timer(self, _now: datetime) -> None:
+        """Run the scheduled commit."""
+        self._unsub_commit = None
+        self.hass.async_create_task(self.async_flush())
+
+    async def async_close(self) -> None:
+        """Release resources held by the storage backend."""
+
+    @property
+    def stats(self) -> Dict:
+        """Return write-behind counters."""
+        return {
+            "commits": self.commit_count,
+            "coalesced_writes": self.coalesced_writes,
+            "pending_writes": self._pending_writes,
+            **self.archive.stats,
+        }
+
+    async def async_archive(self, before: date) -> Dict[str, Dict[str, int]]:
+        """Move all seasons that ended before the season of a date to the archive.
+
+        Returns the number of archived records per season and collection.
+        The archive is written before the live document, so an interrupted
+        archival leaves records in both places until it is repeated.
+        """
+        await self.async_flush()
+        cutoff = season_start(before).toordinal()
+        async with self._commit_lock:
+            moved: Dict[str, Dict[str, List[Dict]]] = {}
+            kept: Dict[str, List[int]] = {}
+            lengths: Dict[str, int] = {}
+            for kind in RECORD_COLLECTIONS:
+                days = self._days[kind]
+                lengths[kind] = len(days)
+                kept[kind] = []
+                for position, day in enumerate(days):
+                    if day and day < cutoff:
+                        season = moved.setdefault(season_bucket(iso_date(day)), {})
+                        season.setdefault(kind, []).append(
+                            self._columns.record(kind, position)
+                        )
+                    else:
+                        kept[kind].append(position)
+            if not moved:
+                return {}
+
+            await self.archive.async_add(moved)
+            # Keep records appended while the archive was written
+            for kind in RECORD_COLLECTIONS:
+                kept[kind].extend(range(lengths[kind], self._columns.count(kind)))
+            self._columns = self._columns.select(kept)
+            # Logged positions no longer hold the same records
+            self._changes.clear()
+            self._build_indexes()
+            await self._async_rewrite()
+
+        _LOGGER.info("Archived garden seasons %s", ", ".join(sorted(moved)))
+        return {
+            season: {kind: len(records) for kind, records in collections.items()}
+            for season, collections in moved.items()
+        }
+
+    @callback
+    def async_add_listener(
+        self, listener: Callable[[str, Dict], None]
+    ) -> Callable[[], None]:
+        """Call a listener with the kind and entry of every added record."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @callback
+    def _async_notify(self, kind: str, entry: Dict) -> None:
+        """Tell the listeners about an added record."""
+        for listener in list(self._listeners):
+            listener(kind, entry)
+
+    @callback
+    def _async_log_change(self, kind: str, change: Any) -> None:
+        """Give an added record the next revision and keep it in the log."""
+        self.revision += 1
+        self._changes.append((self.revision, kind, change))
+
+    def _logged_record(self, kind: str, change: Any) -> Dict:
+        """Return the record of a change log entry from its position."""
+        return self._columns.record(kind, change)
+
+    def changes_since(
+        self,
+        revision: int,
+        kind: str,
+        plant: Optional[str] = None,
+        location: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Optional[List[Dict]]:
+        """Return matching records of a collection added after a revision.
+
+        Returns None when the change log no longer reaches back to the
+        revision, or the revision is unknown, e.g. from before a restart.
+        """
+        oldest = self._changes[0][0] - 1 if self._changes else self.revision
+        if not oldest <= revision <= self.revision:
+            return None
+        plant_key = normalize_name(plant) if plant else None
+        location_key = normalize_name(location) if location else None
+        changes: List[Dict] = []
+        for change_revision, change_kind, change in reversed(self._changes):
+            if change_revision <= revision:
+                break
+            if change_kind != kind:
+                continue
+            record = self._logged_record(kind, change)
+            if plant_key and normalize_name(record.get("plant", "")) != plant_key:
+                continue
+            if location_key and normalize_name(record.get("location", "")) != location_key:
+                continue
+            record_day = record_date(record) or ""
+            if (start_date and record_day < start_date) or (
+                end_date and record_day > end_date
+            ):
+                continue
+            changes.append(record)
+        changes.reverse()
+        return changes
+
+    @callback
+    def _async_append(self, kind: str, record: Dict) -> Dict:
+        """Append a record to a collection and schedule its commit."""
+        entry = {
+            "created_at": datetime.now().isoformat(),
+            **record
+        }
+        position = self._columns.count(kind)
+        self._columns.append(kind, entry)
+        self._async_log_change(kind, position)
+        self._columns.meta["revision"] = self.revision
+        self._index_record(kind, position)
+        self.yield_rollups.add(kind, entry)
+        self._async_schedule_commit()
+        self._async_notify(kind, entry)
+        return entry
 
     async def add_planting_plan(self, plan: Dict) -> None:
         """Add a new planting plan."""
-        self._data["planting_plans"].append({
-            "created_at": datetime.now().isoformat(),
-            **plan
-        })
-        await self.async_save()
+        self._async_append("planting_plans", plan)
 
     async def add_planting_record(self, record: Dict) -> None:
         """Add a new planting record."""
-        self._data["planting_records"].append({
-            "created_at": datetime.now().isoformat(),
-            **record
-        })
-        await self.async_save()
+        self._async_append("planting_records", record)
 
     async def add_harvest_record(self, record: Dict) -> None:
-        """Add a new harvest record."""
-        self._data["harvest_records"].append({
-            "created_at": datetime.now().isoformat(),
-            **record
-        })
-        await self.async_save()
+        """Add a new harvest record with its yield normalized."""
+        self._async_append("harvest_records", normalize_yield(record))
+
+    async def async_add_records(self, records: List[Tuple[str, Dict]]) -> None:
+        """Add records of several collections and commit them in one save."""
+        self._batching = True
+        try:
+            for kind, record in records:
+                if kind == "harvest_records":
+                    record = normalize_yield(record)
+                self._async_append(kind, record)
+        finally:
+            self._batching = False
+        await self.async_flush()
+
+    async def _async_get_all(self, kind: str) -> List[Dict]:
+        """Decode a full collection in the executor."""
+        # Records appended meanwhile are left out rather than read half-way
+        return await self.hass.async_add_executor_job(
+            self._columns.records, kind, range(self._columns.count(kind))
+        )
+
+    async def async_get_planting_plans(self) -> List[Dict]:
+        """Get all planting plans without blocking the event loop."""
+        return await self._async_get_all("planting_plans")
+
+    async def async_get_planting_records(self) -> List[Dict]:
+        """Get all planting records without blocking the event loop."""
+        return await self._async_get_all("planting_records")
+
+    async def async_get_harvest_records(self) -> List[Dict]:
+        """Get all harvest records without blocking the event loop."""
+        return await self._async_get_all("harvest_records")
+
+    def _build_aggregates(self) -> GardenAggregates:
+        """Build the sensor aggregates from the latest records."""
+        collections: Dict[str, List[Dict]] = {}
+        for kind in AGGREGATED_COLLECTIONS:
+            # Latest record of each plant, and for plantings of each plant
+            # per bed, taken from the ends of the sorted index arrays
+            keys = {plant_keys[-1] for plant_keys in self._plant_index[kind].values()}
+            if kind == "planting_records":
+                for bed_keys in self._location_index[kind].values():
+                    seen = set()
+                    for key in reversed(bed_keys):
+                        plant = self._columns.value(kind, "plant", key & POSITION_MASK)
+                        if plant and normalize_name(plant) not in seen:
+                            seen.add(normalize_name(plant))
+                            keys.add(key)
+            collections[kind] = self._columns.records(
+                kind, (key & POSITION_MASK for key in sorted(keys))
+            )
+        return GardenAggregates.from_records(collections, self._labels)
+
+    async def async_build_aggregates(self) -> GardenAggregates:
+        """Return the sensor aggregates without replaying the history.
+
+        Only the latest records per plant and bed decide the aggregates, so
+        those are all that is read.
+        """
+        return await self.hass.async_add_executor_job(self._build_aggregates)
+
+    @property
+    def archived_through(self) -> Optional[str]:
+        """Return the date of the latest archived record, if any."""
+        return self.archive.end
+
+    @callback
+    def yield_summary(
+        self, group_by: str, buckets: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """Return harvest totals per plant, bed, week or season bucket."""
+        return self.yield_rollups.summary(group_by, buckets)
+
+    def _record_names(self, kind: str, position: int) -> List[Tuple[str, str]]:
+        """Return the indexed name fields of a record, normalized."""
+        names = []
+        for field in ("plant", "location"):
+            value = self._columns.value(kind, field, position)
+            if not value:
+                continue
+            name_key = self._name_keys.get(value) if isinstance(value, str) else None
+            if name_key is None:
+                name_key = normalize_name(value)
+                self._labels.setdefault(name_key, value)
+                if isinstance(value, str):
+                    self._name_keys[value] = name_key
+            names.append((field, name_key))
+        return names
+
+    def _index_record(self, kind: str, position: int) -> None:
+        """Add a newly appended record to the indexes of its collection."""
+        day = self._columns.sort_day(kind, position)
+        self._days[kind].append(day)
+        key = (day << POSITION_BITS) + position
+        insort(self._date_index[kind], key)
+        indexes = {
+            "plant": self._plant_index[kind],
+            "location": self._location_index[kind],
+        }
+        for field, name_key in self._record_names(kind, position):
+            insort(indexes[field].setdefault(name_key, array("q")), key)
+
+    def _build_indexes(self) -> None:
+        """Build the in-memory indexes from the loaded columns."""
+        self._labels = {}
+        self._name_keys = {}
+        for kind in RECORD_COLLECTIONS:
+            days = self._days[kind] = self._columns.sort_days(kind)
+            keys = [(day << POSITION_BITS) + position for position, day in enumerate(days)]
+            by_name: Dict[str, Dict[str, List[int]]] = {"plant": {}, "location": {}}
+            for key in keys:
+                for field, name_key in self._record_names(kind, key & POSITION_MASK):
+                    by_name[field].setdefault(name_key, []).append(key)
+            keys.sort()
+            self._date_index[kind] = array("q", keys)
+            self._plant_index[kind], self._location_index[kind] = (
+                {
+                    name_key: array("q", sorted(name_keys))
+                    for name_key, name_keys in by_name[field].items()
+                }
+                for field in ("plant", "location")
+            )
+
+        # Replay the history in date order, plantings before same-day
+        # harvests, decoding one record at a time
+        self.yield_rollups = self.archive.base_rollups()
+        events = heapq.merge(
+            ((key >> POSITION_BITS, 0, key) for key in self._date_index["planting_records"]),
+            ((key >> POSITION_BITS, 1, key) for key in self._date_index["harvest_records"]),
+        )
+        for _day, is_harvest, key in events:
+            kind = "harvest_records" if is_harvest else "planting_records"
+            self.yield_rollups.add(kind, self._columns.record(kind, key & POSITION_MASK))
+
+    def _key_range(
+        self,
+        keys: array,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        after: Optional[RecordKey] = None,
+    ) -> Tuple[int, int]:
+        """Return the slice of sorted index entries inside a date range."""
+        lo = bisect_right(keys, _pack_key(after)) if after is not None else 0
+        if start_date:
+            lo = max(lo, bisect_left(keys, _day_ordinal(start_date) << POSITION_BITS))
+        hi = len(keys)
+        if end_date:
+            hi = bisect_right(
+                keys, (_day_ordinal(end_date) << POSITION_BITS) + POSITION_MASK
+            )
+        return lo, max(lo, hi)
+
+    def _candidates(
+        self, kind: str, plant: Optional[str], location: Optional[str]
+    ) -> List[array]:
+        """Return the sorted index arrays that every match must appear in."""
+        candidates = [self._date_index[kind]]
+        if plant:
+            candidates.append(
+                self._plant_index[kind].get(normalize_name(plant), array("q"))
+            )
+        if location:
+            candidates.append(
+                self._location_index[kind].get(normalize_name(location), array("q"))
+            )
+        return candidates
+
+    def _has_name(self, kind: str, position: int, field: str, name_key: str) -> bool:
+        """Return True if a name field of a record normalizes to a key."""
+        value = self._columns.value(kind, field, position)
+        return normalize_name(value if value is not None else "") == name_key
+
+    def _match_page(
+        self,
+        kind: str,
+        plant: Optional[str],
+        location: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        limit: Optional[int],
+        after: Optional[RecordKey],
+    ) -> Tuple[List[int], Optional[RecordKey]]:
+        """Collect matching index entries from the narrowest index slice."""
+        ranges = [
+            (keys, *self._key_range(keys, start_date, end_date, after))
+            for keys in self._candidates(kind, plant, location)
+        ]
+        keys, lo, hi = min(ranges, key=lambda item: item[2] - item[1])
+        # The narrowest slice only has to be checked against the other names
+        plant_key = normalize_name(plant) if plant else None
+        location_key = normalize_name(location) if location else None
+
+        page: List[int] = []
+        for key in islice(keys, lo, hi):
+            position = key & POSITION_MASK
+            if plant_key and not self._has_name(kind, position, "plant", plant_key):
+                continue
+            if location_key and not self._has_name(
+                kind, position, "location", location_key
+            ):
+                continue
+            if limit is not None and len(page) == limit:
+                return page, _unpack_key(page[-1])
+            page.append(key)
+        return page, None
+
+    async def async_query_page(
+        self,
+        kind: str,
+        plant: Optional[str] = None,
+        location: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[RecordKey] = None,
+        include_archive: bool = False,
+    ) -> Tuple[List[Dict], Optional[RecordKey]]:
+        """Return one page of matching records ordered by date.
+
+        The page starts after the record key ``after`` and the returned key
+        continues it, or is None once the last match has been returned. The
+        scan starts from whichever of the date, plant and location indexes
+        has the fewest keys in range, so the cost follows the result size
+        rather than the whole history. Only the records of the page are
+        decoded.
 
-    def get_planting_plans(self) -> List[Dict]:
-        """Get all planting plans."""
-        return self._data["planting_plans"]
+        Archived seasons are included when ``include_archive`` is set or
+        ``start_date`` reaches into them. They are read one at a time from
+        the season of ``after`` until the page is full.
+        """
+        archive_end = self.archive.end
+        if (
+            archive_end is None
+            or not (include_archive or (start_date and start_date <= archive_end))
+            # Archived keys of the last archived date sort before live ones
+            or (after is not None and tuple(after) >= (archive_end, 0))
+        ):
+            keys, next_key = self._match_page(
+                kind, plant, location, start_date, end_date, limit, after
+            )
+            return (
+                self._columns.records(kind, (key & POSITION_MASK for key in keys)),
+                next_key,
+            )
 
-    def get_planting_records(self) -> List[Dict]:
-        """Get all planting records."""
-        return self._data["planting_records"]
+        # A page holds at most one more archived match than it returns
+        archived: List[Tuple[RecordKey, Dict]] = []
+        archive_start = max(start_date or "", after[0]) if after else start_date
+        for season in self.archive.seasons_between(kind, archive_start, end_date):
+            matches = await self.archive.async_query_season(
+                season, kind, plant, location, archive_start, end_date
+            )
+            archived.extend(
+                match for match in matches if after is None or match[0] > tuple(after)
+            )
+            if limit is not None and len(archived) > limit:
+                break
 
-    def get_harvest_records(self) -> List[Dict]:
-        """Get all harvest records."""
-        return self._data["harvest_records"]
+        # Merge them with the live positions by sort key
+        live_keys, live_next = self._match_page(
+            kind, plant, location, start_date, end_date, limit, after
+        )
+        merged = heapq.merge(
+            archived,
+            ((_unpack_key(key), key & POSITION_MASK) for key in live_keys),
+            key=lambda match: match[0],
+        )
+        page: List[Dict] = []
+        last_key: Optional[RecordKey] = None
+        for key, match in merged:
+            if limit is not None and len(page) == limit:
+                return page, last_key
+            # Archived matches come as records, live ones as positions
+            if not isinstance(match, dict):
+                match = self._columns.record(kind, match)
+            page.append(match)
+            last_key = key
+        # More live keys than one page means the page is full
+        return page, last_key if live_next is not None else None
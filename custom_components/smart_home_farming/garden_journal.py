@@ -0,0 +1,243 @@
+"""Append-only journal storage engine for Smart Home Farming garden data."""
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    DEFAULT_COMMIT_DELAY,
+    DEFAULT_MAX_COMMIT_LATENCY,
+    DEFAULT_JOURNAL_COMPACT_SIZE,
+)
+from .garden_data import (
+    GardenData,
+    RECORD_COLLECTIONS,
+    encode_garden_data,
+)
+from .metrics import Instrumentation
+from .util import storage_name
+
+_LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+SNAPSHOT_KEY = f"{DOMAIN}.garden_snapshot"
+JOURNAL_NAME = f"{DOMAIN}.garden_journal"
+
+
+class SnapshotStore(Store):
+    """Store of the journal snapshot that migrates version 1 snapshots."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict
+    ) -> Dict:
+        """Encode the garden of a version 1 snapshot as columns."""
+        if old_major_version == 1:
+            data = await self.hass.async_add_executor_job(
+                encode_garden_data, old_data["data"]
+            )
+            return {"seq": old_data["seq"], "data": data}
+        raise NotImplementedError
+
+
+class JournalGardenData(GardenData):
+    """Garden data persisted as a snapshot plus an append-only journal.
+
+    Each committed record is appended to a JSONL journal, so a commit costs
+    O(new records) instead of O(history). Every journal line carries a
+    sequence number; the snapshot remembers the last sequence it contains,
+    so replay after a crash mid-compaction never applies a record twice.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        commit_delay: float = DEFAULT_COMMIT_DELAY,
+        max_commit_latency: float = DEFAULT_MAX_COMMIT_LATENCY,
+        compact_size: int = DEFAULT_JOURNAL_COMPACT_SIZE,
+        instrumentation: Optional[Instrumentation] = None,
+        storage_id: Optional[str] = None,
+    ):
+        """Initialize journal backed garden data."""
+        super().__init__(
+            hass, commit_delay, max_commit_latency, instrumentation, storage_id
+        )
+        self._snapshot_store = SnapshotStore(
+            hass, SNAPSHOT_VERSION, storage_name(SNAPSHOT_KEY, storage_id)
+        )
+        self._journal_path = hass.config.path(
+            ".storage", f"{storage_name(JOURNAL_NAME, storage_id)}.jsonl"
+        )
+        self._compact_size = compact_size
+        self._journal_pending: List[Tuple[int, str]] = []
+        self._journal_size = 0
+        self._seq = 0
+        self._compacting = False
+        self._compact_task: Optional[asyncio.Task] = None
+        self.compaction_count = 0
+
+    async def async_load(self) -> None:
+        """Rebuild state from the last snapshot plus the journal."""
+        snapshot = await self._snapshot_store.async_load()
+        if snapshot:
+            await self._async_set_document(snapshot["data"])
+            self._seq = snapshot["seq"]
+        else:
+            # First start on this backend: seed from the single-document store
+            await self._async_set_document(await self._store.async_load())
+            self._seq = 0
+        await self.archive.async_load()
+
+        entries, self._journal_size = await self.hass.async_add_executor_job(
+            self._read_journal
+        )
+        replayed = 0
+        for seq, kind, record in entries:
+            if seq <= self._seq:
+                continue
+            self._columns.append(kind, record)
+            self.revision += 1
+            self._seq = seq
+            replayed += 1
+
+        self._columns.meta["revision"] = self.revision
+        self._build_indexes()
+
+        _LOGGER.debug(
+            "Loaded garden snapshot at sequence %s and replayed %s journal entries",
+            self._seq,
+            replayed,
+        )
+        self._async_maybe_compact()
+
+    def _read_journal(self) -> Tuple[List[Tuple[int, str, Dict]], int]:
+        """Read all intact journal entries."""
+        entries: List[Tuple[int, str, Dict]] = []
+        try:
+            with open(self._journal_path, encoding="utf-8") as journal:
+                for line_no, line in enumerate(journal, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        kind = entry["type"]
+                        if kind not in RECORD_COLLECTIONS:
+                            raise ValueError(kind)
+                        entries.append((entry["seq"], kind, entry["record"]))
+                    except (ValueError, KeyError, TypeError):
+                        # A torn trailing write is expected after a crash
+                        _LOGGER.warning(
+                            "Skipping unreadable garden journal line %s", line_no
+                        )
+            size = os.path.getsize(self._journal_path)
+        except FileNotFoundError:
+            size = 0
+        return entries, size
+
+    @callback
+    def _async_append(self, kind: str, record: Dict) -> Dict:
+        """Append a record and queue its journal line."""
+        entry = super()._async_append(kind, record)
+        self._seq += 1
+        self._journal_pending.append((
+            self._seq,
+            json_dumps({"seq": self._seq, "type": kind, "record": entry}) + "\n",
+        ))
+        return entry
+
+    async def _async_commit(self) -> Optional[int]:
+        """Append the queued journal lines and return the bytes written."""
+        if not self._journal_pending:
+            return 0
+        lines = self._journal_pending
+        self._journal_pending = []
+        try:
+            written = await self.hass.async_add_executor_job(
+                self._append_journal, [line for _seq, line in lines]
+            )
+        except Exception:
+            self._journal_pending = lines + self._journal_pending
+            raise
+        self._journal_size += written
+        self._async_maybe_compact()
+        return written
+
+    def _append_journal(self, lines: List[str]) -> int:
+        """Write lines to the end of the journal and return the bytes added."""
+        payload = "".join(lines).encode("utf-8")
+        with open(self._journal_path, "ab") as journal:
+            journal.write(payload)
+            journal.flush()
+            os.fsync(journal.fileno())
+        return len(payload)
+
+    @callback
+    def _async_maybe_compact(self) -> None:
+        """Start a background compaction once the journal is large enough."""
+        if self._compacting or self._journal_size < self._compact_size:
+            return
+        self._compacting = True
+        self._compact_task = self.hass.async_create_background_task(
+            self._async_compact(), f"{DOMAIN} garden journal compaction"
+        )
+
+    async def async_close(self) -> None:
+        """Wait for a running compaction, so a reload sees its result."""
+        if self._compact_task is not None and not self._compact_task.done():
+            await self._compact_task
+        await super().async_close()
+
+    async def _async_snapshot(self) -> int:
+        """Snapshot memory, truncate the journal and return the sequence."""
+        # The columns are copied together with the sequence, so records
+        # appended while the snapshot is converted cannot slip into it
+        # unnumbered.
+        seq = self._seq
+        await self._snapshot_store.async_save(
+            {"seq": seq, "data": await self._async_document()}
+        )
+        # Queued lines up to the snapshot sequence are now covered
+        self._journal_pending = [
+            item for item in self._journal_pending if item[0] > seq
+        ]
+        await self.hass.async_add_executor_job(self._truncate_journal)
+        self._journal_size = 0
+        return seq
+
+    async def _async_rewrite(self) -> None:
+        """Replace the snapshot after records were removed from memory."""
+        await self._async_snapshot()
+
+    async def _async_compact(self) -> None:
+        """Fold the journal into a new snapshot and truncate it."""
+        try:
+            async with self._commit_lock, self.instrumentation.timer(
+                "garden_data.compact"
+            ):
+                seq = await self._async_snapshot()
+                self.compaction_count += 1
+            _LOGGER.debug("Compacted garden journal into snapshot at %s", seq)
+        except Exception as e:
+            _LOGGER.error("Error compacting garden journal: %s", str(e))
+        finally:
+            self._compacting = False
+
+    def _truncate_journal(self) -> None:
+        """Empty the journal file."""
+        with open(self._journal_path, "wb") as journal:
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    @property
+    def stats(self) -> Dict:
+        """Return write-behind and journal counters."""
+        return {
+            **super().stats,
+            "journal_bytes": self._journal_size,
+            "compactions": self.compaction_count,
+        }
@@ -0,0 +1,392 @@
+"""SQLite storage backend for Smart Home Farming garden data."""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+
+from .aggregates import AGGREGATED_COLLECTIONS, GardenAggregates
+from .const import DOMAIN, DEFAULT_COMMIT_DELAY, DEFAULT_MAX_COMMIT_LATENCY
+from .garden_codec import decode_garden_data
+from .garden_data import (
+    GardenData,
+    RECORD_COLLECTIONS,
+    RecordKey,
+)
+from .metrics import Instrumentation
+from .util import normalize_name, record_date, storage_name
+from .yields import YieldRollups, parse_yield
+
+_LOGGER = logging.getLogger(__name__)
+
+DATABASE_NAME = f"{DOMAIN}.garden"
+SCHEMA_VERSION = 1
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    *(
+        f"""CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT,
+            date TEXT,
+            plant TEXT,
+            plant_key TEXT,
+            location TEXT,
+            location_key TEXT,
+            data TEXT NOT NULL
+        )"""
+        for table in RECORD_COLLECTIONS
+    ),
+    *(
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column}, date)"
+        for table in ("planting_records", "harvest_records")
+        for column in ("plant_key", "location_key")
+    ),
+    *(
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} (date)"
+        for table in RECORD_COLLECTIONS
+    ),
+]
+
+
+# Beds of the plantings of each plant in date order, which decide the bed
+# of harvests recorded without one
+HARVEST_BEDS_SQL = (
+    "SELECT plant, location, date FROM planting_records "
+    "WHERE plant_key IS NOT NULL AND location_key IS NOT NULL ORDER BY date, id"
+)
+
+# Harvest totals per day, plant, bed and unit, with a NULL bed for harvests
+# recorded without one; amounts that were never normalized are grouped by
+# their text.
+HARVEST_TOTALS_SQL = (
+    "SELECT date, plant, bed, unit, amount, COUNT(*), SUM(quantity) FROM ("
+    "SELECT h.id, h.date, h.plant, CASE WHEN h.location_key IS NOT NULL "
+    "THEN h.location END AS bed, "
+    "CASE WHEN json_type(h.data, '$.yield_quantity') IS NOT NULL "
+    "THEN json_extract(h.data, '$.yield_unit') END AS unit, "
+    "json_extract(h.data, '$.yield_quantity') AS quantity, "
+    "CASE WHEN json_type(h.data, '$.yield_quantity') IS NULL "
+    "THEN json_extract(h.data, '$.yield_amount') END AS amount "
+    "FROM harvest_records AS h WHERE h.plant_key IS NOT NULL) "
+    "GROUP BY date, plant, bed, unit, amount ORDER BY date, MIN(id)"
+)
+
+
+def _row_values(record: Dict) -> Tuple:
+    """Return the column values of a record."""
+    plant = record.get("plant")
+    location = record.get("location")
+    return (
+        record.get("created_at"),
+        record_date(record) or "",
+        plant,
+        normalize_name(plant) if plant else None,
+        location,
+        normalize_name(location) if location else None,
+        json_dumps(record),
+    )
+
+
+class SQLiteGardenData(GardenData):
+    """Garden data stored in a local SQLite database.
+
+    The records are not kept in memory, only those waiting for their
+    commit, the change log of the last CHANGE_LOG_SIZE additions and the
+    yield rollups. Every database call runs in the executor on a single
+    connection that is serialized by a lock; filters and aggregates are
+    answered by indexed SQL instead of scanning the history in Python.
+    """
+
+    # The records are not held in memory, so there is nothing to archive
+    supports_archive = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        commit_delay: float = DEFAULT_COMMIT_DELAY,
+        max_commit_latency: float = DEFAULT_MAX_COMMIT_LATENCY,
+        instrumentation: Optional[Instrumentation] = None,
+        storage_id: Optional[str] = None,
+    ):
+        """Initialize SQLite backed garden data."""
+        super().__init__(
+            hass, commit_delay, max_commit_latency, instrumentation, storage_id
+        )
+        self._path = hass.config.path(
+            ".storage", f"{storage_name(DATABASE_NAME, storage_id)}.db"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._pending: List[Tuple[str, Dict]] = []
+
+    async def async_load(self) -> None:
+        """Open the database and migrate the Store document once."""
+        await self.hass.async_add_executor_job(self._open)
+        if not await self._async_execute(self._get_meta, "migrated_from_store"):
+            stored = await self._store.async_load()
+            legacy = (
+                await self.hass.async_add_executor_job(decode_garden_data, stored)
+                if stored
+                else {}
+            )
+            migrated = await self._async_execute(self._migrate, legacy)
+            _LOGGER.info("Migrated %s garden records to SQLite", migrated)
+
+        self.revision = int(await self._async_execute(self._get_meta, "revision") or 0)
+
+        self.yield_rollups = await self._async_execute(self._build_rollups)
+
+    def _open(self) -> None:
+        """Open the connection and create the schema."""
+        conn = sqlite3.connect(self._path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+        self._conn = conn
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        """Return a value from the meta table."""
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _migrate(self, conn: sqlite3.Connection, legacy: Dict) -> int:
+        """Copy the records of the Store document into the database."""
+        migrated = 0
+        with conn:
+            for kind in RECORD_COLLECTIONS:
+                rows = [_row_values(record) for record in legacy.get(kind, [])]
+                self._insert(conn, kind, rows)
+                migrated += len(rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('revision', ?)",
+                (str(legacy.get("revision", 0)),),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('migrated_from_store', '1')"
+            )
+        return migrated
+
+    def _build_rollups(self, conn: sqlite3.Connection) -> YieldRollups:
+        """Build the yield rollups from totals aggregated by the database.
+
+        Harvests are summed per day, plant, bed and unit, so Python only
+        sees one row per group. Harvests without a bed are booked to the
+        bed the plant was last planted in on or before their day.
+        """
+        rollups = YieldRollups()
+        for plant, location, day in conn.execute(HARVEST_BEDS_SQL):
+            rollups.add_planting({"plant": plant, "location": location, "date": day})
+        for day, plant, bed, unit, amount, harvests, quantity in conn.execute(
+            HARVEST_TOTALS_SQL
+        ):
+            if unit is not None:
+                total: Optional[Tuple[float, str]] = (quantity, unit)
+            else:
+                # Older records only kept the amount as entered
+                parsed = parse_yield(amount)
+                total = (parsed[0] * harvests, parsed[1]) if parsed else None
+            if bed is None:
+                rollups.add_unplaced_harvests(plant, day or None, total, harvests)
+            else:
+                rollups.add_harvests(plant, day or None, bed, total, harvests)
+        return rollups
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, kind: str, rows: Sequence[Tuple]) -> None:
+        """Insert column values into a record table."""
+        conn.executemany(
+            f"INSERT INTO {kind} (created_at, date, plant, plant_key, location, "
+            "location_key, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _run(self, func, *args) -> Any:
+        """Run a database function on the shared connection."""
+        with self._db_lock:
+            return func(self._conn, *args)
+
+    async def _async_execute(self, func, *args) -> Any:
+        """Run a database function in the executor."""
+        return await self.hass.async_add_executor_job(self._run, func, *args)
+
+    async def async_close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            await self.hass.async_add_executor_job(self._conn.close)
+            self._conn = None
+
+    @callback
+    def _async_append(self, kind: str, record: Dict) -> Dict:
+        """Queue a record for the next commit."""
+        entry = {
+            "created_at": datetime.now().isoformat(),
+            **record
+        }
+        self._async_log_change(kind, entry)
+        self._pending.append((kind, entry))
+        self.yield_rollups.add(kind, entry)
+        self._async_schedule_commit()
+        self._async_notify(kind, entry)
+        return entry
+
+    def _logged_record(self, kind: str, change: Any) -> Dict:
+        """Return the record of a change log entry, which is the record."""
+        return change
+
+    async def _async_commit(self) -> Optional[int]:
+        """Insert the queued records in one transaction."""
+        pending = self._pending
+        self._pending = []
+        try:
+            return await self._async_execute(self._commit, pending, self.revision)
+        except Exception:
+            self._pending = pending + self._pending
+            raise
+
+    def _commit(
+        self, conn: sqlite3.Connection, pending: List[Tuple[str, Dict]], revision: int
+    ) -> int:
+        """Insert records grouped per table and return the JSON bytes written."""
+        written = 0
+        with conn:
+            for kind in RECORD_COLLECTIONS:
+                rows = [_row_values(record) for table, record in pending if table == kind]
+                if rows:
+                    self._insert(conn, kind, rows)
+                    written += sum(len(row[-1]) for row in rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('revision', ?)", (str(revision),)
+            )
+        return written
+
+    def _select(
+        self, conn: sqlite3.Connection, sql: str, params: Sequence
+    ) -> List[Dict]:
+        """Return decoded records for a query on the data column."""
+        return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    async def _async_get_all(self, kind: str) -> List[Dict]:
+        """Return a full collection from the executor."""
+        await self.async_flush()
+        return await self._async_execute(
+            self._select, f"SELECT data FROM {kind} ORDER BY id", ()
+        )
+
+    async def async_get_planting_plans(self) -> List[Dict]:
+        """Get all planting plans without blocking the event loop."""
+        return await self._async_get_all("planting_plans")
+
+    async def async_get_planting_records(self) -> List[Dict]:
+        """Get all planting records without blocking the event loop."""
+        return await self._async_get_all("planting_records")
+
+    async def async_get_harvest_records(self) -> List[Dict]:
+        """Get all harvest records without blocking the event loop."""
+        return await self._async_get_all("harvest_records")
+
+    @staticmethod
+    def _where(
+        plant: Optional[str],
+        location: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+    ) -> Tuple[str, List]:
+        """Build a WHERE clause for the common filters."""
+        clauses = []
+        params: List = []
+        if plant:
+            clauses.append("plant_key = ?")
+            params.append(normalize_name(plant))
+        if location:
+            clauses.append("location_key = ?")
+            params.append(normalize_name(location))
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    async def async_query_page(
+        self,
+        kind: str,
+        plant: Optional[str] = None,
+        location: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[RecordKey] = None,
+        include_archive: bool = False,
+    ) -> Tuple[List[Dict], Optional[RecordKey]]:
+        """Return one page of matching records ordered by date."""
+        await self.async_flush()
+        where, params = self._where(plant, location, start_date, end_date)
+        if after is not None:
+            where = f"{where} AND" if where else " WHERE"
+            where += " (date, id) > (?, ?)"
+            params.extend(after)
+        sql = f"SELECT date, id, data FROM {kind}{where} ORDER BY date, id"
+        if limit is not None:
+            # Fetch one row more to learn whether another page follows
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        def _page(conn: sqlite3.Connection) -> List[Tuple]:
+            return conn.execute(sql, params).fetchall()
+
+        rows = await self._async_execute(_page)
+        next_key = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_key = (rows[-1][0], rows[-1][1])
+        return [json.loads(row[2]) for row in rows], next_key
+
+    def _build_aggregates(self, conn: sqlite3.Connection) -> GardenAggregates:
+        """Build the sensor aggregates from the latest rows per plant and bed."""
+        collections: Dict[str, List[Dict]] = {}
+        labels: Dict[str, str] = {}
+        for kind in AGGREGATED_COLLECTIONS:
+            # Bed-wise latest rows only matter for plantings
+            per_bed = (
+                " OR (by_bed = 1 AND location_key IS NOT NULL)"
+                if kind == "planting_records"
+                else ""
+            )
+            collections[kind] = self._select(
+                conn,
+                "SELECT data FROM (SELECT id, date, data, location_key, "
+                "ROW_NUMBER() OVER (PARTITION BY plant_key "
+                "ORDER BY date DESC, id DESC) AS by_plant, "
+                "ROW_NUMBER() OVER (PARTITION BY plant_key, location_key "
+                f"ORDER BY date DESC, id DESC) AS by_bed FROM {kind} "
+                f"WHERE plant_key IS NOT NULL) WHERE by_plant = 1{per_bed} "
+                "ORDER BY date, id",
+                (),
+            )
+            # Plants and beds keep the name they were first recorded with
+            for column in ("plant", "location"):
+                for name_key, name in conn.execute(
+                    f"SELECT {column}_key, {column} FROM {kind} WHERE id IN "
+                    f"(SELECT MIN(id) FROM {kind} WHERE {column}_key IS NOT NULL "
+                    f"GROUP BY {column}_key)"
+                ):
+                    labels.setdefault(name_key, name)
+        return GardenAggregates.from_records(collections, labels)
+
+    async def async_build_aggregates(self) -> GardenAggregates:
+        """Return the sensor aggregates computed by the database."""
+        await self.async_flush()
+        return await self._async_execute(self._build_aggregates)
@@ -0,0 +1,221 @@
+"""Background job queue for Smart Home Farming."""
+import asyncio
+from itertools import count
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.ulid import ulid_now
+
+from .const import (
+    DOMAIN,
+    DEFAULT_JOB_WORKERS,
+    DEFAULT_MAX_QUEUED_JOBS,
+    EVENT_JOB_DONE,
+    JOB_PRIORITIES,
+    MAX_FINISHED_JOBS,
+)
+from .util import storage_name
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.jobs"
+SAVE_DELAY = 1
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+# Runs a job from its ID and parameters and returns its result
+JobHandler = Callable[[str, Dict], Awaitable[Dict]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted to a full queue."""
+
+
+class JobQueue:
+    """Bounded priority queue of jobs run by a small worker pool.
+
+    Jobs are plain dicts persisted through a Store with a delayed save,
+    and saved right away when the queue is closed. Jobs that were queued or
+    running when it stopped are queued again on load; finished jobs are
+    kept for status queries up to a limit.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        storage_id: Optional[str] = None,
+        workers: int = DEFAULT_JOB_WORKERS,
+        max_queued: int = DEFAULT_MAX_QUEUED_JOBS,
+    ):
+        """Initialize the queue."""
+        self.hass = hass
+        self._store = Store(
+            hass, STORAGE_VERSION, storage_name(STORAGE_KEY, storage_id)
+        )
+        self._worker_tasks: List[asyncio.Task] = []
+        self._workers = workers
+        self._max_queued = max_queued
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: "asyncio.PriorityQueue" = asyncio.PriorityQueue()
+        self._order = count()
+        self.jobs: Dict[str, Dict] = {}
+        self.completed = 0
+        self.failed = 0
+
+    async def async_load(self) -> None:
+        """Load persisted jobs and queue the unfinished ones again."""
+        stored = await self._store.async_load()
+        for job in (stored or {}).get("jobs", []):
+            self.jobs[job["id"]] = job
+            if job["status"] in (STATUS_QUEUED, STATUS_RUNNING):
+                job["status"] = STATUS_QUEUED
+                self._enqueue(job)
+        if self._queue.qsize():
+            _LOGGER.info("Resuming %s queued jobs", self._queue.qsize())
+
+    def _data_to_save(self) -> Dict:
+        """Return the jobs for storage."""
+        return {"jobs": list(self.jobs.values())}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the jobs after a delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def register_handler(self, job_type: str, handler: JobHandler) -> None:
+        """Register the coroutine that runs jobs of a type."""
+        self._handlers[job_type] = handler
+
+    @callback
+    def async_start(self, entry: ConfigEntry) -> None:
+        """Start the workers; they are cancelled when the entry unloads."""
+        self._worker_tasks = [
+            entry.async_create_background_task(
+                self.hass, self._async_worker(), f"{DOMAIN} job worker {worker}"
+            )
+            for worker in range(self._workers)
+        ]
+
+    async def async_close(self) -> None:
+        """Stop the workers and save the jobs now.
+
+        A job that was running is saved as such and queued again by the
+        next load. Saving replaces any delayed save still pending, so it
+        cannot overwrite what a reloaded queue writes later.
+        """
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        await self._store.async_save(self._data_to_save())
+
+    def _enqueue(self, job: Dict) -> None:
+        """Put a job on the queue by priority, then submission order."""
+        priority = JOB_PRIORITIES.index(job["priority"])
+        self._queue.put_nowait((priority, next(self._order), job["id"]))
+
+    @callback
+    def async_submit(self, job_type: str, parameters: Dict, priority: str) -> Dict:
+        """Queue a job and return it."""
+        queued = sum(job["status"] == STATUS_QUEUED for job in self.jobs.values())
+        if queued >= self._max_queued:
+            raise JobQueueFullError(f"{queued} jobs are already queued")
+        job = {
+            "id": ulid_now(),
+            "type": job_type,
+            "priority": priority,
+            "status": STATUS_QUEUED,
+            "parameters": parameters,
+            "created_at": dt_util.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job["id"]] = job
+        self._enqueue(job)
+        self._async_schedule_save()
+        return job
+
+    @callback
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job by ID."""
+        return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        finished: List[str] = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["status"] in (STATUS_DONE, STATUS_FAILED)
+        ]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def _async_worker(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            _priority, _order, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] != STATUS_QUEUED:
+                continue
+            job["status"] = STATUS_RUNNING
+            job["started_at"] = dt_util.utcnow().isoformat()
+            self._async_schedule_save()
+
+            try:
+                job["result"] = await self._handlers[job["type"]](
+                    job_id, job["parameters"]
+                )
+                job["status"] = STATUS_DONE
+                self.completed += 1
+            except asyncio.CancelledError:
+                # Left running, so the job is queued again on the next load
+                raise
+            except Exception as e:
+                _LOGGER.error(
+                    "Error running %s job %s: %s", job["type"], job_id, str(e)
+                )
+                job["status"] = STATUS_FAILED
+                job["error"] = str(e)
+                self.failed += 1
+            job["finished_at"] = dt_util.utcnow().isoformat()
+            self._prune()
+            self._async_schedule_save()
+            self.hass.bus.async_fire(
+                EVENT_JOB_DONE,
+                {
+                    "job_id": job_id,
+                    "type": job["type"],
+                    "status": job["status"],
+                    "result": job["result"],
+                    "error": job["error"],
+                },
+            )
+
+    @property
+    def stats(self) -> Dict:
+        """Return queue counters."""
+        statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "queued": statuses.count(STATUS_QUEUED),
+            "running": statuses.count(STATUS_RUNNING),
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+async def async_remove_jobs(hass: HomeAssistant, storage_id: str) -> None:
+    """Delete the saved jobs of a removed garden."""
+    await Store(
+        hass, STORAGE_VERSION, storage_name(STORAGE_KEY, storage_id)
+    ).async_remove()
@@ -0,0 +1,198 @@
+"""Deterministic bed layout solver for Smart Home Farming."""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_COLD_FRAME,
+    CONF_LENGTH,
+    CONF_NAME,
+    CONF_SUNLIGHT,
+    CONF_WIDTH,
+    SUNLIGHT_DIRECT,
+)
+from .crops import ANTAGONISTS, COMPANIONS, CROPS, SUN_PARTIAL, crop_info, crop_key
+from .util import normalize_name
+
+# Scores for placing a plant in a bed
+SUN_MATCH = 1.0
+SUN_MISMATCH = -1.0
+COMPANION_WEIGHT = 0.5
+ANTAGONIST_PENALTY = 3.0
+COLD_FRAME_BONUS = 0.5
+
+# Planting months in which frost-tender plants prefer a cold frame
+EARLY_MONTHS = (2, 3, 4)
+
+_CROP_INDEX = {name: index for index, name in enumerate(CROPS)}
+# Index of unknown plants, whose row and column stay neutral
+_UNKNOWN = len(CROPS)
+
+
+def _build_affinity() -> np.ndarray:
+    """Return the crop affinity matrix: 1 companions, -1 antagonists."""
+    affinity = np.zeros((len(CROPS) + 1, len(CROPS) + 1), dtype=np.int8)
+    for pairs, value in ((COMPANIONS, 1), (ANTAGONISTS, -1)):
+        for first, second in pairs:
+            i, j = _CROP_INDEX[first], _CROP_INDEX[second]
+            affinity[i, j] = affinity[j, i] = value
+    return affinity
+
+
+AFFINITY = _build_affinity()
+
+
+def _is_early(planting_date: Optional[str]) -> bool:
+    """Return True if planting happens while frost is still likely."""
+    parsed = dt_util.parse_date(planting_date) if planting_date else None
+    month = (parsed or dt_util.now().date()).month
+    return month in EARLY_MONTHS
+
+
+def solve_layout(
+    beds: List[Dict], plants: List[str], planting_date: Optional[str] = None
+) -> Dict:
+    """Assign plants to beds and lay them out in rows.
+
+    Plants are placed largest row spacing first, each into the bed with
+    the best score for sunlight, companions already in the bed, a cold
+    frame for early frost-tender plants and free room. Every bed is then
+    split into bands of rows across its short side, companions next to
+    each other, with the spare length shared between its plants.
+    """
+    names, seen = [], set()
+    for plant in plants:
+        key = normalize_name(plant)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(str(plant).strip())
+
+    infos = [crop_info(name) for name in names]
+    index = np.array(
+        [_CROP_INDEX.get(crop_key(name), _UNKNOWN) for name in names], dtype=np.intp
+    )
+    affinity = AFFINITY[np.ix_(index, index)].astype(float)
+    row_cm = np.array([info["row_cm"] for info in infos], dtype=float)
+    plant_cm = np.array([info["plant_cm"] for info in infos], dtype=float)
+    partial = np.array([info["sun"] == SUN_PARTIAL for info in infos], dtype=bool)
+    tender = np.array([info["frost_tender"] for info in infos], dtype=bool)
+
+    long_cm = np.array(
+        [max(bed[CONF_LENGTH], bed[CONF_WIDTH]) for bed in beds], dtype=float
+    )
+    short_cm = np.array(
+        [min(bed[CONF_LENGTH], bed[CONF_WIDTH]) for bed in beds], dtype=float
+    )
+    direct = np.array(
+        [bed.get(CONF_SUNLIGHT) == SUNLIGHT_DIRECT for bed in beds], dtype=bool
+    )
+    cold = np.array([bool(bed.get(CONF_COLD_FRAME)) for bed in beds], dtype=bool)
+
+    # Scores that do not depend on the other plants, plants x beds
+    sunny = direct[np.newaxis, :] | partial[:, np.newaxis]
+    base = np.where(sunny, SUN_MATCH, SUN_MISMATCH)
+    if _is_early(planting_date):
+        base = base + COLD_FRAME_BONUS * (tender[:, np.newaxis] & cold[np.newaxis, :])
+    fits = plant_cm[:, np.newaxis] <= short_cm[np.newaxis, :]
+
+    assigned = np.zeros((len(names), len(beds)))
+    placement = np.full(len(names), -1, dtype=np.intp)
+    used = np.zeros(len(beds))
+    capacity = np.maximum(long_cm, 1.0)
+    unplaced = []
+
+    for plant in np.lexsort((np.arange(len(names)), -row_cm)):
+        companions = np.maximum(affinity[plant], 0) @ assigned
+        clashes = np.minimum(affinity[plant], 0) @ assigned
+        score = (
+            base[plant]
+            + COMPANION_WEIGHT * companions
+            + ANTAGONIST_PENALTY * clashes
+            - used / capacity
+        )
+        score[(used + row_cm[plant] > long_cm) | ~fits[plant]] = -np.inf
+        if np.isneginf(score).all():
+            unplaced.append(names[plant])
+            continue
+        bed = int(np.argmax(score))
+        placement[plant] = bed
+        assigned[plant, bed] = 1.0
+        used[bed] += row_cm[plant]
+
+    layout_beds, warnings = [], []
+    for bed_index, bed in enumerate(beds):
+        members = list(np.flatnonzero(placement == bed_index))
+        bed_name = bed.get(CONF_NAME, f"Bed {bed_index + 1}")
+        rows_of = {}
+        ordered = []
+        if members:
+            # Share the spare length, then chain companions side by side
+            spare = (long_cm[bed_index] - used[bed_index]) / len(members)
+            extra = np.floor(spare / row_cm[members]).astype(int)
+            rows_of = dict(zip(members, 1 + extra))
+            ordered = [members.pop(0)]
+            while members:
+                best = int(np.argmax(affinity[ordered[-1], members]))
+                ordered.append(members.pop(best))
+
+        depth = np.array([rows_of[plant] * row_cm[plant] for plant in ordered])
+        ends = np.cumsum(depth)
+
+        placed = []
+        for position, plant in enumerate(ordered):
+            rows = int(rows_of[plant])
+            per_row = max(int(short_cm[bed_index] // plant_cm[plant]), 1)
+            placed.append({
+                "plant": names[plant],
+                "rows": rows,
+                "per_row": per_row,
+                "count": rows * per_row,
+                "row_spacing_cm": int(row_cm[plant]),
+                "plant_spacing_cm": int(plant_cm[plant]),
+                "from_cm": int(ends[position] - depth[position]),
+                "to_cm": int(ends[position]),
+            })
+            if not sunny[plant, bed_index]:
+                warnings.append(f"{names[plant]} prefers more sun than {bed_name} gets")
+        for position, first in enumerate(ordered):
+            for second in ordered[position + 1:]:
+                if affinity[first, second] < 0:
+                    warnings.append(
+                        f"{names[first]} and {names[second]} share {bed_name}"
+                    )
+
+        layout_beds.append({
+            "name": bed_name,
+            "length_cm": int(long_cm[bed_index]),
+            "width_cm": int(short_cm[bed_index]),
+            "sunlight": bed.get(CONF_SUNLIGHT),
+            "cold_frame": bool(cold[bed_index]),
+            "plants": placed,
+        })
+
+    return {"beds": layout_beds, "unplaced": unplaced, "warnings": warnings}
+
+
+def describe_layout(layout: Dict) -> str:
+    """Render a layout as short text for a prompt."""
+    lines = []
+    for bed in layout["beds"]:
+        if not bed["plants"]:
+            continue
+        features = [f"{bed['length_cm']}x{bed['width_cm']} cm", f"{bed['sunlight']} sun"]
+        if bed["cold_frame"]:
+            features.append("cold frame")
+        bands = "; ".join(
+            f"{plant['plant']} at {plant['from_cm']}-{plant['to_cm']} cm, "
+            f"{plant['rows']} rows of {plant['per_row']} "
+            f"({plant['row_spacing_cm']}/{plant['plant_spacing_cm']} cm apart)"
+            for plant in bed["plants"]
+        )
+        lines.append(f"- {bed['name']} ({', '.join(features)}): {bands}")
+    if layout["unplaced"]:
+        lines.append(f"- Did not fit: {', '.join(layout['unplaced'])}")
+    for warning in layout["warnings"]:
+        lines.append(f"- Note: {warning}")
+    return "\n".join(lines)
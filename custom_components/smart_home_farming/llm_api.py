@@ -1,31 +1,251 @@
 """LLM API for Smart Home Farming."""
+import asyncio
+import hashlib
+import json
 import logging
-import google.generativeai as genai
+import re
+import time
+from typing import Dict, List
 
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CACHE_KIND_PLANTING_PLAN,
+    CACHE_KIND_CARE,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+)
+from .util import normalize_name, season_bucket
+from .layout import describe_layout
+from .llm_cache import make_cache_key
+from .metrics import Instrumentation, LatencyStats, estimate_tokens
+from .resilience import ResilientCaller
 
 _LOGGER = logging.getLogger(__name__)
 
+# Latency bucket for care requests covering several plants at once
+CALL_CARE_BATCH = "care_batch"
+
+JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+class UpstreamLimits:
+    """Rate limit, breaker, concurrency limit and in-flight requests of a client.
+
+    The client pool keeps one per upstream client, so gardens sharing a
+    client also share its quota, its breaker and identical requests.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+        max_concurrency=DEFAULT_MAX_CONCURRENT_REQUESTS,
+    ):
+        """Initialize the limits."""
+        self.resilience = ResilientCaller(
+            requests_per_minute,
+            RETRY_ATTEMPTS,
+            RETRY_BASE_DELAY,
+            RETRY_MAX_DELAY,
+            CIRCUIT_FAILURE_THRESHOLD,
+            CIRCUIT_RESET_TIMEOUT,
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.coalesced_calls = 0
+
+    @property
+    def stats(self):
+        """Return request coalescing and resilience counters."""
+        return {
+            "in_flight": len(self.inflight),
+            "coalesced_calls": self.coalesced_calls,
+            **self.resilience.stats,
+        }
+
 
 class LLMApi:
     """LLM API for Smart Home Farming."""
 
-    def __init__(self, api_key, location):
-        """Initialize LLM API."""
-        self.api_key = api_key
+    def __init__(
+        self,
+        backend,
+        location,
+        cache=None,
+        max_concurrency=DEFAULT_MAX_CONCURRENT_REQUESTS,
+        requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+        instrumentation=None,
+        context=None,
+        limits=None,
+    ):
+        """Initialize LLM API.
+
+        Limits borrowed from the client pool take the place of
+        max_concurrency and requests_per_minute.
+        """
+        self.backend = backend
         self.location = location
-        # Initialize the Gemini API
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+        self.cache = cache
+        self.context = context
+        self.instrumentation = instrumentation or Instrumentation()
+        self.limits = limits or UpstreamLimits(requests_per_minute, max_concurrency)
+        self.latency = {
+            CACHE_KIND_PLANTING_PLAN: LatencyStats(),
+            CACHE_KIND_CARE: LatencyStats(),
+            CALL_CARE_BATCH: LatencyStats(),
+        }
+
+    @property
+    def model_name(self):
+        """Return the model answering requests."""
+        return self.backend.model_name
+
+    async def async_setup(self):
+        """Prepare the backend client ahead of the first request."""
+        await self.backend.async_setup()
+
+    @property
+    def resilience(self):
+        """Return the rate limit, retries and breaker of the client."""
+        return self.limits.resilience
+
+    async def _async_generate(self, call_type, prompt):
+        """Return the model's answer to a prompt.
+
+        Identical requests already in flight, from this garden or another
+        one sharing the client, share one upstream request. Each caller
+        awaits it through a shield so a cancelled caller does not cancel
+        the request for the others.
+        """
+        inflight = self.limits.inflight
+        key = hashlib.sha256(
+            json.dumps([self._prefix, prompt]).encode()
+        ).hexdigest()
+        task = inflight.get(key)
+        if task is not None:
+            self.limits.coalesced_calls += 1
+        else:
+            task = asyncio.ensure_future(self._async_request(call_type, prompt))
+            inflight[key] = task
+            task.add_done_callback(lambda _task: inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _async_request(self, call_type, prompt):
+        """Send a request upstream with rate limiting, retries and breaker."""
+        return await self.resilience.async_call(
+            lambda: self._async_attempt(call_type, prompt)
+        )
+
+    async def _async_attempt(self, call_type, prompt):
+        """Send one attempt upstream within the concurrency limit."""
+        async with self.limits.semaphore:
+            start = time.monotonic()
+            try:
+                text = await self.backend.async_generate(prompt, self._prefix)
+            finally:
+                self.latency[call_type].record(time.monotonic() - start)
+        self._count_tokens(call_type, prompt, text)
+        return text
+
+    @property
+    def _prefix(self):
+        """Return the stable context sent ahead of every prompt, if any."""
+        return self.context.prefix if self.context is not None else None
+
+    def _count_tokens(self, call_type, prompt, text):
+        """Log and count the estimated token usage of one upstream request."""
+        prefix_tokens = self.context.prefix_tokens if self.context is not None else 0
+        prompt_tokens = estimate_tokens(prompt)
+        response_tokens = estimate_tokens(text)
+        _LOGGER.debug(
+            "LLM %s request used about %d prefix, %d prompt and %d response tokens",
+            call_type,
+            prefix_tokens,
+            prompt_tokens,
+            response_tokens,
+        )
+        if self.instrumentation.enabled:
+            self.instrumentation.count("llm.prefix_tokens", prefix_tokens)
+            self.instrumentation.count("llm.prompt_tokens", prompt_tokens)
+            self.instrumentation.count("llm.response_tokens", response_tokens)
+
+    @property
+    def stats(self):
+        """Return request coalescing and latency counters."""
+        return {
+            **self.limits.stats,
+            "context": self.context.stats if self.context is not None else None,
+            "latency": {
+                call_type: latency.stats
+                for call_type, latency in self.latency.items()
+            },
+        }
+
+    def _cache_key(self, kind, **parts):
+        """Return the cache key for a request to the current model."""
+        if self.context is not None:
+            parts["context"] = self.context.prefix_key
+        return make_cache_key(
+            kind,
+            location=normalize_name(self.location),
+            model=self.model_name,
+            **parts,
+        )
+
+    def _history(self):
+        """Return the budgeted garden history as a prompt section and its digest."""
+        if self.context is None:
+            return "", ""
+        season = season_bucket(dt_util.now().date())
+        history, digest = self.context.history(season)
+        if not history:
+            return "", ""
+        return f"Planted this season ({season}), per bed:\n{history}\n", digest
+
+    def _planting_plan_request(
+        self, available_space, desired_plants, planting_date, layout=None
+    ):
+        """Return the cache key and prompt for a planting plan.
+
+        With a layout computed by the solver the model only explains it,
+        which keeps the prompt short and the placements reproducible.
+        """
+        history, history_key = self._history()
+        if layout is not None:
+            description = describe_layout(layout)
+            cache_key = self._cache_key(
+                CACHE_KIND_PLANTING_PLAN,
+                layout=description,
+                season=season_bucket(planting_date),
+                history=history_key,
+            )
+            prompt = f"""As a gardening expert, explain this planting layout for {self.location}, planting date {planting_date or 'not set'}.
+        The placements and quantities are fixed; do not change them.
+        {description}
+        {history}
+
+        Briefly explain why the plants are placed this way, when to sow or plant each one and how to care for them.
+        """
+            return cache_key, prompt
+
+        cache_key = self._cache_key(
+            CACHE_KIND_PLANTING_PLAN,
+            space=normalize_name(available_space),
+            plants=sorted({normalize_name(plant) for plant in desired_plants}),
+            season=season_bucket(planting_date),
+            history=history_key,
+        )
 
-    async def generate_planting_plan(self, available_space, desired_plants, planting_date):
-        """Generate planting plan."""
         prompt = f"""As a gardening expert, create a planting plan for the following:
         - Available space: {available_space}
         - Desired plants: {', '.join(desired_plants)}
         - Planting date: {planting_date}
         - Location: {self.location}
-        
+        {history}
         Consider:
         1. Companion planting benefits
         2. Space requirements for each plant
@@ -38,16 +258,91 @@ class LLMApi:
         - Timing for each plant
         - Care instructions
         """
-        
-        try:
-            response = await self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            _LOGGER.error("Error generating planting plan: %s", str(e))
-            return f"Error generating planting plan: {str(e)}"
+        return cache_key, prompt
+
+    async def generate_planting_plan(
+        self, available_space, desired_plants, planting_date, layout=None
+    ):
+        """Generate planting plan."""
+        with self.instrumentation.timer("llm.generate_planting_plan"):
+            return await self._generate_planting_plan(
+                available_space, desired_plants, planting_date, layout
+            )
+
+    async def _generate_planting_plan(
+        self, available_space, desired_plants, planting_date, layout=None
+    ):
+        """Return a cached or newly generated planting plan."""
+        cache_key, prompt = self._planting_plan_request(
+            available_space, desired_plants, planting_date, layout
+        )
+        if self.cache is not None:
+            cached = self.cache.get(CACHE_KIND_PLANTING_PLAN, cache_key)
+            if cached is not None:
+                _LOGGER.debug("Using cached planting plan")
+                return cached
+
+        text = await self._async_generate(CACHE_KIND_PLANTING_PLAN, prompt)
+
+        if self.cache is not None:
+            self.cache.set(CACHE_KIND_PLANTING_PLAN, cache_key, text)
+        return text
+
+    async def stream_planting_plan(
+        self, available_space, desired_plants, planting_date, layout=None
+    ):
+        """Generate a planting plan, yielding text chunks as they arrive.
+
+        The plan is only cached once the stream has completed. A stream is
+        not retried, since chunks may already have been handed out.
+        """
+        cache_key, prompt = self._planting_plan_request(
+            available_space, desired_plants, planting_date, layout
+        )
+        if self.cache is not None:
+            cached = self.cache.get(CACHE_KIND_PLANTING_PLAN, cache_key)
+            if cached is not None:
+                _LOGGER.debug("Using cached planting plan")
+                yield cached
+                return
+
+        chunks = []
+        await self.resilience.async_acquire()
+        async with self.limits.semaphore:
+            start = time.monotonic()
+            try:
+                async for chunk in self.backend.async_stream(prompt, self._prefix):
+                    chunks.append(chunk)
+                    yield chunk
+            except BaseException as err:
+                # Also covers cancellation and streams closed early, which
+                # must not keep the breaker's half-open trial
+                self.resilience.record_error(err)
+                raise
+            finally:
+                elapsed = time.monotonic() - start
+                self.latency[CACHE_KIND_PLANTING_PLAN].record(elapsed)
+                self.instrumentation.observe("llm.stream_planting_plan", elapsed)
+        self.resilience.breaker.record_success()
+        self._count_tokens(CACHE_KIND_PLANTING_PLAN, prompt, "".join(chunks))
+
+        if self.cache is not None:
+            self.cache.set(CACHE_KIND_PLANTING_PLAN, cache_key, "".join(chunks))
 
     async def get_plant_care_recommendations(self, plant):
         """Get plant care recommendations."""
+        with self.instrumentation.timer("llm.get_plant_care_recommendations"):
+            return await self._get_plant_care_recommendations(plant)
+
+    async def _get_plant_care_recommendations(self, plant):
+        """Return cached or newly generated care recommendations."""
+        cache_key = self._cache_key(CACHE_KIND_CARE, plant=normalize_name(plant))
+        if self.cache is not None:
+            cached = self.cache.get(CACHE_KIND_CARE, cache_key)
+            if cached is not None:
+                _LOGGER.debug("Using cached care recommendations for %s", plant)
+                return cached
+
         prompt = f"""As a gardening expert, provide detailed care recommendations for {plant} in {self.location}.
         Include:
         1. Watering requirements
@@ -57,9 +352,78 @@ class LLMApi:
         5. Harvesting tips (if applicable)
         """
         
+        text = await self._async_generate(CACHE_KIND_CARE, prompt)
+
+        if self.cache is not None:
+            self.cache.set(CACHE_KIND_CARE, cache_key, text)
+        return text
+
+    async def get_care_recommendations(self, plants: List[str]) -> Dict[str, str]:
+        """Get care recommendations for several plants with one request."""
+        with self.instrumentation.timer("llm.get_care_recommendations"):
+            return await self._get_care_recommendations(plants)
+
+    async def _get_care_recommendations(self, plants: List[str]) -> Dict[str, str]:
+        """Answer care recommendations from the cache and one batch request.
+
+        Cached plants are answered locally; the misses are packed into a
+        single prompt asking for a JSON object keyed by plant, and each
+        answer is cached on its own so later single-plant calls hit too.
+        """
+        results: Dict[str, str] = {}
+        misses: Dict[str, str] = {}
+        for plant in plants:
+            cache_key = self._cache_key(CACHE_KIND_CARE, plant=normalize_name(plant))
+            cached = None
+            if self.cache is not None:
+                cached = self.cache.get(CACHE_KIND_CARE, cache_key)
+            if cached is not None:
+                results[plant] = cached
+            else:
+                misses[plant] = cache_key
+
+        if not misses:
+            return results
+
+        prompt = f"""As a gardening expert, provide detailed care recommendations for each of these plants in {self.location}: {', '.join(misses)}.
+        For each plant include:
+        1. Watering requirements
+        2. Sunlight needs
+        3. Soil preferences
+        4. Common issues and solutions
+        5. Harvesting tips (if applicable)
+
+        Answer with a single JSON object only. Use the plant names exactly as
+        given above as keys and the recommendations as plain-text values.
+        """
+
+        answers: Dict[str, str] = {}
+        text = await self._async_generate(CALL_CARE_BATCH, prompt)
         try:
-            response = await self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            _LOGGER.error("Error getting plant care recommendations: %s", str(e))
-            return f"Error getting plant care recommendations: {str(e)}"
+            parsed = json.loads(JSON_FENCE.sub("", text.strip()))
+            by_name = {normalize_name(name): value for name, value in parsed.items()}
+        except (ValueError, AttributeError) as e:
+            _LOGGER.warning("Could not parse batched care recommendations: %s", str(e))
+            by_name = {}
+        for plant in misses:
+            value = by_name.get(normalize_name(plant))
+            if isinstance(value, str) and value:
+                answers[plant] = value
+
+        for plant, value in answers.items():
+            if self.cache is not None:
+                self.cache.set(CACHE_KIND_CARE, misses[plant], value)
+            results[plant] = value
+
+        # Plants the batch answer left out are asked for one by one
+        missing = [plant for plant in misses if plant not in answers]
+        if missing:
+            _LOGGER.debug("Requesting care recommendations separately for %s", missing)
+            for plant, value in zip(
+                missing,
+                await asyncio.gather(
+                    *(self.get_plant_care_recommendations(plant) for plant in missing)
+                ),
+            ):
+                results[plant] = value
+        return results
@@ -0,0 +1,277 @@
+"""Text generation backends for the Smart Home Farming LLM API."""
+import asyncio
+from functools import partial
+import json
+import logging
+import random
+import time
+import zlib
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from .const import DEFAULT_GEMINI_MODEL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """Error raised by a backend when a request fails."""
+
+    def __init__(self, message: str, transient: bool = True):
+        """Initialize the error; transient errors may be retried."""
+        super().__init__(message)
+        self.transient = transient
+
+
+def _is_retryable_status(status: int) -> bool:
+    """Return True for HTTP statuses caused by load or outages."""
+    return status == 429 or status >= 500
+
+
+class LLMBackend:
+    """Interface every text generation backend implements."""
+
+    name = "base"
+    model_name = ""
+
+    async def async_setup(self) -> None:
+        """Prepare the client; called before the first request."""
+
+    async def async_generate(self, prompt: str, prefix: Optional[str] = None) -> str:
+        """Return the complete answer to a prompt.
+
+        ``prefix`` is context that is identical across requests; backends
+        send it first so providers with prefix caching can reuse it.
+        """
+        raise NotImplementedError
+
+    async def async_stream(
+        self, prompt: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer to a prompt in chunks as they arrive."""
+        yield await self.async_generate(prompt, prefix)
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini through the google-generativeai SDK.
+
+    The SDK is imported and configured in the executor on first use, so
+    creating the backend does not touch it.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str = DEFAULT_GEMINI_MODEL):
+        """Initialize the Gemini backend."""
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = asyncio.Lock()
+
+    def _build_model(self):
+        """Import the Gemini SDK and create the model client."""
+        import google.generativeai as genai
+
+        genai.configure(api_key=self.api_key)
+        return genai.GenerativeModel(self.model_name)
+
+    async def async_setup(self) -> None:
+        """Build the model client in the executor if needed."""
+        if self._model is not None:
+            return
+        async with self._model_lock:
+            if self._model is None:
+                start = time.monotonic()
+                self._model = await asyncio.get_running_loop().run_in_executor(
+                    None, self._build_model
+                )
+                _LOGGER.debug(
+                    "Initialized Gemini client in %.3f s", time.monotonic() - start
+                )
+
+    @staticmethod
+    def _contents(prompt: str, prefix: Optional[str]):
+        """Return the request contents with the prefix as the first part."""
+        return [prefix, prompt] if prefix else prompt
+
+    async def async_generate(self, prompt: str, prefix: Optional[str] = None) -> str:
+        """Return the complete answer to a prompt."""
+        await self.async_setup()
+        contents = self._contents(prompt, prefix)
+        if hasattr(self._model, "generate_content_async"):
+            response = await self._model.generate_content_async(contents)
+        else:
+            # Older SDKs only offer the blocking call
+            response = await asyncio.get_running_loop().run_in_executor(
+                None, partial(self._model.generate_content, contents)
+            )
+        return response.text
+
+    async def async_stream(
+        self, prompt: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer to a prompt in chunks as they arrive."""
+        await self.async_setup()
+        contents = self._contents(prompt, prefix)
+        if hasattr(self._model, "generate_content_async"):
+            response = await self._model.generate_content_async(contents, stream=True)
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+            return
+
+        # Older SDKs only offer the blocking call, so read chunks in the executor
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None, partial(self._model.generate_content, contents, stream=True)
+        )
+        chunks = iter(response)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                return
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Any server implementing the OpenAI chat completions API.
+
+    Useful for pointing the integration at a local model server such as
+    llama.cpp, Ollama or vLLM, including for offline load tests.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        model_name: str,
+        api_key: Optional[str] = None,
+    ):
+        """Initialize the OpenAI compatible backend."""
+        self._session = session
+        self._url = f"{base_url.rstrip('/')}/chat/completions"
+        self.model_name = model_name
+        self._headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    def _payload(self, prompt: str, prefix: Optional[str], stream: bool) -> dict:
+        """Return the request body for a prompt.
+
+        The prefix goes into a leading system message, which servers with
+        automatic prompt caching reuse between requests.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if prefix:
+            messages.insert(0, {"role": "system", "content": prefix})
+        return {
+            "model": self.model_name,
+            "messages": messages,
+            "stream": stream,
+        }
+
+    async def async_generate(self, prompt: str, prefix: Optional[str] = None) -> str:
+        """Return the complete answer to a prompt."""
+        try:
+            async with self._session.post(
+                self._url,
+                json=self._payload(prompt, prefix, False),
+                headers=self._headers,
+            ) as response:
+                response.raise_for_status()
+                body = await response.json()
+        except aiohttp.ClientResponseError as e:
+            raise LLMBackendError(str(e), _is_retryable_status(e.status)) from e
+        except aiohttp.ClientError as e:
+            raise LLMBackendError(str(e)) from e
+        return body["choices"][0]["message"]["content"]
+
+    async def async_stream(
+        self, prompt: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer from server-sent events as they arrive."""
+        try:
+            async with self._session.post(
+                self._url,
+                json=self._payload(prompt, prefix, True),
+                headers=self._headers,
+            ) as response:
+                response.raise_for_status()
+                async for raw_line in response.content:
+                    line = raw_line.decode().strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        yield delta["content"]
+        except aiohttp.ClientResponseError as e:
+            raise LLMBackendError(str(e), _is_retryable_status(e.status)) from e
+        except aiohttp.ClientError as e:
+            raise LLMBackendError(str(e)) from e
+
+
+class FakeBackend(LLMBackend):
+    """Local stand-in with configurable latency and error rate.
+
+    Answers are derived from the prompt, so identical prompts get identical
+    answers and caching and coalescing behave as they would upstream. The
+    prefix is ignored.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        jitter: float = 0.1,
+        error_rate: float = 0.0,
+        chunk_count: int = 5,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the fake backend."""
+        self.model_name = "fake"
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_count = chunk_count
+        self.requests = 0
+        self._random = random.Random(seed)
+
+    async def _async_delay(self, fraction: float = 1.0) -> None:
+        """Sleep for (a fraction of) one simulated request."""
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        await asyncio.sleep(max(0.0, delay) * fraction)
+
+    def _answer(self, prompt: str) -> str:
+        """Return a deterministic answer for a prompt."""
+        self.requests += 1
+        if self._random.random() < self.error_rate:
+            raise LLMBackendError("Simulated backend error")
+        if "JSON object" in prompt:
+            # Batched care prompts list the plants after the first colon
+            plants = prompt.split(":", 1)[1].split(".", 1)[0]
+            return json.dumps({
+                plant.strip(): f"Fake care recommendations for {plant.strip()}."
+                for plant in plants.split(",")
+            })
+        return f"Fake answer {zlib.crc32(prompt.encode())} for a {len(prompt)} character prompt."
+
+    async def async_generate(self, prompt: str, prefix: Optional[str] = None) -> str:
+        """Return the answer after the simulated latency."""
+        await self._async_delay()
+        return self._answer(prompt)
+
+    async def async_stream(
+        self, prompt: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield the answer in chunks spread over the simulated latency."""
+        text = self._answer(prompt)
+        size = max(1, len(text) // self.chunk_count + 1)
+        for start in range(0, len(text), size):
+            await self._async_delay(1 / self.chunk_count)
+            yield text[start:start + size]
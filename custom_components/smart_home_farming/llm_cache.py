@@ -0,0 +1,138 @@
+"""Persistent response cache for Smart Home Farming LLM calls."""
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DEFAULT_CACHE_SIZE, CACHE_TTLS
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.llm_cache"
+SAVE_DELAY = 30
+
+
+def make_cache_key(kind: str, **parts) -> str:
+    """Return a stable key for normalized request parts."""
+    raw = json.dumps({"kind": kind, **parts}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Size-bounded LRU cache of LLM responses with a TTL per kind.
+
+    Entries are persisted through a Store with a delayed save, so repeated
+    prompts are answered locally across restarts without rewriting the
+    cache file on every hit. Without ``hass`` the cache is memory only.
+    """
+
+    def __init__(
+        self,
+        hass: Optional[HomeAssistant],
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        ttls: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize the cache."""
+        self.hass = hass
+        self._store = (
+            Store(hass, STORAGE_VERSION, STORAGE_KEY) if hass is not None else None
+        )
+        self._max_entries = max_entries
+        self._ttls = ttls or CACHE_TTLS
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def async_load(self) -> None:
+        """Load cached responses that have not expired yet."""
+        if self._store is None:
+            return
+        stored = await self._store.async_load()
+        now = time.time()
+        for key, entry in (stored or {}).get("entries", []):
+            if entry["expires"] > now:
+                self._entries[key] = entry
+        self._evict()
+
+    async def async_save(self) -> None:
+        """Write the cache to storage now."""
+        if self._store is None:
+            return
+        await self._store.async_save(self._data_to_save())
+
+    def _data_to_save(self) -> Dict:
+        """Return the cache in LRU order for storage."""
+        return {"entries": list(self._entries.items())}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the cache after a delay."""
+        if self._store is None:
+            return
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def get(self, kind: str, key: str) -> Optional[str]:
+        """Return a cached response or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None or entry["kind"] != kind:
+            self.misses += 1
+            return None
+        if entry["expires"] <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            self._async_schedule_save()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["value"]
+
+    @callback
+    def set(self, kind: str, key: str, value: str) -> None:
+        """Store a response and evict the least recently used entries."""
+        self._entries[key] = {
+            "kind": kind,
+            "value": value,
+            "expires": time.time() + self._ttls.get(kind, 0),
+        }
+        self._entries.move_to_end(key)
+        self._evict()
+        self._async_schedule_save()
+
+    def _evict(self) -> None:
+        """Drop entries beyond the size bound."""
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @callback
+    def invalidate(self, kind: Optional[str] = None) -> int:
+        """Remove all entries, or all entries of one kind."""
+        if kind is None:
+            removed = len(self._entries)
+            self._entries.clear()
+        else:
+            keys = [key for key, entry in self._entries.items() if entry["kind"] == kind]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+        self._async_schedule_save()
+        _LOGGER.debug("Invalidated %s cached LLM responses", removed)
+        return removed
+
+    @property
+    def stats(self) -> Dict:
+        """Return cache counters."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,147 @@
+"""LLM clients and response cache shared by all Smart Home Farming gardens."""
+import asyncio
+import logging
+from typing import Dict, Set, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    CONF_BASE_URL,
+    CONF_LLM_BACKEND,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MODEL,
+    CONF_REQUESTS_PER_MINUTE,
+    DEFAULT_GEMINI_MODEL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    LLM_BACKEND_FAKE,
+    LLM_BACKEND_GEMINI,
+    LLM_BACKEND_OPENAI,
+)
+from .llm_backend import (
+    FakeBackend,
+    GeminiBackend,
+    LLMBackend,
+    OpenAICompatibleBackend,
+)
+from .llm_api import UpstreamLimits
+from .llm_cache import LLMResponseCache
+
+_LOGGER = logging.getLogger(__name__)
+
+# Settings that identify one upstream client
+BackendKey = Tuple[str, str, str, str]
+
+
+def _backend_key(entry: ConfigEntry) -> BackendKey:
+    """Return the settings of the backend an entry uses."""
+    return (
+        entry.options.get(CONF_LLM_BACKEND, LLM_BACKEND_GEMINI),
+        entry.data.get(CONF_API_KEY) or "",
+        entry.options.get(CONF_BASE_URL) or "",
+        entry.options.get(CONF_MODEL) or "",
+    )
+
+
+class LLMClientPool:
+    """Backends and the response cache shared by all config entries.
+
+    Gardens configured with the same backend, API key, URL and model share
+    one client, so e.g. the Gemini SDK is only set up once. They also share
+    its rate limit, circuit breaker, concurrency limit and requests in
+    flight, taken from the options of the garden that created the client.
+    A client is dropped when the last entry using it is unloaded. Cache
+    keys include the location and garden context, so gardens never get
+    each other's answers.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        """Initialize the pool."""
+        self.hass = hass
+        self.cache = LLMResponseCache(hass)
+        self._backends: Dict[BackendKey, LLMBackend] = {}
+        self._limits: Dict[BackendKey, UpstreamLimits] = {}
+        self._users: Dict[BackendKey, Set[str]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the response cache once."""
+        async with self._load_lock:
+            if not self._loaded:
+                await self.cache.async_load()
+                self._loaded = True
+
+    def _create_backend(self, entry: ConfigEntry) -> LLMBackend:
+        """Create the text generation backend selected for an entry."""
+        backend = entry.options.get(CONF_LLM_BACKEND, LLM_BACKEND_GEMINI)
+        if backend == LLM_BACKEND_OPENAI:
+            return OpenAICompatibleBackend(
+                async_get_clientsession(self.hass),
+                entry.options[CONF_BASE_URL],
+                entry.options.get(CONF_MODEL) or "default",
+                api_key=entry.data.get(CONF_API_KEY),
+            )
+        if backend == LLM_BACKEND_FAKE:
+            return FakeBackend()
+        return GeminiBackend(
+            entry.data[CONF_API_KEY],
+            entry.options.get(CONF_MODEL) or DEFAULT_GEMINI_MODEL,
+        )
+
+    @callback
+    def acquire(self, entry: ConfigEntry) -> Tuple[LLMBackend, UpstreamLimits]:
+        """Return the backend of an entry and its limits.
+
+        Both are created if no other entry shares them.
+        """
+        key = _backend_key(entry)
+        backend = self._backends.get(key)
+        if backend is None:
+            backend = self._backends[key] = self._create_backend(entry)
+            self._limits[key] = UpstreamLimits(
+                entry.options.get(
+                    CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+                ),
+                entry.options.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                ),
+            )
+            self._users[key] = set()
+        else:
+            _LOGGER.debug("Sharing the %s client with another garden", backend.name)
+        self._users[key].add(entry.entry_id)
+        return backend, self._limits[key]
+
+    @callback
+    def release(self, entry_id: str) -> None:
+        """Stop sharing backends with an entry; drop clients nobody uses."""
+        for key in list(self._users):
+            self._users[key].discard(entry_id)
+            if not self._users[key]:
+                del self._users[key]
+                del self._backends[key]
+                del self._limits[key]
+
+    @property
+    def in_use(self) -> bool:
+        """Return whether any entry still uses the pool."""
+        return bool(self._users)
+
+    @property
+    def stats(self) -> Dict:
+        """Return the shared clients and the entries using them."""
+        return {
+            "clients": [
+                {
+                    "backend": key[0],
+                    "model": backend.model_name,
+                    "entries": len(self._users[key]),
+                    **self._limits[key].stats,
+                }
+                for key, backend in self._backends.items()
+            ],
+        }
@@ -0,0 +1,124 @@
+"""Lightweight runtime metrics for Smart Home Farming."""
+from collections import deque
+from contextlib import nullcontext
+import math
+import time
+from typing import Deque, Dict
+
+DEFAULT_WINDOW = 512
+
+
+class LatencyStats:
+    """Rolling latency samples with percentile summaries.
+
+    Only the most recent ``window`` samples are kept, so recording is O(1)
+    and percentiles are computed on demand when stats are read.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """Initialize latency stats."""
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self._samples.append(seconds)
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Return a percentile of the recent samples using nearest rank."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(percent / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    @property
+    def stats(self) -> Dict:
+        """Return count, p50, p95 and max in seconds."""
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(50), 4),
+            "p95": round(self.percentile(95), 4),
+            "max": round(self.max, 4),
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text at about four characters per token."""
+    return math.ceil(len(text) / 4)
+
+
+class _Timer:
+    """Context manager recording the time spent inside it."""
+
+    __slots__ = ("_instrumentation", "_name", "_start")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str):
+        """Initialize the timer."""
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        """Start timing."""
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        """Record the elapsed time."""
+        self._instrumentation.record(self._name, time.perf_counter() - self._start)
+
+
+_NULL_TIMER = nullcontext()
+
+
+class Instrumentation:
+    """Histograms and counters for one config entry.
+
+    When disabled, ``timer`` hands out a shared no-op context manager and
+    ``observe`` and ``count`` return right away, so instrumented code pays
+    one attribute check per call.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """Initialize instrumentation."""
+        self.enabled = enabled
+        self.histograms: Dict[str, LatencyStats] = {}
+        self.counters: Dict[str, int] = {}
+
+    def record(self, name: str, value: float) -> None:
+        """Add one sample to a histogram."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyStats()
+        histogram.record(value)
+
+    def observe(self, name: str, value: float) -> None:
+        """Add one sample to a histogram if instrumentation is enabled."""
+        if self.enabled:
+            self.record(name, value)
+
+    def timer(self, name: str):
+        """Return a context manager timing the code inside it in seconds."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add to a counter if instrumentation is enabled."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @property
+    def stats(self) -> Dict:
+        """Return all histograms and counters."""
+        return {
+            "enabled": self.enabled,
+            "histograms": {
+                name: histogram.stats for name, histogram in self.histograms.items()
+            },
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,112 @@
+"""Prompt context for Smart Home Farming LLM requests."""
+import hashlib
+from typing import Dict, List, Tuple
+
+from .const import (
+    CONF_BED_TYPE,
+    CONF_COLD_FRAME,
+    CONF_LENGTH,
+    CONF_NAME,
+    CONF_SUNLIGHT,
+    CONF_WIDTH,
+    DEFAULT_HISTORY_TOKENS,
+)
+from .crops import ANTAGONISTS, COMPANIONS
+from .metrics import estimate_tokens
+from .util import record_date, season_bucket
+
+
+class PromptContext:
+    """Garden context shared by every prompt.
+
+    The prefix (location, beds and crop rules) only changes with the
+    configuration, so it is built once and sent ahead of each prompt where
+    backends can cache it. The history lists the plants planted in each bed
+    in a season, cut to a token budget.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        beds: List[Dict],
+        history_tokens: int = DEFAULT_HISTORY_TOKENS,
+    ):
+        """Initialize the context and build the prefix."""
+        self.prefix = self._build_prefix(location, beds)
+        self.prefix_key = hashlib.sha256(self.prefix.encode()).hexdigest()[:16]
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        self.history_tokens = history_tokens
+        # Set once the garden aggregates are built
+        self.aggregates = None
+
+    @staticmethod
+    def _build_prefix(location: str, beds: List[Dict]) -> str:
+        """Return the stable part of every prompt."""
+        lines = [
+            "You are a gardening expert advising on this garden.",
+            f"Location: {location}",
+        ]
+        if beds:
+            lines.append("Beds:")
+            for bed in beds:
+                features = [
+                    bed.get(CONF_BED_TYPE, "bed"),
+                    f"{bed.get(CONF_LENGTH)}x{bed.get(CONF_WIDTH)} cm",
+                    f"{bed.get(CONF_SUNLIGHT)} sunlight",
+                ]
+                if bed.get(CONF_COLD_FRAME):
+                    features.append("cold frame")
+                lines.append(f"- {bed.get(CONF_NAME)}: {', '.join(features)}")
+        lines.append(
+            "Good neighbours: "
+            + ", ".join(f"{first}+{second}" for first, second in COMPANIONS)
+        )
+        lines.append(
+            "Keep apart: "
+            + ", ".join(f"{first}/{second}" for first, second in ANTAGONISTS)
+        )
+        return "\n".join(lines)
+
+    def season_plantings(self, season: str) -> List[Tuple[str, List[str]]]:
+        """Return the plants planted in each bed in a season, sorted by bed."""
+        if self.aggregates is None:
+            return []
+        labels = self.aggregates.labels
+        beds = []
+        for bed_key, plantings in sorted(self.aggregates.bed_plantings.items()):
+            plants = sorted(
+                labels[plant_key]
+                for plant_key, record in plantings.items()
+                if season_bucket(record_date(record)) == season
+            )
+            if plants:
+                beds.append((labels[bed_key], plants))
+        return beds
+
+    def history(self, season: str) -> Tuple[str, str]:
+        """Return a season's plantings per bed and a digest for cache keys.
+
+        The digest only covers the returned text, so plan cache entries stay
+        valid until the plants in the beds change.
+        """
+        lines: List[str] = []
+        used = 0
+        for bed, plants in self.season_plantings(season):
+            line = f"- {bed}: {', '.join(plants)}"
+            cost = estimate_tokens(line)
+            if used + cost > self.history_tokens:
+                break
+            lines.append(line)
+            used += cost
+        if not lines:
+            return "", ""
+        history = "\n".join(lines)
+        return history, hashlib.sha256(history.encode()).hexdigest()[:16]
+
+    @property
+    def stats(self) -> Dict:
+        """Return the context sizes."""
+        return {
+            "prefix_tokens": self.prefix_tokens,
+            "history_budget_tokens": self.history_tokens,
+        }
@@ -0,0 +1,109 @@
+"""CSV and JSON Lines files of Smart Home Farming garden records."""
+import csv
+import json
+import os
+from typing import IO, Dict, List, Optional
+
+from homeassistant.helpers.json import json_dumps
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FILE_FORMATS = {".csv": FORMAT_CSV, ".jsonl": FORMAT_JSONL}
+
+# Collections that can be imported and exported; plans are AI output
+RECORD_TYPES = ("planting_records", "harvest_records")
+
+# Columns of exported CSV files
+CSV_FIELDS = (
+    "record_type",
+    "date",
+    "plant",
+    "location",
+    "yield_amount",
+    "yield_quantity",
+    "yield_unit",
+    "created_at",
+)
+
+
+def file_format(path: str) -> str:
+    """Return the format of a records file from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file type '{extension}', use .csv or .jsonl")
+    return FILE_FORMATS[extension]
+
+
+def read_records(path: str) -> List[Dict]:
+    """Read the rows of a CSV or JSON Lines file.
+
+    Empty CSV cells are dropped, so optional fields can be left blank.
+    """
+    file_type = file_format(path)
+    rows: List[Dict] = []
+    with open(path, encoding="utf-8", newline="") as file:
+        if file_type == FORMAT_CSV:
+            for row in csv.DictReader(file):
+                rows.append({
+                    key.strip(): value.strip()
+                    for key, value in row.items()
+                    if key and value and value.strip()
+                })
+            return rows
+
+        for line_no, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {line_no}: {e}") from e
+            if not isinstance(row, dict):
+                raise ValueError(f"line {line_no}: not a JSON object")
+            rows.append(row)
+    return rows
+
+
+class RecordExporter:
+    """Writes records to a CSV or JSON Lines file one page at a time.
+
+    The file is written under a temporary name and moved into place when
+    complete, so a failed export never leaves a partial file behind. All
+    methods block and are meant for the executor.
+    """
+
+    def __init__(self, path: str):
+        """Initialize the exporter; raises ValueError for unknown file types."""
+        self.path = path
+        self._format = file_format(path)
+        self._file: Optional[IO[str]] = None
+        self._writer: Optional[csv.DictWriter] = None
+        self.count = 0
+
+    def open(self) -> None:
+        """Create the temporary file and write the CSV header."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(f"{self.path}.tmp", "w", encoding="utf-8", newline="")
+        if self._format == FORMAT_CSV:
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=CSV_FIELDS, extrasaction="ignore"
+            )
+            self._writer.writeheader()
+
+    def write(self, kind: str, records: List[Dict]) -> None:
+        """Append records of one collection."""
+        for record in records:
+            row = {"record_type": kind, **record}
+            if self._writer is not None:
+                self._writer.writerow(row)
+            else:
+                self._file.write(json_dumps(row) + "\n")
+        self.count += len(records)
+
+    def close(self, complete: bool = True) -> None:
+        """Close the file and move it into place, or drop it."""
+        self._file.close()
+        if complete:
+            os.replace(f"{self.path}.tmp", self.path)
+        else:
+            os.remove(f"{self.path}.tmp")
@@ -0,0 +1,208 @@
+"""Rate limiting, retries and circuit breaking for upstream LLM calls."""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .llm_backend import LLMBackendError
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# SDK exceptions (google.api_core) worth retrying, matched by name so the
+# SDK does not have to be imported to classify them
+TRANSIENT_ERROR_NAMES = {
+    "DeadlineExceeded",
+    "InternalServerError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "TooManyRequests",
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit is open."""
+
+
+def is_transient(err: BaseException) -> bool:
+    """Return True if a failed request may succeed when retried."""
+    if isinstance(err, LLMBackendError):
+        return err.transient
+    if isinstance(err, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return type(err).__name__ in TRANSIENT_ERROR_NAMES
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate to the API quota."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[int] = None):
+        """Initialize the bucket full."""
+        self._rate = rate_per_minute / 60
+        self._capacity = capacity or max(1, int(rate_per_minute // 6))
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update."""
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    async def async_acquire(self) -> None:
+        """Take one token, waiting for it if the bucket is empty."""
+        # Waiters queue on the lock so tokens are handed out in order
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                self.waits += 1
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream keeps failing.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls are rejected for ``reset_timeout`` seconds. Then a
+    single trial call is let through; its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """Initialize a closed circuit."""
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self._reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not go upstream."""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return
+        self.rejected += 1
+        retry_in = max(0.0, self._opened_at + self._reset_timeout - time.monotonic())
+        raise CircuitOpenError(
+            f"LLM service is unavailable, retrying in {retry_in:.0f} seconds"
+        )
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Count a transient failure and open the circuit if needed."""
+        self._failures += 1
+        if self._trial_running or self._failures >= self._failure_threshold:
+            _LOGGER.warning(
+                "Opening LLM circuit after %s consecutive failures", self._failures
+            )
+            self._opened_at = time.monotonic()
+        self._trial_running = False
+
+    def record_other(self) -> None:
+        """Release a half-open trial that ended without a verdict."""
+        self._trial_running = False
+
+
+class ResilientCaller:
+    """Run upstream calls through rate limit, circuit breaker and retries."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        max_attempts: int,
+        base_delay: float,
+        max_delay: float,
+        failure_threshold: int,
+        reset_timeout: float,
+    ):
+        """Initialize the caller."""
+        self.bucket = TokenBucket(requests_per_minute)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self.retries = 0
+
+    async def async_guard(self, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run one attempt behind the breaker and the rate limit."""
+        await self.async_acquire()
+        try:
+            result = await call()
+        except BaseException as err:
+            self.record_error(err)
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def async_acquire(self) -> None:
+        """Check the breaker and take a rate limit token for one attempt."""
+        self.breaker.before_call()
+        try:
+            await self.bucket.async_acquire()
+        except BaseException:
+            self.breaker.record_other()
+            raise
+
+    def record_error(self, err: BaseException) -> None:
+        """Report a failed attempt to the breaker."""
+        if is_transient(err):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_other()
+
+    async def async_call(self, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a call, retrying transient errors with jittered backoff."""
+        attempt = 1
+        while True:
+            try:
+                return await self.async_guard(call)
+            except CircuitOpenError:
+                raise
+            except Exception as err:
+                if attempt >= self._max_attempts or not is_transient(err):
+                    raise
+                # Full jitter keeps concurrent retries from lining up
+                delay = random.uniform(
+                    0, min(self._max_delay, self._base_delay * 2 ** (attempt - 1))
+                )
+                _LOGGER.debug(
+                    "Retrying LLM request in %.1f s after error: %s", delay, str(err)
+                )
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    @property
+    def stats(self) -> Dict:
+        """Return resilience counters."""
+        return {
+            "circuit": self.breaker.state,
+            "circuit_rejections": self.breaker.rejected,
+            "retries": self.retries,
+            "rate_limited_waits": self.bucket.waits,
+        }
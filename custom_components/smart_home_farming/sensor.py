@@ -0,0 +1,420 @@
+"""Sensor platform for Smart Home Farming."""
+from datetime import timedelta
+import logging
+from typing import Dict, List, Set
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util
+
+from .aggregates import GardenAggregates
+from .garden_data import GardenData
+from .const import (
+    DOMAIN,
+    CONF_BEDS,
+    CONF_NAME,
+    CONF_BED_TYPE,
+    CONF_LENGTH,
+    CONF_WIDTH,
+    CONF_SUNLIGHT,
+    SIGNAL_GARDEN_UPDATED,
+    SERVICE_GENERATE_PLANTING_PLAN,
+    SERVICE_RECORD_PLANTING,
+    SERVICE_RECORD_HARVEST,
+    SERVICE_GET_GARDEN_STATUS,
+    SERVICE_GET_CARE_RECOMMENDATIONS,
+)
+from .metrics import Instrumentation
+from .util import normalize_name, record_date, season_bucket
+
+_LOGGER = logging.getLogger(__name__)
+
+# Diagnostic sensors read their metric on each poll
+SCAN_INTERVAL = timedelta(seconds=60)
+
+# Metric name: sensor name
+LATENCY_METRICS = {
+    f"service.{SERVICE_GENERATE_PLANTING_PLAN}": "Generate planting plan latency",
+    f"service.{SERVICE_RECORD_PLANTING}": "Record planting latency",
+    f"service.{SERVICE_RECORD_HARVEST}": "Record harvest latency",
+    f"service.{SERVICE_GET_GARDEN_STATUS}": "Get garden status latency",
+    f"service.{SERVICE_GET_CARE_RECOMMENDATIONS}": "Get care recommendations latency",
+    "llm.generate_planting_plan": "LLM planting plan latency",
+    "llm.get_care_recommendations": "LLM care recommendations latency",
+    "layout.solve": "Layout solver latency",
+    "garden_data.save": "Garden data save latency",
+}
+
+TOKEN_COUNTERS = {
+    "llm.prefix_tokens": "LLM prefix tokens",
+    "llm.prompt_tokens": "LLM prompt tokens",
+    "llm.response_tokens": "LLM response tokens",
+}
+
+
+def device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Return the device all entities of an entry belong to."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up Smart Home Farming sensors."""
+    instrumentation = hass.data[DOMAIN][entry.entry_id]["instrumentation"]
+    aggregates = hass.data[DOMAIN][entry.entry_id]["aggregates"]
+    signal = f"{SIGNAL_GARDEN_UPDATED}_{entry.entry_id}"
+
+    entities: List[Entity] = [
+        BedOccupancySensor(entry, aggregates, signal, bed)
+        for bed in entry.data.get(CONF_BEDS, [])
+    ]
+    entities.append(
+        SeasonYieldSensor(
+            entry, aggregates, signal, hass.data[DOMAIN][entry.entry_id]["garden_data"]
+        )
+    )
+
+    # Plants get their sensors when they are first recorded
+    known_plants: Set[str] = set()
+
+    @callback
+    def _async_add_plant_sensors(*_args) -> None:
+        """Add last planted and harvested sensors for new plants."""
+        new_plants = (
+            set(aggregates.last_planted) | set(aggregates.last_harvested)
+        ) - known_plants
+        known_plants.update(new_plants)
+        async_add_entities(
+            sensor
+            for plant_key in sorted(new_plants)
+            for sensor in (
+                LastPlantedSensor(entry, aggregates, signal, plant_key),
+                LastHarvestedSensor(entry, aggregates, signal, plant_key),
+            )
+        )
+
+    _async_add_plant_sensors()
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, signal, _async_add_plant_sensors)
+    )
+
+    if instrumentation.enabled:
+        entities.extend(
+            LatencySensor(entry, instrumentation, metric, name)
+            for metric, name in LATENCY_METRICS.items()
+        )
+        entities.extend(
+            TokenCounterSensor(entry, instrumentation, metric, name)
+            for metric, name in TOKEN_COUNTERS.items()
+        )
+        entities.append(
+            BytesWrittenSensor(
+                entry,
+                instrumentation,
+                "garden_data.bytes_written",
+                "Garden data bytes written",
+            )
+        )
+    async_add_entities(entities)
+
+
+class InstrumentationSensor(SensorEntity):
+    """Base class for diagnostic sensors reading one metric."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        instrumentation: Instrumentation,
+        metric: str,
+        name: str,
+    ):
+        """Initialize the sensor."""
+        self._instrumentation = instrumentation
+        self._metric = metric
+        self._attr_name = name
+        self._attr_unique_id = f"{entry.entry_id}_{metric}"
+        self._attr_device_info = device_info(entry)
+
+
+class LatencySensor(InstrumentationSensor):
+    """p95 duration of a service, LLM call or save in seconds."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_suggested_display_precision = 3
+
+    @property
+    def native_value(self):
+        """Return the p95 latency of the recent samples."""
+        histogram = self._instrumentation.histograms.get(self._metric)
+        if histogram is None:
+            return None
+        return round(histogram.percentile(95), 4)
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return the count, p50 and max next to the p95."""
+        histogram = self._instrumentation.histograms.get(self._metric)
+        return histogram.stats if histogram is not None else {}
+
+
+class CounterSensor(InstrumentationSensor):
+    """Counter accumulated since setup."""
+
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> int:
+        """Return the counter value."""
+        return self._instrumentation.counters.get(self._metric, 0)
+
+
+class TokenCounterSensor(CounterSensor):
+    """Estimated LLM tokens sent or received."""
+
+    _attr_native_unit_of_measurement = "tokens"
+
+
+class BytesWrittenSensor(CounterSensor):
+    """Bytes written by garden data saves."""
+
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return the size distribution of single saves."""
+        histogram = self._instrumentation.histograms.get("garden_data.save_bytes")
+        return histogram.stats if histogram is not None else {}
+
+
+class GardenSensor(SensorEntity):
+    """Base class for sensors pushed by garden record updates."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, entry: ConfigEntry, aggregates: GardenAggregates, signal: str):
+        """Initialize the sensor."""
+        self._aggregates = aggregates
+        self._signal = signal
+        self._attr_device_info = device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Update whenever a relevant record is added."""
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._signal, self._async_record_added)
+        )
+
+    def _is_relevant(self, kind: str, record: Dict) -> bool:
+        """Return True if a new record changes this sensor."""
+        raise NotImplementedError
+
+    @callback
+    def _async_record_added(self, kind: str, record: Dict) -> None:
+        """Write the new state if the record affects this sensor."""
+        if self._is_relevant(kind, record):
+            self.async_write_ha_state()
+
+
+class BedOccupancySensor(GardenSensor):
+    """Number of plants currently growing in a bed."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "plants"
+    _attr_icon = "mdi:flower"
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        aggregates: GardenAggregates,
+        signal: str,
+        bed: Dict,
+    ):
+        """Initialize the sensor."""
+        super().__init__(entry, aggregates, signal)
+        self._bed = bed
+        self._bed_key = normalize_name(bed[CONF_NAME])
+        self._attr_name = f"{bed[CONF_NAME]} occupancy"
+        self._attr_unique_id = f"{entry.entry_id}_bed_{self._bed_key}_occupancy"
+
+    def _is_relevant(self, kind: str, record: Dict) -> bool:
+        """Return True for plantings in this bed and harvests of its plants."""
+        if kind == "planting_records":
+            return normalize_name(record.get("location", "")) == self._bed_key
+        plantings = self._aggregates.bed_plantings.get(self._bed_key, {})
+        return normalize_name(record.get("plant", "")) in plantings
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of growing plants."""
+        return len(self._aggregates.bed_occupancy(self._bed_key))
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return the growing plants and the bed's properties."""
+        return {
+            "plants": self._aggregates.bed_occupancy(self._bed_key),
+            "bed_type": self._bed.get(CONF_BED_TYPE),
+            "area_m2": round(
+                self._bed.get(CONF_LENGTH, 0) * self._bed.get(CONF_WIDTH, 0) / 10000, 2
+            ),
+            "sunlight": self._bed.get(CONF_SUNLIGHT),
+        }
+
+
+class PlantDateSensor(GardenSensor):
+    """Date of the latest record of one kind for a plant."""
+
+    _attr_device_class = SensorDeviceClass.DATE
+    _kind = ""
+    _label = ""
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        aggregates: GardenAggregates,
+        signal: str,
+        plant_key: str,
+    ):
+        """Initialize the sensor."""
+        super().__init__(entry, aggregates, signal)
+        self._plant_key = plant_key
+        self._attr_name = f"{aggregates.labels[plant_key]} {self._label}"
+        self._attr_unique_id = (
+            f"{entry.entry_id}_{plant_key}_{self._label.replace(' ', '_')}"
+        )
+
+    def _latest(self) -> Dict:
+        """Return the latest record of the plant or an empty dict."""
+        raise NotImplementedError
+
+    def _is_relevant(self, kind: str, record: Dict) -> bool:
+        """Return True for records of this kind and plant."""
+        return (
+            kind == self._kind
+            and normalize_name(record.get("plant", "")) == self._plant_key
+        )
+
+    @property
+    def native_value(self):
+        """Return the date of the latest record."""
+        latest = record_date(self._latest())
+        return dt_util.parse_date(latest) if latest else None
+
+
+class LastPlantedSensor(PlantDateSensor):
+    """Date a plant was last planted."""
+
+    _kind = "planting_records"
+    _label = "last planted"
+    _attr_icon = "mdi:seed"
+
+    def _latest(self) -> Dict:
+        """Return the latest planting of the plant."""
+        return self._aggregates.last_planted.get(self._plant_key, {})
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return where the plant was planted."""
+        return {"location": self._latest().get("location")}
+
+
+class LastHarvestedSensor(PlantDateSensor):
+    """Date a plant was last harvested."""
+
+    _kind = "harvest_records"
+    _label = "last harvested"
+    _attr_icon = "mdi:basket"
+
+    def _latest(self) -> Dict:
+        """Return the latest harvest of the plant."""
+        return self._aggregates.last_harvested.get(self._plant_key, {})
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return the amount harvested."""
+        return {"yield_amount": self._latest().get("yield_amount")}
+
+
+class SeasonYieldSensor(GardenSensor):
+    """Harvests of the current season with yield totals."""
+
+    _attr_name = "Season harvests"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = "harvests"
+    _attr_icon = "mdi:basket-fill"
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        aggregates: GardenAggregates,
+        signal: str,
+        garden_data: GardenData,
+    ):
+        """Initialize the sensor."""
+        super().__init__(entry, aggregates, signal)
+        self._garden_data = garden_data
+        self._attr_unique_id = f"{entry.entry_id}_season_harvests"
+
+    async def async_added_to_hass(self) -> None:
+        """Also update when a new season may have started."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_change(
+                self.hass, self._async_midnight, hour=0, minute=0, second=0
+            )
+        )
+
+    @callback
+    def _async_midnight(self, _now) -> None:
+        """Move on to the next season at its first midnight."""
+        self.async_write_ha_state()
+
+    def _is_relevant(self, kind: str, record: Dict) -> bool:
+        """Return True for harvests."""
+        return kind == "harvest_records"
+
+    def _season(self) -> str:
+        """Return the current season bucket."""
+        return season_bucket(dt_util.now().date().isoformat())
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of harvests this season."""
+        # The rollups are replaced when seasons are archived, so they are
+        # looked up on every read
+        return self._garden_data.yield_rollups.season_yield(self._season())["harvests"]
+
+    @property
+    def extra_state_attributes(self) -> Dict:
+        """Return the season, yield totals and harvests per plant."""
+        season = self._season()
+        summary = self._garden_data.yield_rollups.season_yield(season)
+        return {
+            "season": season,
+            "mass_kg": summary["mass_kg"],
+            "count": summary["count"],
+            "unmeasured": summary["unmeasured"],
+            "plants": summary["plants"],
+        }
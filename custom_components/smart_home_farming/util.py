@@ -0,0 +1,54 @@
+"""Helpers shared by the Smart Home Farming modules."""
+from datetime import date
+from typing import Dict, Optional
+
+from homeassistant.util import dt as dt_util
+
+SEASONS = {
+    12: "winter", 1: "winter", 2: "winter",
+    3: "spring", 4: "spring", 5: "spring",
+    6: "summer", 7: "summer", 8: "summer",
+    9: "autumn", 10: "autumn", 11: "autumn",
+}
+
+
+def normalize_name(name) -> str:
+    """Normalize a plant or bed name for lookups."""
+    return " ".join(str(name).split()).casefold()
+
+
+def storage_name(name: str, storage_id: Optional[str]) -> str:
+    """Return the name of a storage file or key of one garden."""
+    return f"{name}_{storage_id}" if storage_id else name
+
+
+def record_date(record: Dict) -> Optional[str]:
+    """Return the ISO date a record refers to, falling back to created_at."""
+    for key in ("date", "created_at"):
+        value = record.get(key)
+        if value:
+            parsed = dt_util.parse_date(str(value)[:10])
+            if parsed is not None:
+                return parsed.isoformat()
+    return None
+
+
+def season_bucket(planting_date) -> str:
+    """Bucket a planting date to a meteorological season like 2024-spring."""
+    if not planting_date:
+        return "unspecified"
+    parsed = dt_util.parse_date(str(planting_date)[:10])
+    if parsed is None:
+        return normalize_name(planting_date)
+    # December belongs to the winter of the following year
+    year = parsed.year + 1 if parsed.month == 12 else parsed.year
+    return f"{year}-{SEASONS[parsed.month]}"
+
+
+def season_start(day: date) -> date:
+    """Return the first day of the meteorological season of a date."""
+    first_month = (day.month % 12) // 3 * 3
+    if first_month == 0:
+        # Winter starts in December of the previous year for Jan and Feb
+        return date(day.year - 1 if day.month < 12 else day.year, 12, 1)
+    return date(day.year, first_month, 1)
@@ -0,0 +1,459 @@
+"""Harvest yield normalization and rollups for Smart Home Farming."""
+from array import array
+from bisect import bisect_left, bisect_right
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from homeassistant.util import dt as dt_util
+
+from .util import normalize_name, record_date, season_bucket
+
+DIMENSION_MASS = "mass"
+DIMENSION_COUNT = "count"
+
+# Base units the quantities are stored in
+UNIT_GRAMS = "g"
+UNIT_PIECES = "pcs"
+
+# Unit spelling: (dimension, factor to the base unit)
+UNITS = {
+    "mg": (DIMENSION_MASS, 0.001),
+    "g": (DIMENSION_MASS, 1.0),
+    "gr": (DIMENSION_MASS, 1.0),
+    "gram": (DIMENSION_MASS, 1.0),
+    "grams": (DIMENSION_MASS, 1.0),
+    "gramm": (DIMENSION_MASS, 1.0),
+    "kg": (DIMENSION_MASS, 1000.0),
+    "kilo": (DIMENSION_MASS, 1000.0),
+    "kilos": (DIMENSION_MASS, 1000.0),
+    "kilogram": (DIMENSION_MASS, 1000.0),
+    "kilograms": (DIMENSION_MASS, 1000.0),
+    "kilogramm": (DIMENSION_MASS, 1000.0),
+    "oz": (DIMENSION_MASS, 28.349523125),
+    "ounce": (DIMENSION_MASS, 28.349523125),
+    "ounces": (DIMENSION_MASS, 28.349523125),
+    "lb": (DIMENSION_MASS, 453.59237),
+    "lbs": (DIMENSION_MASS, 453.59237),
+    "pound": (DIMENSION_MASS, 453.59237),
+    "pounds": (DIMENSION_MASS, 453.59237),
+    "": (DIMENSION_COUNT, 1.0),
+    "x": (DIMENSION_COUNT, 1.0),
+    "pc": (DIMENSION_COUNT, 1.0),
+    "pcs": (DIMENSION_COUNT, 1.0),
+    "piece": (DIMENSION_COUNT, 1.0),
+    "pieces": (DIMENSION_COUNT, 1.0),
+    "stk": (DIMENSION_COUNT, 1.0),
+    "stück": (DIMENSION_COUNT, 1.0),
+    "item": (DIMENSION_COUNT, 1.0),
+    "items": (DIMENSION_COUNT, 1.0),
+}
+
+BASE_UNITS = {DIMENSION_MASS: UNIT_GRAMS, DIMENSION_COUNT: UNIT_PIECES}
+
+# A number with an optional unit, like "500g", "1,5 kg" or "12"
+YIELD_AMOUNT = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*([^\d\s.]*)\.?\s*$")
+
+# "1,500" is a decimal comma in some locales and a thousands separator in
+# others, so such amounts are not guessed at
+AMBIGUOUS_COMMA = re.compile(r"^\d{1,3},\d{3}$")
+
+GROUP_BY_PLANT = "plant"
+GROUP_BY_BED = "bed"
+GROUP_BY_WEEK = "week"
+GROUP_BY_SEASON = "season"
+GROUP_BY = [GROUP_BY_PLANT, GROUP_BY_BED, GROUP_BY_WEEK, GROUP_BY_SEASON]
+
+# Table of harvests per plant within a season, keyed "<season>/<plant key>";
+# it backs the season sensor and is not offered as a summary grouping
+SEASON_PLANT = "season_plant"
+
+# Bucket of harvests without a bed
+UNASSIGNED = "unassigned"
+
+
+def parse_yield(value) -> Optional[Tuple[float, str]]:
+    """Return a yield amount as quantity and base unit, or None."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value), UNIT_PIECES
+    match = YIELD_AMOUNT.match(str(value))
+    if match is None or AMBIGUOUS_COMMA.match(match.group(1)):
+        return None
+    unit = UNITS.get(match.group(2).casefold())
+    if unit is None:
+        return None
+    dimension, factor = unit
+    quantity = float(match.group(1).replace(",", ".")) * factor
+    return round(quantity, 3), BASE_UNITS[dimension]
+
+
+def normalize_yield(record: Dict) -> Dict:
+    """Return a harvest record with its yield as quantity and unit.
+
+    The original ``yield_amount`` text is kept; ``yield_quantity`` and
+    ``yield_unit`` are only added when the amount could be understood.
+    """
+    if "yield_quantity" in record:
+        return record
+    parsed = parse_yield(record.get("yield_amount"))
+    if parsed is None:
+        return record
+    quantity, unit = parsed
+    return {**record, "yield_quantity": quantity, "yield_unit": unit}
+
+
+def record_yield(record: Dict) -> Optional[Tuple[float, str]]:
+    """Return the normalized yield of a stored harvest record, or None."""
+    if "yield_quantity" in record:
+        return record["yield_quantity"], record["yield_unit"]
+    return parse_yield(record.get("yield_amount"))
+
+
+def _day_ordinal(date: Optional[str]) -> int:
+    """Return the ordinal of an ISO date, or 0 for records without one."""
+    parsed = dt_util.parse_date(date) if date else None
+    return parsed.toordinal() if parsed is not None else 0
+
+
+def _bed_bucket(bed: Optional[str]) -> Tuple[str, str]:
+    """Return the key and label of the bed bucket a harvest is booked to."""
+    if bed:
+        return normalize_name(bed), bed
+    return UNASSIGNED, UNASSIGNED
+
+
+def week_bucket(date: Optional[str]) -> str:
+    """Bucket an ISO date to its ISO week like 2024-W07."""
+    parsed = dt_util.parse_date(date) if date else None
+    if parsed is None:
+        return "unspecified"
+    year, week, _weekday = parsed.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class RollupTable:
+    """Yield totals per bucket, kept in parallel typed columns.
+
+    Each bucket owns one row; adding a harvest updates that row in place,
+    and reading a bucket is a dict lookup plus one index per column.
+    """
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.rows: Dict[str, int] = {}
+        self.labels: List[str] = []
+        self.harvests = array("l")
+        self.mass = array("d")
+        self.count = array("d")
+        self.unmeasured = array("l")
+
+    def _row(self, key: str, label: str) -> int:
+        """Return the row of a bucket, adding it if needed."""
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.labels)
+            self.labels.append(label)
+            for column in (self.harvests, self.mass, self.count, self.unmeasured):
+                column.append(0)
+        return row
+
+    def add(
+        self,
+        key: str,
+        label: str,
+        amount: Optional[Tuple[float, str]],
+        harvests: int = 1,
+    ) -> None:
+        """Add harvests with their total amount to a bucket."""
+        row = self._row(key, label)
+        self.harvests[row] += harvests
+        if amount is None:
+            self.unmeasured[row] += harvests
+        elif amount[1] == UNIT_GRAMS:
+            self.mass[row] += amount[0]
+        else:
+            self.count[row] += amount[0]
+
+    def as_dict(self) -> Dict:
+        """Return the table as JSON-serializable columns."""
+        return {
+            "keys": list(self.rows),
+            "labels": list(self.labels),
+            "harvests": self.harvests.tolist(),
+            "mass": self.mass.tolist(),
+            "count": self.count.tolist(),
+            "unmeasured": self.unmeasured.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RollupTable":
+        """Rebuild a table from its serialized columns."""
+        table = cls()
+        table.rows = {key: row for row, key in enumerate(data["keys"])}
+        table.labels = list(data["labels"])
+        table.harvests = array("l", data["harvests"])
+        table.mass = array("d", data["mass"])
+        table.count = array("d", data["count"])
+        table.unmeasured = array("l", data["unmeasured"])
+        return table
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the totals of one bucket."""
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return {
+            "harvests": self.harvests[row],
+            "mass_kg": round(self.mass[row] / 1000, 3),
+            "count": round(self.count[row], 3),
+            "unmeasured": self.unmeasured[row],
+        }
+
+
+class UnplacedHarvests:
+    """Harvests of one plant recorded without a bed, in date order.
+
+    Kept so the harvests can be booked to another bed when a planting of
+    the plant is added with an earlier date.
+    """
+
+    # Units of the amounts, by their index in the units column
+    UNITS = (None, UNIT_GRAMS, UNIT_PIECES)
+
+    def __init__(self):
+        """Initialize an empty history."""
+        self.days = array("i")
+        self.quantities = array("d")
+        self.units = array("b")
+        self.harvests = array("l")
+
+    def add(
+        self, day: int, amount: Optional[Tuple[float, str]], harvests: int
+    ) -> None:
+        """Add harvests of one day with their total amount."""
+        index = bisect_right(self.days, day)
+        self.days.insert(index, day)
+        self.quantities.insert(index, amount[0] if amount else 0.0)
+        self.units.insert(index, self.UNITS.index(amount[1] if amount else None))
+        self.harvests.insert(index, harvests)
+
+    def between(
+        self, start: int, end: Optional[int]
+    ) -> Iterator[Tuple[Optional[Tuple[float, str]], int]]:
+        """Yield the amounts and harvests from day start until before end."""
+        lo = bisect_left(self.days, start)
+        hi = len(self.days) if end is None else bisect_left(self.days, end)
+        for index in range(lo, hi):
+            unit = self.UNITS[self.units[index]]
+            amount = (self.quantities[index], unit) if unit else None
+            yield amount, self.harvests[index]
+
+
+class YieldRollups:
+    """Harvest totals by plant, bed, ISO week and season.
+
+    Harvests without a location are booked to the bed the plant was last
+    planted in on or before the harvest date, if any. The plantings of each
+    plant and its harvests without a bed are kept in date order, and a
+    planting added with an earlier date moves the harvests it covers, so
+    the bed does not depend on the order the records were added in.
+    """
+
+    def __init__(self):
+        """Initialize empty rollups."""
+        self.tables = {
+            group_by: RollupTable() for group_by in (*GROUP_BY, SEASON_PLANT)
+        }
+        # Plantings per plant in date order: day ordinals and the bed of
+        # each, as an index into _bed_labels
+        self._planting_days: Dict[str, array] = {}
+        self._planting_beds: Dict[str, array] = {}
+        self._bed_labels: List[str] = []
+        self._bed_ids: Dict[str, int] = {}
+        # Harvests without a bed per plant. They are not saved with
+        # as_dict: archived harvests keep the bed they were booked to.
+        self._unplaced: Dict[str, UnplacedHarvests] = {}
+
+    @classmethod
+    def from_records(
+        cls, plantings: Iterable[Dict], harvests: Iterable[Dict]
+    ) -> "YieldRollups":
+        """Build rollups from the history, replaying it in date order."""
+        rollups = cls()
+        rollups.replay(plantings, harvests)
+        return rollups
+
+    def replay(self, plantings: Iterable[Dict], harvests: Iterable[Dict]) -> None:
+        """Add a batch of records in date order."""
+        events = [(record_date(record) or "", 0, record) for record in plantings]
+        events.extend((record_date(record) or "", 1, record) for record in harvests)
+        # Stable sort: same-day plantings come before harvests
+        events.sort(key=lambda event: event[:2])
+        for _date, is_harvest, record in events:
+            if is_harvest:
+                self.add_harvest(record)
+            else:
+                self.add_planting(record)
+
+    def as_dict(self) -> Dict:
+        """Return the rollups in a JSON-serializable form."""
+        return {
+            "tables": {
+                group_by: table.as_dict() for group_by, table in self.tables.items()
+            },
+            "plantings": {
+                plant: [days.tolist(), self._planting_beds[plant].tolist()]
+                for plant, days in self._planting_days.items()
+            },
+            "beds": list(self._bed_labels),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "YieldRollups":
+        """Rebuild rollups saved with as_dict."""
+        rollups = cls()
+        for group_by, table in data["tables"].items():
+            rollups.tables[group_by] = RollupTable.from_dict(table)
+        if "plant_beds" in data:
+            # Rollups saved before the planting history was kept: the latest
+            # planting per plant as (date, bed key, bed label)
+            for plant_key, (date, _bed_key, label) in data["plant_beds"].items():
+                rollups._insert_planting(plant_key, _day_ordinal(date), label)
+            return rollups
+        rollups._bed_labels = list(data["beds"])
+        rollups._bed_ids = {label: bed for bed, label in enumerate(data["beds"])}
+        for plant, (days, beds) in data["plantings"].items():
+            rollups._planting_days[plant] = array("i", days)
+            rollups._planting_beds[plant] = array("i", beds)
+        return rollups
+
+    def add(self, kind: str, record: Dict) -> None:
+        """Fold a newly added record into the rollups."""
+        if kind == "planting_records":
+            self.add_planting(record)
+        elif kind == "harvest_records":
+            self.add_harvest(record)
+
+    def _insert_planting(self, plant_key: str, day: int, bed: str) -> None:
+        """Add a planting to the history of its plant."""
+        bed_id = self._bed_ids.get(bed)
+        if bed_id is None:
+            bed_id = self._bed_ids[bed] = len(self._bed_labels)
+            self._bed_labels.append(bed)
+        days = self._planting_days.setdefault(plant_key, array("i"))
+        beds = self._planting_beds.setdefault(plant_key, array("i"))
+        # After plantings of the same day, so the one added last wins
+        index = bisect_right(days, day)
+        previous = self._bed_labels[beds[index - 1]] if index else None
+        following = days[index] if index < len(days) else None
+        days.insert(index, day)
+        beds.insert(index, bed_id)
+
+        # Harvests without a bed from this day until the next planting were
+        # booked to the planting before this one
+        unplaced = self._unplaced.get(plant_key)
+        if unplaced is None or previous == bed:
+            return
+        table = self.tables[GROUP_BY_BED]
+        for amount, harvests in unplaced.between(day, following):
+            table.add(*_bed_bucket(bed), amount, harvests)
+            removed = (-amount[0], amount[1]) if amount else None
+            table.add(*_bed_bucket(previous), removed, -harvests)
+
+    def planted_bed(self, plant: str, date: Optional[str]) -> Optional[str]:
+        """Return the bed a plant was last planted in on or before a date."""
+        plant_key = normalize_name(plant)
+        days = self._planting_days.get(plant_key)
+        if days is None:
+            return None
+        index = bisect_right(days, _day_ordinal(date)) - 1
+        if index < 0:
+            return None
+        return self._bed_labels[self._planting_beds[plant_key][index]]
+
+    def add_planting(self, record: Dict) -> None:
+        """Add a planting to the bed history of its plant."""
+        plant = record.get("plant")
+        location = record.get("location")
+        if not plant or not location:
+            return
+        self._insert_planting(
+            normalize_name(plant), _day_ordinal(record_date(record)), location
+        )
+
+    def add_harvest(self, record: Dict) -> None:
+        """Add a harvest to every rollup."""
+        plant = record.get("plant")
+        if not plant:
+            return
+        date = record_date(record)
+        location = record.get("location")
+        if location:
+            self.add_harvests(plant, date, location, record_yield(record))
+        else:
+            self.add_unplaced_harvests(plant, date, record_yield(record))
+
+    def add_unplaced_harvests(
+        self,
+        plant: str,
+        date: Optional[str],
+        amount: Optional[Tuple[float, str]],
+        harvests: int = 1,
+    ) -> None:
+        """Add harvests without a bed, booked to the bed the plant was in."""
+        self.add_harvests(plant, date, self.planted_bed(plant, date), amount, harvests)
+        self._unplaced.setdefault(normalize_name(plant), UnplacedHarvests()).add(
+            _day_ordinal(date), amount, harvests
+        )
+
+    def add_harvests(
+        self,
+        plant: str,
+        date: Optional[str],
+        bed: Optional[str],
+        amount: Optional[Tuple[float, str]],
+        harvests: int = 1,
+    ) -> None:
+        """Add harvests of one plant, day and bed with their total amount.
+
+        ``bed`` is the bed the harvests are booked to, or None if unknown.
+        """
+        plant_key = normalize_name(plant)
+        week = week_bucket(date)
+        season = season_bucket(date)
+        self.tables[GROUP_BY_PLANT].add(plant_key, plant, amount, harvests)
+        self.tables[GROUP_BY_BED].add(*_bed_bucket(bed), amount, harvests)
+        self.tables[GROUP_BY_WEEK].add(normalize_name(week), week, amount, harvests)
+        self.tables[GROUP_BY_SEASON].add(season, season, amount, harvests)
+        self.tables[SEASON_PLANT].add(
+            f"{season}/{plant_key}", plant, amount, harvests
+        )
+
+    def season_yield(self, season: str) -> Dict:
+        """Return the totals of a season with its harvests per plant."""
+        totals = self.tables[GROUP_BY_SEASON].get(season) or {
+            "harvests": 0, "mass_kg": 0.0, "count": 0.0, "unmeasured": 0,
+        }
+        table = self.tables[SEASON_PLANT]
+        prefix = f"{season}/"
+        totals["plants"] = {
+            table.labels[row]: table.harvests[row]
+            for key, row in table.rows.items()
+            if key.startswith(prefix)
+        }
+        return totals
+
+    def summary(
+        self, group_by: str, buckets: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict]:
+        """Return the totals of the requested buckets, or of all buckets."""
+        table = self.tables[group_by]
+        keys = table.rows if buckets is None else map(normalize_name, buckets)
+        result = {}
+        for key in keys:
+            totals = table.get(key)
+            # Beds can be left without harvests after these were moved
+            if totals is not None and totals["harvests"]:
+                result[table.labels[table.rows[key]]] = totals
+        return result
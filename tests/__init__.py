@@ -0,0 +1 @@
+"""Tests for the Smart Home Farming integration."""
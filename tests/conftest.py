@@ -0,0 +1,21 @@
+"""Fixtures for Smart Home Farming tests."""
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components in every test."""
+    yield
+
+
+@pytest.fixture
+def config_dir(hass: HomeAssistant, tmp_path):
+    """Keep files the backends write next to .storage in a temporary dir.
+
+    Store documents themselves stay in the mocked hass_storage.
+    """
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / ".storage").mkdir()
+    return tmp_path
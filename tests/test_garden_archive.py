@@ -0,0 +1,84 @@
+"""Tests for the season archive."""
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.garden_archive import SeasonArchive
+from custom_components.smart_home_farming.yields import normalize_yield
+
+SEASON = "2023-summer"
+PLANTING = {"plant": "Tomato", "location": "Bed 1", "date": "2023-06-01"}
+HARVESTS = [
+    normalize_yield({"plant": "Tomato", "date": date, "yield_amount": "2 kg"})
+    for date in ("2023-07-01", "2023-08-01")
+]
+
+
+async def test_repeated_archival_skips_archived_records(
+    hass: HomeAssistant, config_dir
+) -> None:
+    """Records already in a season file are neither written nor counted again."""
+    archive = SeasonArchive(hass)
+    await archive.async_load()
+    await archive.async_add(
+        {SEASON: {"planting_records": [PLANTING], "harvest_records": HARVESTS[:1]}}
+    )
+    # An interrupted archival is repeated with one more harvest
+    await archive.async_add(
+        {SEASON: {"planting_records": [PLANTING], "harvest_records": HARVESTS}}
+    )
+
+    assert archive.seasons[SEASON]["counts"] == {
+        "planting_records": 1,
+        "harvest_records": 2,
+    }
+    assert archive.seasons[SEASON]["start"] == "2023-06-01"
+    assert archive.seasons[SEASON]["end"] == "2023-08-01"
+    tomato = archive.base_rollups().summary("plant")["Tomato"]
+    assert tomato["harvests"] == 2
+    assert tomato["mass_kg"] == 4.0
+
+    # The index and rollups survive a restart
+    restarted = SeasonArchive(hass)
+    await restarted.async_load()
+    assert restarted.seasons == archive.seasons
+    assert restarted.base_rollups().summary("plant")["Tomato"]["harvests"] == 2
+    records = await restarted.async_load_season(SEASON)
+    assert records["harvest_records"] == HARVESTS
+
+
+async def test_query_keys_number_matches_per_date(
+    hass: HomeAssistant, config_dir
+) -> None:
+    """Matches of one date get increasing negative positions."""
+    archive = SeasonArchive(hass)
+    await archive.async_load()
+    await archive.async_add(
+        {
+            SEASON: {
+                "planting_records": [
+                    PLANTING,
+                    {"plant": "Bean", "location": "Bed 2", "date": "2023-07-01"},
+                    {"plant": "Kale", "location": "Bed 2", "date": "2023-06-01"},
+                ]
+            }
+        }
+    )
+
+    assert archive.seasons_between("planting_records", "2023-07-01", None) == [
+        SEASON
+    ]
+    assert archive.seasons_between("planting_records", "2023-09-01", None) == []
+    assert archive.seasons_between("harvest_records", None, None) == []
+
+    matches = await archive.async_query_season(
+        SEASON, "planting_records", None, None, None, None
+    )
+    assert [(key, record["plant"]) for key, record in matches] == [
+        (("2023-06-01", -2), "Tomato"),
+        (("2023-06-01", -1), "Kale"),
+        (("2023-07-01", -1), "Bean"),
+    ]
+    # Filters leave the keys of other dates as they were
+    matches = await archive.async_query_season(
+        SEASON, "planting_records", None, "bed 2", "2023-07-01", None
+    )
+    assert [key for key, _record in matches] == [("2023-07-01", -1)]
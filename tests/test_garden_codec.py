@@ -0,0 +1,105 @@
+"""Tests for the column format of garden documents."""
+from custom_components.smart_home_farming.garden_codec import (
+    GardenColumns,
+    decode_garden_data,
+    encode_garden_data,
+)
+
+GARDEN = {
+    "plants": ["Tomato"],
+    "planting_plans": [{"created_at": "2024-03-01T08:00:00", "plan": "Tomatoes"}],
+    "planting_records": [
+        {
+            "created_at": "2024-04-01T09:30:00.123456",
+            "plant": "Tomato",
+            "location": "Bed 1",
+            "date": "2024-04-01",
+        },
+        # Values that do not fit a column are kept with their record
+        {
+            "created_at": "2024-04-02T10:00:00+02:00",
+            "plant": 7,
+            "location": None,
+            "date": "next spring",
+            "notes": {"seeds": 12},
+        },
+        {"plant": "Tomato"},
+    ],
+    "harvest_records": [
+        {
+            "created_at": "2024-07-01T18:00:00",
+            "plant": "Tomato",
+            "date": "2024-07-01",
+            "yield_amount": "2 kg",
+            "yield_quantity": 2000.0,
+            "yield_unit": "g",
+        },
+        {"plant": "Tomato", "date": "2024-07-08", "yield_amount": "lots"},
+    ],
+    "revision": 6,
+}
+
+
+def test_round_trip() -> None:
+    """Decoding an encoded garden gives back the same records."""
+    assert decode_garden_data(encode_garden_data(GARDEN)) == GARDEN
+
+
+def test_names_are_stored_once() -> None:
+    """Plant and bed names go into the name table and columns keep ids."""
+    document = encode_garden_data(GARDEN)
+
+    assert document["names"] == ["Tomato", "Bed 1", "g"]
+    assert document["planting_records"]["columns"]["plant"] == [0, None, 0]
+    assert document["planting_records"]["columns"]["date"] == [738977, None, None]
+    assert document["planting_records"]["extra"] == [
+        [
+            1,
+            {
+                "created_at": "2024-04-02T10:00:00+02:00",
+                "plant": 7,
+                "date": "next spring",
+                "location": None,
+                "notes": {"seeds": 12},
+            },
+        ]
+    ]
+
+
+def test_appended_records_read_back() -> None:
+    """Records appended to loaded columns decode like the stored ones."""
+    columns = GardenColumns(encode_garden_data(GARDEN))
+    harvest = {"plant": "Kale", "location": "Bed 1", "date": "2024-09-01"}
+    columns.append("harvest_records", harvest)
+
+    assert columns.count("harvest_records") == 3
+    assert columns.record("harvest_records", 2) == harvest
+    assert columns.value("harvest_records", "location", 2) == "Bed 1"
+    assert columns.value("harvest_records", "yield_amount", 2) is None
+    assert decode_garden_data(columns.as_document())["harvest_records"] == [
+        *GARDEN["harvest_records"],
+        harvest,
+    ]
+
+
+def test_copy_is_not_changed_by_appends() -> None:
+    """Appends after a copy do not show up in the copy."""
+    columns = GardenColumns(encode_garden_data(GARDEN))
+    copy = columns.copy()
+    columns.append("planting_records", {"plant": "Kale"})
+
+    assert copy.count("planting_records") == 3
+    assert decode_garden_data(copy.as_document()) == GARDEN
+
+
+def test_select_keeps_positions() -> None:
+    """Selected records are renumbered together with their extra fields."""
+    columns = GardenColumns(encode_garden_data(GARDEN)).select({
+        "planting_plans": [],
+        "planting_records": [1, 2],
+        "harvest_records": [1],
+    })
+
+    assert columns.records("planting_records") == GARDEN["planting_records"][1:]
+    assert columns.records("harvest_records") == GARDEN["harvest_records"][1:]
+    assert columns.meta["revision"] == 6
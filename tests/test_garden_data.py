@@ -0,0 +1,264 @@
+"""Tests for the Store backed garden data."""
+import asyncio
+from datetime import date, timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.smart_home_farming import garden_data as garden_data_module
+from custom_components.smart_home_farming.garden_codec import (
+    decode_garden_data,
+    encode_garden_data,
+)
+from custom_components.smart_home_farming.garden_data import (
+    STORAGE_KEY,
+    STORAGE_VERSION,
+    GardenData,
+)
+from custom_components.smart_home_farming.garden_journal import (
+    SNAPSHOT_KEY,
+    JournalGardenData,
+)
+
+GARDEN = {
+    "plants": [],
+    "planting_plans": [],
+    "planting_records": [
+        {"plant": "Kale", "location": "Bed 2", "date": "2024-05-01"},
+        {"plant": "Tomato", "location": "Bed 1", "date": "2024-04-01"},
+        {"plant": "Tomato", "location": "Bed 2"},
+    ],
+    "harvest_records": [
+        {"plant": "Tomato", "location": "Bed 1", "date": "2024-07-01"},
+    ],
+    "revision": 4,
+}
+
+
+def _stored(key: str, version: int, data: dict) -> dict:
+    """Return a Store file."""
+    return {"version": version, "minor_version": 1, "key": key, "data": data}
+
+
+async def _load(hass: HomeAssistant) -> GardenData:
+    """Return garden data loaded like after a restart."""
+    garden_data = GardenData(hass, commit_delay=0)
+    await garden_data.async_load()
+    return garden_data
+
+
+async def test_migrates_version_1_document(hass: HomeAssistant, hass_storage) -> None:
+    """A document of one dict per record is converted to columns."""
+    hass_storage[STORAGE_KEY] = _stored(STORAGE_KEY, 1, GARDEN)
+
+    garden_data = await _load(hass)
+
+    assert await garden_data.async_get_planting_records() == GARDEN["planting_records"]
+    assert await garden_data.async_get_harvest_records() == GARDEN["harvest_records"]
+    assert garden_data.revision == 4
+
+    # The next commit writes version 2
+    await garden_data.add_planting_record({"plant": "Bean", "location": "Bed 1"})
+    await garden_data.async_flush()
+    stored = hass_storage[STORAGE_KEY]
+    assert stored["version"] == STORAGE_VERSION
+    assert stored["data"]["names"][:4] == ["Kale", "Bed 2", "Tomato", "Bed 1"]
+    assert decode_garden_data(stored["data"])["revision"] == 5
+
+
+async def test_migrates_version_1_snapshot(
+    hass: HomeAssistant, hass_storage, config_dir
+) -> None:
+    """The journal snapshot is converted to columns as well."""
+    hass_storage[SNAPSHOT_KEY] = _stored(
+        SNAPSHOT_KEY, 1, {"seq": 9, "data": GARDEN}
+    )
+
+    garden_data = JournalGardenData(hass, commit_delay=0)
+    await garden_data.async_load()
+
+    assert await garden_data.async_get_planting_records() == GARDEN["planting_records"]
+    assert garden_data.revision == 4
+
+
+async def test_reload_keeps_records(hass: HomeAssistant, hass_storage) -> None:
+    """Records appended to loaded columns survive a restart."""
+    hass_storage[STORAGE_KEY] = _stored(
+        STORAGE_KEY, STORAGE_VERSION, encode_garden_data(GARDEN)
+    )
+    garden_data = await _load(hass)
+    await garden_data.add_harvest_record(
+        {
+            "plant": "Kale",
+            "location": "Bed 2",
+            "date": "2024-08-01",
+            "yield_amount": "3",
+        }
+    )
+    await garden_data.async_flush()
+
+    restarted = await _load(hass)
+    harvests = await restarted.async_get_harvest_records()
+
+    assert [record["plant"] for record in harvests] == ["Tomato", "Kale"]
+    assert harvests[1]["yield_quantity"] == 3.0
+    assert restarted.revision == 5
+    assert restarted.yield_summary("plant")["Kale"]["harvests"] == 1
+
+
+async def test_query_page_orders_by_date(hass: HomeAssistant, hass_storage) -> None:
+    """Pages are sorted by date and filtered through the indexes."""
+    hass_storage[STORAGE_KEY] = _stored(
+        STORAGE_KEY, STORAGE_VERSION, encode_garden_data(GARDEN)
+    )
+    garden_data = await _load(hass)
+
+    records, next_key = await garden_data.async_query_page(
+        "planting_records", limit=2
+    )
+    # The record without any date sorts first
+    assert [record.get("date") for record in records] == [None, "2024-04-01"]
+    assert next_key == ("2024-04-01", 1)
+
+    records, next_key = await garden_data.async_query_page(
+        "planting_records", limit=2, after=next_key
+    )
+    assert [record["plant"] for record in records] == ["Kale"]
+    assert next_key is None
+
+    records, _next_key = await garden_data.async_query_page(
+        "planting_records", plant="tomato", location="bed 2"
+    )
+    assert records == [GARDEN["planting_records"][2]]
+
+
+async def test_burst_of_writes_shares_one_commit(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Writes within the commit delay are saved together."""
+    garden_data = GardenData(hass, commit_delay=5)
+    await garden_data.async_load()
+    for plant in ("Kale", "Bean", "Pea"):
+        await garden_data.add_planting_record({"plant": plant, "location": "Bed 1"})
+    await hass.async_block_till_done()
+    assert STORAGE_KEY not in hass_storage
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+
+    assert garden_data.commit_count == 1
+    assert garden_data.coalesced_writes == 2
+    assert decode_garden_data(hass_storage[STORAGE_KEY]["data"])["revision"] == 3
+
+
+async def test_steady_writes_commit_by_max_latency(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Writes closer together than the delay still commit by the deadline."""
+    garden_data = GardenData(hass, commit_delay=0.2, max_commit_latency=0.3)
+    await garden_data.async_load()
+    for number in range(20):
+        await garden_data.add_planting_record(
+            {"plant": f"Plant {number}", "location": "Bed 1"}
+        )
+        await asyncio.sleep(0.05)
+
+    # The debounce alone would have waited for the writes to stop
+    assert garden_data.commit_count >= 1
+    assert STORAGE_KEY in hass_storage
+    await garden_data.async_flush()
+    assert decode_garden_data(hass_storage[STORAGE_KEY]["data"])["revision"] == 20
+
+
+async def test_query_page_merges_archive_before_live_records(
+    hass: HomeAssistant, hass_storage, config_dir
+) -> None:
+    """Archived records sort before live records of the same date."""
+    hass_storage[STORAGE_KEY] = _stored(
+        STORAGE_KEY, STORAGE_VERSION, encode_garden_data(GARDEN)
+    )
+    garden_data = await _load(hass)
+    await garden_data.async_archive(date(2024, 6, 1))
+    # A record of an archived date added afterwards stays live
+    await garden_data.add_planting_record(
+        {"plant": "Bean", "location": "Bed 1", "date": "2024-04-01"}
+    )
+
+    records, _next_key = await garden_data.async_query_page("planting_records")
+    assert [record["plant"] for record in records] == ["Tomato", "Bean"]
+
+    pages = []
+    after = None
+    while True:
+        records, after = await garden_data.async_query_page(
+            "planting_records", limit=1, after=after, include_archive=True
+        )
+        pages.append((records[0]["plant"], after))
+        if after is None:
+            break
+    assert pages == [
+        ("Tomato", ("", 0)),
+        ("Tomato", ("2024-04-01", -1)),
+        ("Bean", ("2024-04-01", 1)),
+        ("Kale", None),
+    ]
+
+    records, _next_key = await garden_data.async_query_page(
+        "planting_records", start_date="2024-04-01", end_date="2024-04-30"
+    )
+    assert [record["plant"] for record in records] == ["Tomato", "Bean"]
+
+
+async def test_changes_since_revision(hass: HomeAssistant, hass_storage) -> None:
+    """Records added after a revision are returned with the filters applied."""
+    hass_storage[STORAGE_KEY] = _stored(
+        STORAGE_KEY, STORAGE_VERSION, encode_garden_data(GARDEN)
+    )
+    garden_data = await _load(hass)
+    assert garden_data.changes_since(4, "planting_records") == []
+    # Revisions from before the restart are not in the change log
+    assert garden_data.changes_since(3, "planting_records") is None
+
+    await garden_data.add_planting_record(
+        {"plant": "Bean", "location": "Bed 1", "date": "2024-06-01"}
+    )
+    await garden_data.add_harvest_record(
+        {"plant": "Kale", "location": "Bed 2", "date": "2024-07-01"}
+    )
+    await garden_data.add_planting_record(
+        {"plant": "Pea", "location": "Bed 2", "date": "2024-06-02"}
+    )
+
+    assert garden_data.revision == 7
+    plantings = garden_data.changes_since(4, "planting_records")
+    assert [record["plant"] for record in plantings] == ["Bean", "Pea"]
+    assert garden_data.changes_since(5, "planting_records") == plantings[1:]
+    assert [
+        record["plant"]
+        for record in garden_data.changes_since(4, "planting_records", location="bed 1")
+    ] == ["Bean"]
+    assert [
+        record["plant"] for record in garden_data.changes_since(4, "harvest_records")
+    ] == ["Kale"]
+    assert garden_data.changes_since(7, "harvest_records") == []
+    assert garden_data.changes_since(8, "harvest_records") is None
+
+
+async def test_change_log_is_bounded(
+    hass: HomeAssistant, hass_storage, monkeypatch
+) -> None:
+    """Revisions older than the change log ask for a full snapshot."""
+    monkeypatch.setattr(garden_data_module, "CHANGE_LOG_SIZE", 3)
+    garden_data = await _load(hass)
+    for number in range(5):
+        await garden_data.add_planting_record(
+            {"plant": f"Plant {number}", "location": "Bed 1"}
+        )
+
+    assert garden_data.changes_since(1, "planting_records") is None
+    assert [
+        record["plant"] for record in garden_data.changes_since(2, "planting_records")
+    ] == ["Plant 2", "Plant 3", "Plant 4"]
+    await garden_data.async_flush()
@@ -0,0 +1,94 @@
+"""Tests for the journal storage backend."""
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.garden_journal import JournalGardenData
+
+
+async def _load(hass: HomeAssistant, **kwargs) -> JournalGardenData:
+    """Return journal garden data loaded like after a restart."""
+    garden_data = JournalGardenData(hass, commit_delay=0, **kwargs)
+    await garden_data.async_load()
+    return garden_data
+
+
+async def _plant(garden_data: JournalGardenData, *plants: str) -> None:
+    """Record plantings and commit them to the journal."""
+    for day, plant in enumerate(plants, 1):
+        await garden_data.add_planting_record(
+            {"plant": plant, "location": "Bed 1", "date": f"2024-04-{day:02d}"}
+        )
+    await garden_data.async_flush()
+
+
+async def _plants(garden_data: JournalGardenData) -> list:
+    """Return the planted plants in order."""
+    records = await garden_data.async_get_planting_records()
+    return [record["plant"] for record in records]
+
+
+async def test_replays_journal_after_crash(hass: HomeAssistant, config_dir) -> None:
+    """Committed records come back from the journal without a snapshot."""
+    garden_data = await _load(hass)
+    await _plant(garden_data, "Tomato", "Kale")
+
+    restarted = await _load(hass)
+
+    assert await _plants(restarted) == ["Tomato", "Kale"]
+    assert restarted.revision == 2
+    assert restarted.stats["journal_bytes"] > 0
+
+
+async def test_skips_torn_journal_line(hass: HomeAssistant, config_dir) -> None:
+    """A partially written last line is dropped instead of failing the load."""
+    garden_data = await _load(hass)
+    await _plant(garden_data, "Tomato", "Kale")
+    with open(garden_data._journal_path, "a", encoding="utf-8") as journal:
+        journal.write('{"seq": 3, "type": "planting_records", "rec')
+
+    restarted = await _load(hass)
+
+    assert await _plants(restarted) == ["Tomato", "Kale"]
+
+
+async def test_compaction_folds_journal_into_snapshot(
+    hass: HomeAssistant, config_dir
+) -> None:
+    """A large journal is compacted and replay starts from the snapshot."""
+    garden_data = await _load(hass, compact_size=1)
+    await _plant(garden_data, "Tomato", "Kale")
+    await hass.async_block_till_done()
+
+    assert garden_data.stats["compactions"] >= 1
+    assert garden_data.stats["journal_bytes"] == 0
+
+    # Closing waits for the compaction the new record started
+    await _plant(garden_data, "Bean")
+    await garden_data.async_close()
+    restarted = await _load(hass)
+
+    assert await _plants(restarted) == ["Tomato", "Kale", "Bean"]
+    assert restarted.revision == 3
+
+
+async def test_crash_before_truncate_does_not_duplicate(
+    hass: HomeAssistant, config_dir
+) -> None:
+    """Lines already in the snapshot are skipped when the journal survived."""
+    garden_data = await _load(hass)
+    await _plant(garden_data, "Tomato", "Kale")
+    with patch.object(
+        JournalGardenData, "_truncate_journal", side_effect=OSError("crash")
+    ):
+        garden_data._compact_size = 1
+        garden_data._async_maybe_compact()
+        await hass.async_block_till_done()
+
+    restarted = await _load(hass)
+
+    assert await _plants(restarted) == ["Tomato", "Kale"]
+    assert restarted.revision == 2
+
+    await _plant(restarted, "Bean")
+    assert await _plants(await _load(hass)) == ["Tomato", "Kale", "Bean"]
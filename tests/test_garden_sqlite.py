@@ -0,0 +1,100 @@
+"""Tests for the SQLite storage backend."""
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.garden_codec import encode_garden_data
+from custom_components.smart_home_farming.garden_data import (
+    STORAGE_KEY,
+    STORAGE_VERSION,
+)
+from custom_components.smart_home_farming.garden_sqlite import SQLiteGardenData
+
+GARDEN = {
+    "plants": [],
+    "planting_plans": [],
+    "planting_records": [
+        {"plant": "Tomato", "location": "Bed 1", "date": "2024-04-01"},
+        {"plant": "Kale", "location": "Bed 2", "date": "2024-04-03"},
+    ],
+    "harvest_records": [
+        {
+            "plant": "Tomato",
+            "location": "Bed 1",
+            "date": "2024-07-01",
+            "yield_amount": "2 kg",
+            "yield_quantity": 2000.0,
+            "yield_unit": "g",
+        },
+        {"plant": "tomato", "date": "2024-07-08", "yield_amount": "500 g"},
+    ],
+    "revision": 4,
+}
+
+
+def _stored(version: int, data: dict) -> dict:
+    """Return a Store file of the garden document."""
+    return {"version": version, "minor_version": 1, "key": STORAGE_KEY, "data": data}
+
+
+async def _load(hass: HomeAssistant) -> SQLiteGardenData:
+    """Return SQLite garden data loaded like after a restart."""
+    garden_data = SQLiteGardenData(hass, commit_delay=0)
+    await garden_data.async_load()
+    return garden_data
+
+
+async def _assert_migrated(garden_data: SQLiteGardenData) -> None:
+    """Check that the records of GARDEN are in the database."""
+    plantings = await garden_data.async_get_planting_records()
+    assert [(record["plant"], record["date"]) for record in plantings] == [
+        ("Tomato", "2024-04-01"),
+        ("Kale", "2024-04-03"),
+    ]
+    harvests, _next_key = await garden_data.async_query_page(
+        "harvest_records", plant="TOMATO"
+    )
+    assert [record["date"] for record in harvests] == ["2024-07-01", "2024-07-08"]
+    assert garden_data.revision == 4
+    # The unplaced harvest is booked to the bed the tomato was planted in
+    assert garden_data.yield_summary("bed")["Bed 1"]["harvests"] == 2
+
+
+async def test_migrates_store_document(
+    hass: HomeAssistant, hass_storage, config_dir
+) -> None:
+    """Records of a column document are copied into the database once."""
+    hass_storage[STORAGE_KEY] = _stored(STORAGE_VERSION, encode_garden_data(GARDEN))
+
+    garden_data = await _load(hass)
+    await _assert_migrated(garden_data)
+    await garden_data.add_planting_record({"plant": "Bean", "date": "2024-05-01"})
+    await garden_data.async_flush()
+    await garden_data.async_close()
+
+    # The database is the source of truth after the first start
+    restarted = await _load(hass)
+    plantings = await restarted.async_get_planting_records()
+    assert [record["plant"] for record in plantings] == ["Tomato", "Kale", "Bean"]
+    assert restarted.revision == 5
+    await restarted.async_close()
+
+
+async def test_migrates_version_1_document(
+    hass: HomeAssistant, hass_storage, config_dir
+) -> None:
+    """A document of one dict per record is migrated through the Store."""
+    hass_storage[STORAGE_KEY] = _stored(1, GARDEN)
+
+    garden_data = await _load(hass)
+    await _assert_migrated(garden_data)
+    await garden_data.async_close()
+
+
+async def test_starts_empty_without_store_document(
+    hass: HomeAssistant, config_dir
+) -> None:
+    """A new garden starts with an empty database."""
+    garden_data = await _load(hass)
+
+    assert await garden_data.async_get_planting_records() == []
+    assert garden_data.revision == 0
+    await garden_data.async_close()
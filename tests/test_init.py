@@ -0,0 +1,341 @@
+"""Tests for the Smart Home Farming services."""
+import base64
+import json
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_LOCATION,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+import custom_components.smart_home_farming as integration
+from custom_components.smart_home_farming.const import (
+    CONF_LLM_BACKEND,
+    CONF_STORAGE_BACKEND,
+    DOMAIN,
+    LLM_BACKEND_FAKE,
+    SERVICE_ARCHIVE_SEASONS,
+    SERVICE_EXPORT_RECORDS,
+    SERVICE_GET_GARDEN_STATUS,
+    SERVICE_IMPORT_RECORDS,
+    SERVICE_RECORD_HARVEST,
+    SERVICE_RECORD_PLANTING,
+    STORAGE_BACKEND_STORE,
+)
+from custom_components.smart_home_farming.garden_data import STORAGE_KEY
+
+
+@pytest.fixture
+async def garden(hass: HomeAssistant, config_dir) -> MockConfigEntry:
+    """Set up a garden with plantings and harvests over two years."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_API_KEY: "test-key",
+            CONF_LOCATION: "Test Garden",
+            CONF_STORAGE_BACKEND: STORAGE_BACKEND_STORE,
+        },
+        options={CONF_LLM_BACKEND: LLM_BACKEND_FAKE},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    for year in (2023, 2024):
+        for month, plant in ((4, "Tomato"), (5, "Kale"), (6, "Bean")):
+            await hass.services.async_call(
+                DOMAIN,
+                SERVICE_RECORD_PLANTING,
+                {"plant": plant, "location": "Bed 1", "date": f"{year}-0{month}-01"},
+                blocking=True,
+            )
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD_HARVEST,
+            {"plant": "Tomato", "date": f"{year}-08-01", "yield_amount": "2 kg"},
+            blocking=True,
+        )
+    return entry
+
+
+async def _status(hass: HomeAssistant, **data) -> dict:
+    """Call get_garden_status and return the response."""
+    return await hass.services.async_call(
+        DOMAIN, SERVICE_GET_GARDEN_STATUS, data, blocking=True, return_response=True
+    )
+
+
+async def _pages(hass: HomeAssistant, **data) -> list:
+    """Return the pages of a query until the cursor runs out."""
+    pages = []
+    response = await _status(hass, **data)
+    while True:
+        pages.append(response)
+        if response["next_cursor"] is None:
+            return pages
+        response = await _status(hass, cursor=response["next_cursor"], **data)
+
+
+def _cursor(positions: dict) -> str:
+    """Encode positions the way get_garden_status does."""
+    return base64.urlsafe_b64encode(json.dumps(positions).encode()).decode()
+
+
+def _dates(pages: list, kind: str) -> list:
+    """Return the dates of one record type over all pages."""
+    return [record["date"] for page in pages for record in page.get(kind, [])]
+
+
+async def test_cursor_pages_through_all_records(
+    hass: HomeAssistant, garden
+) -> None:
+    """Pages follow each other without gaps or repeats."""
+    pages = await _pages(hass, limit=4)
+
+    assert [len(page["planting_records"]) for page in pages] == [4, 2]
+    assert _dates(pages, "planting_records") == [
+        "2023-04-01",
+        "2023-05-01",
+        "2023-06-01",
+        "2024-04-01",
+        "2024-05-01",
+        "2024-06-01",
+    ]
+    # Record types without more records are left out of later pages
+    assert "harvest_records" not in pages[1]
+    assert _dates(pages, "harvest_records") == ["2023-08-01", "2024-08-01"]
+
+
+async def test_cursor_keeps_filters(hass: HomeAssistant, garden) -> None:
+    """Each page applies the same filters."""
+    pages = await _pages(
+        hass, plant="tomato", record_type="planting_records", limit=1
+    )
+
+    assert _dates(pages, "planting_records") == ["2023-04-01", "2024-04-01"]
+
+
+async def test_cursor_pages_through_archive(hass: HomeAssistant, garden) -> None:
+    """Cursors continue across archived and live records."""
+    await hass.services.async_call(
+        DOMAIN, SERVICE_ARCHIVE_SEASONS, {"before": "2024-01-01"}, blocking=True
+    )
+
+    pages = await _pages(
+        hass, start_date="2023-01-01", record_type="planting_records", limit=2
+    )
+
+    assert _dates(pages, "planting_records") == [
+        "2023-04-01",
+        "2023-05-01",
+        "2023-06-01",
+        "2024-04-01",
+        "2024-05-01",
+        "2024-06-01",
+    ]
+
+
+async def test_archive_pages_read_only_the_seasons_they_need(
+    hass: HomeAssistant, garden
+) -> None:
+    """Records of one date continue across pages of archived seasons."""
+    for plant in ("Pea", "Radish"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD_PLANTING,
+            {"plant": plant, "location": "Bed 2", "date": "2023-04-01"},
+            blocking=True,
+        )
+    await hass.services.async_call(
+        DOMAIN, SERVICE_ARCHIVE_SEASONS, {"before": "2024-01-01"}, blocking=True
+    )
+    archive = hass.data[DOMAIN][garden.entry_id]["garden_data"].archive
+
+    first = await _status(
+        hass, start_date="2023-01-01", record_type="planting_records", limit=2
+    )
+    # The spring season fills the page, so the summer is not read
+    assert archive.stats["season_loads"] == 1
+
+    pages = [first]
+    while pages[-1]["next_cursor"] is not None:
+        pages.append(
+            await _status(
+                hass,
+                start_date="2023-01-01",
+                record_type="planting_records",
+                limit=2,
+                cursor=pages[-1]["next_cursor"],
+            )
+        )
+    plants = [r["plant"] for page in pages for r in page["planting_records"]]
+    assert sorted(plants[:3]) == ["Pea", "Radish", "Tomato"]
+    assert plants[3:] == ["Kale", "Bean", "Tomato", "Kale", "Bean"]
+
+
+async def test_cursor_after_undated_record_key(hass: HomeAssistant, garden) -> None:
+    """Undated records sort first, so such a key continues from the start."""
+    response = await _status(
+        hass, cursor=_cursor({"harvest_records": ["", 0]}), limit=1
+    )
+
+    assert _dates([response], "harvest_records") == ["2023-08-01"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        _cursor(["planting_records"]),
+        _cursor({"compost_records": ["2024-01-01", 0]}),
+        _cursor({"planting_records": "2024-01-01"}),
+        _cursor({"planting_records": ["2024-01-01"]}),
+        _cursor({"planting_records": ["someday", 0]}),
+        _cursor({"planting_records": ["2024-01-01", "0"]}),
+        _cursor({"planting_records": ["2024-01-01", True]}),
+        _cursor({"planting_records": ["2024-01-01", 2 ** 40]}),
+    ],
+)
+async def test_invalid_cursor(hass: HomeAssistant, garden, cursor: str) -> None:
+    """Cursors that get_garden_status cannot have returned are rejected."""
+    with pytest.raises(ServiceValidationError):
+        await _status(hass, cursor=cursor)
+
+
+async def test_since_revision_returns_new_records(
+    hass: HomeAssistant, garden
+) -> None:
+    """Pollers get only the records added after the revision they saw."""
+    response = await _status(hass, since_revision=6)
+
+    assert response["revision"] == 8
+    assert response["full_snapshot"] is False
+    assert _dates([response], "planting_records") == ["2024-06-01"]
+    assert _dates([response], "harvest_records") == ["2024-08-01"]
+
+    response = await _status(hass, since_revision=8, plant="Tomato")
+    assert response["planting_records"] == []
+    assert response["full_snapshot"] is False
+
+
+async def test_since_unknown_revision_returns_full_snapshot(
+    hass: HomeAssistant, garden
+) -> None:
+    """A revision the change log does not know returns all records."""
+    response = await _status(hass, since_revision=9, plant="Tomato")
+
+    assert response["full_snapshot"] is True
+    assert _dates([response], "planting_records") == ["2023-04-01", "2024-04-01"]
+
+
+async def test_final_write_flushes_pending_records(
+    hass: HomeAssistant, hass_storage, garden, caplog
+) -> None:
+    """Pending records are saved at shutdown and the entry unloads cleanly."""
+    garden_data = hass.data[DOMAIN][garden.entry_id]["garden_data"]
+    assert garden_data.stats["pending_writes"] > 0
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+
+    assert garden_data.stats["pending_writes"] == 0
+    assert hass_storage[STORAGE_KEY]["data"]["revision"] == 8
+
+    assert await hass.config_entries.async_unload(garden.entry_id)
+    assert "Unable to remove unknown job listener" not in caplog.text
+
+
+async def test_removing_garden_deletes_its_jobs(
+    hass: HomeAssistant, garden, hass_storage
+) -> None:
+    """Unloading saves the job queue; removing the garden deletes it."""
+    await hass.config_entries.async_unload(garden.entry_id)
+    assert hass_storage[f"{DOMAIN}.jobs"]["data"] == {"jobs": []}
+
+    await hass.config_entries.async_remove(garden.entry_id)
+    assert f"{DOMAIN}.jobs" not in hass_storage
+
+
+async def _export(hass: HomeAssistant, file: str, **data) -> dict:
+    """Call export_records and return the response."""
+    return await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_RECORDS,
+        {"file": file, **data},
+        blocking=True,
+        return_response=True,
+    )
+
+
+async def test_export_includes_archived_seasons(
+    hass: HomeAssistant, garden, config_dir, monkeypatch
+) -> None:
+    """Exports page through archived and live records in date order."""
+    monkeypatch.setattr(integration, "EXPORT_PAGE_SIZE", 2)
+    await hass.services.async_call(
+        DOMAIN, SERVICE_ARCHIVE_SEASONS, {"before": "2024-01-01"}, blocking=True
+    )
+
+    response = await _export(hass, "garden/export.jsonl")
+
+    assert response["exported"] == 8
+    lines = (config_dir / "garden" / "export.jsonl").read_text().splitlines()
+    rows = [json.loads(line) for line in lines]
+    harvests = [row for row in rows if row["record_type"] == "harvest_records"]
+    assert [row["date"] for row in harvests] == ["2023-08-01", "2024-08-01"]
+    assert [
+        row["date"] for row in rows if row["record_type"] == "planting_records"
+    ] == [
+        "2023-04-01",
+        "2023-05-01",
+        "2023-06-01",
+        "2024-04-01",
+        "2024-05-01",
+        "2024-06-01",
+    ]
+
+
+async def test_import_exported_records(hass: HomeAssistant, garden) -> None:
+    """An exported file can be imported again."""
+    await _export(hass, "garden/export.csv", plant="Tomato")
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_IMPORT_RECORDS,
+        {"file": "garden/export.csv"},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {"imported": {"planting_records": 2, "harvest_records": 2}}
+    status = await _status(hass, plant="Tomato")
+    assert len(status["planting_records"]) == 4
+    assert len(status["harvest_records"]) == 4
+
+
+async def test_import_rejects_any_invalid_record(hass: HomeAssistant, garden) -> None:
+    """Nothing is imported unless every record is valid."""
+    with pytest.raises(ServiceValidationError, match="1 invalid records"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_IMPORT_RECORDS,
+            {
+                "records": [
+                    {
+                        "record_type": "planting_records",
+                        "plant": "Leek",
+                        "location": "Bed 2",
+                    },
+                    {"record_type": "compost_records", "plant": "Leek"},
+                ]
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    assert _dates([await _status(hass, plant="Leek")], "planting_records") == []
@@ -0,0 +1,95 @@
+"""Tests for the job queue."""
+import asyncio
+from typing import Dict, List
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.const import (
+    DOMAIN,
+    JOB_PRIORITY_INTERACTIVE,
+    JOB_PRIORITY_SCHEDULED,
+)
+from custom_components.smart_home_farming.jobs import (
+    STATUS_DONE,
+    STATUS_QUEUED,
+    STATUS_RUNNING,
+    JobQueue,
+    async_remove_jobs,
+)
+
+JOB_TYPE = "test"
+
+
+def _statuses(jobs: JobQueue) -> List[str]:
+    """Return the status of every job in submission order."""
+    return [job["status"] for job in jobs.jobs.values()]
+
+
+async def test_interactive_jobs_run_first(hass: HomeAssistant, hass_storage) -> None:
+    """Interactive jobs overtake scheduled ones, each kind in order."""
+    ran: List[str] = []
+
+    async def handler(job_id: str, parameters: Dict) -> None:
+        ran.append(parameters["name"])
+
+    jobs = JobQueue(hass, workers=1)
+    jobs.register_handler(JOB_TYPE, handler)
+    for name, priority in (
+        ("nightly", JOB_PRIORITY_SCHEDULED),
+        ("ask", JOB_PRIORITY_INTERACTIVE),
+        ("weekly", JOB_PRIORITY_SCHEDULED),
+        ("ask again", JOB_PRIORITY_INTERACTIVE),
+    ):
+        jobs.async_submit(JOB_TYPE, {"name": name}, priority)
+
+    jobs.async_start(MockConfigEntry(domain=DOMAIN))
+    await hass.async_block_till_done()
+    await jobs.async_close()
+
+    assert ran == ["ask", "ask again", "nightly", "weekly"]
+    assert _statuses(jobs) == [STATUS_DONE] * 4
+
+
+async def test_close_saves_and_requeues_running_jobs(
+    hass: HomeAssistant, hass_storage
+) -> None:
+    """Closing saves at once; the next load queues the running job again."""
+    started = asyncio.Event()
+
+    async def handler(job_id: str, parameters: Dict) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    jobs = JobQueue(hass, workers=1)
+    jobs.register_handler(JOB_TYPE, handler)
+    running = jobs.async_submit(JOB_TYPE, {}, JOB_PRIORITY_SCHEDULED)
+    waiting = jobs.async_submit(JOB_TYPE, {}, JOB_PRIORITY_SCHEDULED)
+    jobs.async_start(MockConfigEntry(domain=DOMAIN))
+    await started.wait()
+    await jobs.async_close()
+
+    saved = hass_storage[f"{DOMAIN}.jobs"]["data"]["jobs"]
+    assert [job["status"] for job in saved] == [STATUS_RUNNING, STATUS_QUEUED]
+
+    reloaded = JobQueue(hass)
+    await reloaded.async_load()
+    assert list(reloaded.jobs) == [running["id"], waiting["id"]]
+    assert _statuses(reloaded) == [STATUS_QUEUED, STATUS_QUEUED]
+    assert reloaded.stats["queued"] == 2
+
+
+async def test_storage_per_garden(hass: HomeAssistant, hass_storage) -> None:
+    """Each garden keeps its jobs in a file of its own until removed."""
+    first = JobQueue(hass, "")
+    second = JobQueue(hass, "garden2")
+    first.async_submit(JOB_TYPE, {}, JOB_PRIORITY_SCHEDULED)
+    await first.async_close()
+    await second.async_close()
+    assert len(hass_storage[f"{DOMAIN}.jobs"]["data"]["jobs"]) == 1
+    assert hass_storage[f"{DOMAIN}.jobs_garden2"]["data"]["jobs"] == []
+
+    await async_remove_jobs(hass, "garden2")
+    assert f"{DOMAIN}.jobs_garden2" not in hass_storage
+    assert f"{DOMAIN}.jobs" in hass_storage
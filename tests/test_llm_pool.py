@@ -0,0 +1,61 @@
+"""Tests for the LLM clients shared by gardens."""
+import asyncio
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_API_KEY
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.const import (
+    CONF_LLM_BACKEND,
+    CONF_MODEL,
+    CONF_REQUESTS_PER_MINUTE,
+    DOMAIN,
+    LLM_BACKEND_FAKE,
+)
+from custom_components.smart_home_farming.llm_api import LLMApi
+from custom_components.smart_home_farming.llm_pool import LLMClientPool
+
+
+def _entry(**options) -> MockConfigEntry:
+    """Return a garden entry using the fake backend."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_API_KEY: "test-key"},
+        options={CONF_LLM_BACKEND: LLM_BACKEND_FAKE, **options},
+    )
+
+
+async def test_gardens_share_client_limits(hass: HomeAssistant) -> None:
+    """Gardens sharing a client share its limits until the last one leaves."""
+    pool = LLMClientPool(hass)
+    first, second = _entry(), _entry(**{CONF_REQUESTS_PER_MINUTE: 5})
+    backend, limits = pool.acquire(first)
+    assert pool.acquire(second) == (backend, limits)
+
+    other_backend, other_limits = pool.acquire(_entry(**{CONF_MODEL: "other"}))
+    assert other_backend is not backend
+    assert other_limits is not limits
+
+    pool.release(first.entry_id)
+    assert len(pool.stats["clients"]) == 2
+    pool.release(second.entry_id)
+    assert len(pool.stats["clients"]) == 1
+    assert pool.acquire(first)[1] is not limits
+
+
+async def test_gardens_coalesce_identical_requests(hass: HomeAssistant) -> None:
+    """Identical requests of two gardens sharing a client go upstream once."""
+    pool = LLMClientPool(hass)
+    apis = []
+    for entry in (_entry(), _entry()):
+        backend, limits = pool.acquire(entry)
+        apis.append(LLMApi(backend, "Test Garden", limits=limits))
+
+    first, second = await asyncio.gather(
+        *(api.get_plant_care_recommendations("Tomato") for api in apis)
+    )
+    assert first == second
+    assert backend.requests == 1
+    assert pool.stats["clients"][0]["coalesced_calls"] == 1
+    assert apis[0].stats["coalesced_calls"] == 1
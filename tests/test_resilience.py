@@ -0,0 +1,177 @@
+"""Tests for retries and the circuit breaker of LLM calls."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.smart_home_farming import resilience
+from custom_components.smart_home_farming.llm_backend import LLMBackendError
+from custom_components.smart_home_farming.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+)
+
+RESET_TIMEOUT = 30
+
+
+@pytest.fixture
+def clock(monkeypatch) -> SimpleNamespace:
+    """Replace the monotonic clock of the breaker with a settable one."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        resilience, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def _open_breaker(clock: SimpleNamespace) -> CircuitBreaker:
+    """Return a breaker opened by three failures."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET_TIMEOUT)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock) -> None:
+    """The circuit opens at the threshold and then rejects calls."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.rejected == 1
+
+
+def test_success_resets_failure_count(clock) -> None:
+    """Only consecutive failures count towards the threshold."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=RESET_TIMEOUT)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_trial_closes_circuit(clock) -> None:
+    """After the timeout one trial call is let through; success closes."""
+    breaker = _open_breaker(clock)
+    clock.now += RESET_TIMEOUT
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    # Only one trial runs at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_circuit(clock) -> None:
+    """A failing trial opens the circuit for another timeout."""
+    breaker = _open_breaker(clock)
+    clock.now += RESET_TIMEOUT
+    breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += RESET_TIMEOUT - 1
+    assert breaker.state == "open"
+    clock.now += 1
+    assert breaker.state == "half_open"
+
+
+def test_trial_without_verdict_is_released(clock) -> None:
+    """A trial ending in a non-transient error lets the next call try."""
+    breaker = _open_breaker(clock)
+    clock.now += RESET_TIMEOUT
+    breaker.before_call()
+
+    breaker.record_other()
+    assert breaker.state == "half_open"
+    breaker.before_call()
+
+
+def _caller(max_attempts: int = 3) -> ResilientCaller:
+    """Return a caller without rate limit waits or retry delays."""
+    return ResilientCaller(
+        requests_per_minute=6000,
+        max_attempts=max_attempts,
+        base_delay=0,
+        max_delay=0,
+        failure_threshold=2,
+        reset_timeout=RESET_TIMEOUT,
+    )
+
+
+async def test_retries_transient_errors() -> None:
+    """Transient errors are retried and a success closes the circuit."""
+    caller = _caller()
+    outcomes = [LLMBackendError("busy"), "plan"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert await caller.async_call(call) == "plan"
+    assert caller.retries == 1
+    assert caller.breaker.state == "closed"
+
+
+async def test_failures_open_circuit_and_fail_fast() -> None:
+    """Exhausted retries open the circuit; later calls are not attempted."""
+    caller = _caller(max_attempts=2)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise LLMBackendError("unavailable")
+
+    with pytest.raises(LLMBackendError):
+        await caller.async_call(call)
+    assert caller.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await caller.async_call(call)
+    assert calls == 2
+
+
+async def test_permanent_errors_do_not_open_circuit() -> None:
+    """Errors that retrying cannot fix neither retry nor trip the breaker."""
+    caller = _caller()
+
+    async def call():
+        raise LLMBackendError("bad request", transient=False)
+
+    for _ in range(3):
+        with pytest.raises(LLMBackendError):
+            await caller.async_call(call)
+    assert caller.retries == 0
+    assert caller.breaker.state == "closed"
+
+
+async def test_cancelled_trial_is_released(clock) -> None:
+    """Cancelling the half-open trial lets the next call try again."""
+    caller = _caller()
+    caller.breaker.record_failure()
+    caller.breaker.record_failure()
+    clock.now += RESET_TIMEOUT
+
+    task = asyncio.ensure_future(caller.async_guard(asyncio.Event().wait))
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert caller.breaker.state == "half_open"
+    caller.breaker.before_call()
@@ -0,0 +1,102 @@
+"""Tests for the Smart Home Farming sensors."""
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_API_KEY, CONF_LOCATION
+from homeassistant.core import HomeAssistant
+
+from custom_components.smart_home_farming.const import (
+    BED_TYPE_RAISED,
+    CONF_BED_TYPE,
+    CONF_BEDS,
+    CONF_LENGTH,
+    CONF_LLM_BACKEND,
+    CONF_NAME,
+    CONF_STORAGE_BACKEND,
+    CONF_SUNLIGHT,
+    CONF_WIDTH,
+    DOMAIN,
+    LLM_BACKEND_FAKE,
+    SERVICE_RECORD_HARVEST,
+    SERVICE_RECORD_PLANTING,
+    STORAGE_BACKEND_STORE,
+    SUNLIGHT_DIRECT,
+)
+
+BED_1 = "sensor.mock_title_bed_1_occupancy"
+BED_2 = "sensor.mock_title_bed_2_occupancy"
+
+
+@pytest.fixture
+async def garden(hass: HomeAssistant, config_dir) -> MockConfigEntry:
+    """Set up a garden with two beds and no records."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_API_KEY: "test-key",
+            CONF_LOCATION: "Test Garden",
+            CONF_STORAGE_BACKEND: STORAGE_BACKEND_STORE,
+            CONF_BEDS: [
+                {
+                    CONF_NAME: name,
+                    CONF_BED_TYPE: BED_TYPE_RAISED,
+                    CONF_LENGTH: 200,
+                    CONF_WIDTH: 100,
+                    CONF_SUNLIGHT: SUNLIGHT_DIRECT,
+                }
+                for name in ("Bed 1", "Bed 2")
+            ],
+        },
+        options={CONF_LLM_BACKEND: LLM_BACKEND_FAKE},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
+
+
+async def _record(hass: HomeAssistant, service: str, **data) -> None:
+    """Record a planting or harvest and let the sensors update."""
+    await hass.services.async_call(DOMAIN, service, data, blocking=True)
+    await hass.async_block_till_done()
+
+
+async def test_sensors_update_when_records_are_added(
+    hass: HomeAssistant, garden
+) -> None:
+    """Records are pushed to the sensors they affect, without polling."""
+    assert hass.states.get(BED_1).state == "0"
+    assert hass.states.get("sensor.mock_title_tomato_last_planted") is None
+    untouched = hass.states.get(BED_2).last_updated
+
+    await _record(
+        hass,
+        SERVICE_RECORD_PLANTING,
+        plant="Tomato",
+        location="Bed 1",
+        date="2024-04-01",
+    )
+
+    # Sensors for a new plant are added on its first record
+    assert hass.states.get("sensor.mock_title_tomato_last_planted").state == (
+        "2024-04-01"
+    )
+    occupancy = hass.states.get(BED_1)
+    assert occupancy.state == "1"
+    assert occupancy.attributes["plants"] == {"Tomato": "2024-04-01"}
+    assert occupancy.attributes["area_m2"] == 2.0
+    # Other beds are not written
+    assert hass.states.get(BED_2).last_updated == untouched
+
+    await _record(
+        hass,
+        SERVICE_RECORD_HARVEST,
+        plant="Tomato",
+        date="2024-08-01",
+        yield_amount="2 kg",
+    )
+
+    assert hass.states.get(BED_1).state == "0"
+    harvested = hass.states.get("sensor.mock_title_tomato_last_harvested")
+    assert harvested.state == "2024-08-01"
+    assert harvested.attributes["yield_amount"] == "2 kg"
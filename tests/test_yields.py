@@ -0,0 +1,87 @@
+"""Tests for harvest yield parsing and rollups."""
+import pytest
+
+from custom_components.smart_home_farming.yields import YieldRollups, parse_yield
+
+PLANTINGS = [
+    {"plant": "Tomato", "location": "Bed 1", "date": "2024-04-01"},
+    {"plant": "Tomato", "location": "Bed 2", "date": "2024-08-01"},
+]
+REPLANTING = {"plant": "Tomato", "location": "Bed 3", "date": "2024-06-01"}
+HARVEST = {"plant": "Tomato", "date": "2024-07-01", "yield_amount": "2 kg"}
+
+
+@pytest.mark.parametrize(
+    ("amount", "expected"),
+    [
+        ("500g", (500.0, "g")),
+        ("1,5 kg", (1500.0, "g")),
+        ("1.5 kg", (1500.0, "g")),
+        ("12", (12.0, "pcs")),
+        ("1,500 g", None),
+        ("lots", None),
+    ],
+)
+def test_parse_yield(amount: str, expected) -> None:
+    """Amounts are read in base units; ambiguous ones are not guessed."""
+    assert parse_yield(amount) == expected
+
+
+def _beds(rollups: YieldRollups) -> dict:
+    """Return the harvests per bed."""
+    return {
+        bed: totals["harvests"] for bed, totals in rollups.summary("bed").items()
+    }
+
+
+def test_harvest_uses_planting_before_its_date() -> None:
+    """A harvest without a bed goes to the planting on or before its date."""
+    rollups = YieldRollups()
+    for planting in PLANTINGS:
+        rollups.add_planting(planting)
+    rollups.add_harvest(HARVEST)
+
+    assert _beds(rollups) == {"Bed 1": 1}
+
+
+def test_backdated_planting_moves_harvests() -> None:
+    """Records added out of date order end up like a replay in date order."""
+    rollups = YieldRollups()
+    rollups.add_planting(PLANTINGS[0])
+    rollups.add_harvest(HARVEST)
+    rollups.add_planting(REPLANTING)
+
+    replayed = YieldRollups.from_records([PLANTINGS[0], REPLANTING], [HARVEST])
+    assert _beds(rollups) == _beds(replayed) == {"Bed 3": 1}
+    assert rollups.summary("bed")["Bed 3"]["mass_kg"] == 2.0
+
+
+def test_harvest_before_any_planting_is_unassigned() -> None:
+    """Without an earlier planting the harvest has no bed, until one comes."""
+    rollups = YieldRollups()
+    rollups.add_planting(PLANTINGS[1])
+    rollups.add_harvest(HARVEST)
+    assert _beds(rollups) == {"unassigned": 1}
+
+    rollups.add_planting(PLANTINGS[0])
+    assert _beds(rollups) == {"Bed 1": 1}
+
+
+def test_saved_rollups_keep_planting_history() -> None:
+    """Rollups restored from as_dict book later harvests the same way."""
+    rollups = YieldRollups.from_records(PLANTINGS, [])
+    restored = YieldRollups.from_dict(rollups.as_dict())
+    restored.add_harvest(HARVEST)
+
+    assert _beds(restored) == {"Bed 1": 1}
+
+
+def test_restores_latest_bed_of_older_rollups() -> None:
+    """Rollups saved with only the latest bed per plant still load."""
+    saved = YieldRollups().as_dict()
+    del saved["plantings"], saved["beds"]
+    saved["plant_beds"] = {"tomato": ["2024-04-01", "bed 1", "Bed 1"]}
+    restored = YieldRollups.from_dict(saved)
+    restored.add_harvest(HARVEST)
+
+    assert _beds(restored) == {"Bed 1": 1}